@@ -7,7 +7,6 @@ A comprehensive AI assistant that can do anything on your computer.
 import tkinter as tk
 import customtkinter as ctk
 import pyperclip
-import threading
 import time
 import os
 import sys
@@ -16,12 +15,28 @@ import webbrowser
 import platform
 import json
 from datetime import datetime
+import config
+from request_scheduler import RequestScheduler, FAST, SLOW
+from ui_bus import UIBus, BATCH, COALESCE
+from llm_client import LLMClient, LLMCancelled
+from fuzzy_match import FuzzyIndex
 
 # Configure customtkinter appearance
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 class AIAssistant:
+    # Applications that can be opened directly, matched fuzzily ("calc", "calculater")
+    APPS = {
+        "notepad": "notepad.exe",
+        "calculator": "calc.exe",
+        "paint": "mspaint.exe",
+        "wordpad": "wordpad.exe",
+        "explorer": "explorer.exe",
+        "cmd": "cmd.exe",
+        "powershell": "powershell.exe"
+    }
+    
     def __init__(self):
         print("🔧 Initializing AI Assistant...")
         
@@ -29,6 +44,12 @@ class AIAssistant:
         self.hidden_root = ctk.CTk()
         self.hidden_root.withdraw()  # Hide the main window
         
+        # All widget updates from worker threads go through the UI bus
+        self.ui_bus = UIBus(self.hidden_root, config.UI_BUS_INTERVAL_MS)
+        self.ui_bus.register("message", self._render_messages, BATCH)
+        self.ui_bus.register("status", self._apply_status, COALESCE)
+        self.ui_bus.start()
+        
         self.assistant_window = None
         self.input_entry = None
         self.status_label = None
@@ -36,6 +57,8 @@ class AIAssistant:
         self.is_visible = False
         self.chat_history = []
         self.listener = None
+        self.request_scheduler = RequestScheduler(config.MAX_WORKER_THREADS)
+        self.app_matcher = FuzzyIndex(self.APPS.items())
         
         # Initialize hotkey listener
         self._setup_hotkey()
@@ -57,7 +80,7 @@ class AIAssistant:
             print("🔧 Setting up hotkey listener...")
             
             self.listener = keyboard.GlobalHotKeys({
-                '<ctrl>+<alt>+a': self.show_assistant
+                '<ctrl>+<alt>+a': lambda: self.ui_bus.call(self.show_assistant)
             })
             self.listener.start()
             print("✅ Hotkey listener started (Ctrl+Alt+A)")
@@ -72,20 +95,16 @@ class AIAssistant:
     def _setup_ai(self):
         """Setup AI model"""
         try:
-            import google.generativeai as genai
             api_key = os.getenv('GEMINI_API_KEY')
             
             if api_key:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel("gemini-1.5-flash")
+                self.model = LLMClient(api_key, "gemini-1.5-flash", base_url=config.API_BASE_URL,
+                                       timeout=config.API_TIMEOUT, max_connections=config.API_MAX_CONNECTIONS)
                 print("✅ Google AI configured with API key")
             else:
                 self.model = None
                 print("⚠️  No API key found - using demo mode")
                 
-        except ImportError:
-            self.model = None
-            print("⚠️  Google AI not available - using demo mode")
         except Exception as e:
             self.model = None
             print(f"❌ AI setup failed: {e} - using demo mode")
@@ -224,23 +243,27 @@ class AIAssistant:
             print(f"❌ Error focusing input: {e}")
     
     def _add_message(self, sender, message, msg_type="user"):
-        """Add a message to the chat display"""
+        """Queue a message for the chat display (safe from any thread)"""
+        timestamp = datetime.now().strftime("%H:%M")
+        self.ui_bus.post("message", sender, message, timestamp, msg_type)
+    
+    def _render_messages(self, messages):
+        """Insert a frame's worth of queued messages into the chat display"""
         try:
-            timestamp = datetime.now().strftime("%H:%M")
-            color = "#4CAF50" if msg_type == "assistant" else "#2196F3"
-            
-            # Add to chat history
-            self.chat_history.append({
-                "sender": sender,
-                "message": message,
-                "timestamp": timestamp,
-                "type": msg_type
-            })
+            for sender, message, timestamp, msg_type in messages:
+                # Add to chat history
+                self.chat_history.append({
+                    "sender": sender,
+                    "message": message,
+                    "timestamp": timestamp,
+                    "type": msg_type
+                })
             
             # Update display
             if self.chat_display:
-                self.chat_display.insert("end", f"[{timestamp}] {sender}: ", f"timestamp")
-                self.chat_display.insert("end", f"{message}\n\n", f"message")
+                for sender, message, timestamp, msg_type in messages:
+                    self.chat_display.insert("end", f"[{timestamp}] {sender}: ", f"timestamp")
+                    self.chat_display.insert("end", f"{message}\n\n", f"message")
                 self.chat_display.see("end")
                 
         except Exception as e:
@@ -281,11 +304,14 @@ class AIAssistant:
         # Update status
         self._update_status("Processing...", "#FFA500")
         
-        # Process in a separate thread
-        threading.Thread(target=self._process_command_async, args=(command,), daemon=True).start()
+        # Process on the worker pool, superseding any command still in flight
+        self.request_scheduler.new_command()
+        if self.model:
+            self.model.cancel_all()
+        self.request_scheduler.submit(FAST, self._process_command_async, command)
         
-    def _process_command_async(self, command):
-        """Process the command asynchronously"""
+    def _process_command_async(self, ticket, command):
+        """Handle system commands on the fast lane, handing AI requests to the slow lane"""
         try:
             print(f"🤖 Processing command: {command}")
             
@@ -296,6 +322,19 @@ class AIAssistant:
                 self._update_status("Ready", "#4CAF50")
                 return
             
+            self.request_scheduler.submit(SLOW, self._process_ai_async, command, generation=ticket.generation)
+            
+        except Exception as e:
+            error_msg = str(e)
+            print(f"❌ Error processing command: {error_msg}")
+            
+            error_response = f"Sorry, I encountered an error: {error_msg}"
+            self._add_message("AI Assistant", error_response, "assistant")
+            self._update_status("Error occurred", "#FF4444")
+    
+    def _process_ai_async(self, ticket, command):
+        """Answer a command with the AI model (or demo responses)"""
+        try:
             # Use AI for other commands
             if self.model:
                 # Use real AI
@@ -330,12 +369,19 @@ Please provide a helpful response. If it's a system command, explain what you wo
                 result = self._get_demo_response(command)
                 print(f"✅ Demo response generated: {len(result)} characters")
             
+            # A newer command replaced this one while the model was answering
+            if ticket.is_cancelled():
+                print("⏭️  Dropping response for superseded command")
+                return
+            
             # Add AI response to chat
             self._add_message("AI Assistant", result, "assistant")
             
             # Update status
             self._update_status("Ready", "#4CAF50")
             
+        except LLMCancelled:
+            print("⏭️  AI request cancelled by a newer command")
         except Exception as e:
             error_msg = str(e)
             print(f"❌ Error processing command: {error_msg}")
@@ -350,23 +396,15 @@ Please provide a helpful response. If it's a system command, explain what you wo
         
         # Open applications
         if "open" in command_lower:
-            apps = {
-                "notepad": "notepad.exe",
-                "calculator": "calc.exe",
-                "paint": "mspaint.exe",
-                "wordpad": "wordpad.exe",
-                "explorer": "explorer.exe",
-                "cmd": "cmd.exe",
-                "powershell": "powershell.exe"
-            }
-            
-            for app_name, app_path in apps.items():
-                if app_name in command_lower:
-                    try:
-                        subprocess.Popen(app_path)
-                        return f"✅ Opened {app_name} for you!"
-                    except Exception as e:
-                        return f"❌ Error opening {app_name}: {e}"
+            app_query = command_lower.split("open", 1)[1]
+            match = self.app_matcher.best(app_query, min_score=0.5) if app_query.strip() else None
+            if match:
+                app_name, app_path = match.key, match.value
+                try:
+                    subprocess.Popen(app_path)
+                    return f"✅ Opened {app_name} for you!"
+                except Exception as e:
+                    return f"❌ Error opening {app_name}: {e}"
         
         # System information
         if any(word in command_lower for word in ["system info", "system information", "computer info"]):
@@ -431,7 +469,11 @@ Please provide a helpful response. If it's a system command, explain what you wo
             return f"I understand you said: '{command}'. In the full version with an API key, I would provide a detailed response to help you with this request."
     
     def _update_status(self, message, color):
-        """Update the status label from the main thread"""
+        """Queue a status update (safe from any thread; only the latest per frame is shown)"""
+        self.ui_bus.post("status", message, color)
+    
+    def _apply_status(self, message, color):
+        """Update the status label on the main thread"""
         if self.status_label:
             try:
                 self.status_label.configure(text=message, text_color=color)
@@ -457,6 +499,10 @@ Please provide a helpful response. If it's a system command, explain what you wo
         """Clean shutdown"""
         print("🛑 Shutting down AI Assistant...")
         
+        self.request_scheduler.shutdown()
+        if self.model:
+            self.model.close()
+        
         if self.listener:
             try:
                 self.listener.stop()
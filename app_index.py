@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+App Index for the Ultimate AI Assistant
+Persistent index of launchable applications (Start Menu shortcuts, PATH, registry) with fast fuzzy lookup.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from fuzzy_match import FuzzyIndex
+from lazy_imports import lazy_import
+
+winreg = lazy_import("winreg", "pywin32")
+
+AppEntry = namedtuple("AppEntry", ["name", "path", "source"])
+
+# Lookup tables built together by _rebuild and published with one assignment, so a
+# search never mixes tables from two refreshes
+_Tables = namedtuple("_Tables", ["entries", "entry_words", "exact", "prefixes", "initials", "fuzzy", "programs"])
+
+INDEX_VERSION = 1
+
+SHORTCUT = "shortcut"
+PATH = "path"
+REGISTRY = "registry"
+
+# Shortcuts are what the user sees in the Start Menu, so they win ties
+_SOURCE_RANK = {SHORTCUT: 0.3, REGISTRY: 0.2, PATH: 0.1}
+
+# Words that do not help identify an application
+_STOP_WORDS = {"the", "app", "application", "program", "please", "my", "a"}
+
+_SKIP_PREFIXES = ("uninstall", "readme", "release notes", "license")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_REGISTRY_APP_PATHS = r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"
+_REGISTRY_UNINSTALL = (
+    r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall",
+    r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall",
+)
+
+
+def tokenize(name):
+    """Lowercase words of an application name"""
+    return _WORD_RE.findall(name.lower())
+
+
+def default_sources():
+    """(directory, recursive, kind) sources for the current platform"""
+    sources = []
+    if sys.platform == "win32":
+        for base in (os.getenv("PROGRAMDATA"), os.getenv("APPDATA")):
+            if base:
+                sources.append((os.path.join(base, "Microsoft", "Windows", "Start Menu", "Programs"), True, SHORTCUT))
+    for directory in os.getenv("PATH", "").split(os.pathsep):
+        if directory:
+            sources.append((directory, False, PATH))
+    return sources
+
+
+class AppIndex:
+    """Application index persisted as JSON and refreshed incrementally by directory mtime"""
+
+    def __init__(self, index_path, sources=None, use_registry=None):
+        self.index_path = index_path
+        self.sources = default_sources() if sources is None else list(sources)
+        self.use_registry = sys.platform == "win32" if use_registry is None else use_registry
+        self._dirs = {}
+        self._registry = {}
+        self._tables = _Tables([], [], {}, {}, {}, FuzzyIndex(), [])
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = threading.Event()
+        self.last_refresh = None
+        self.dirs_rescanned = 0
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load the index saved by a previous run, if any"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION:
+            return False
+        self._dirs = data.get("dirs", {})
+        self._registry = data.get("registry", {})
+        self._rebuild()
+        return True
+
+    def save(self):
+        """Write the index atomically"""
+        data = {"version": INDEX_VERSION, "dirs": self._dirs, "registry": self._registry}
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.index_path)
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Rescan directories (and registry keys) whose mtime changed; returns how many were rescanned"""
+        dirs = {}
+        rescanned = 0
+        for directory, recursive, kind in self.sources:
+            rescanned += self._refresh_dir(os.path.normpath(directory), recursive, kind, dirs)
+
+        registry = {}
+        if self.use_registry:
+            rescanned += self._refresh_registry(registry)
+
+        changed = rescanned or set(dirs) != set(self._dirs) or set(registry) != set(self._registry)
+        self._dirs = dirs
+        self._registry = registry
+        if changed:
+            self._rebuild()
+            try:
+                self.save()
+            except OSError as e:
+                print(f"App index save error: {e}")
+        self.last_refresh = time.time()
+        self.dirs_rescanned += rescanned
+        self.ready.set()
+        return rescanned
+
+    def _refresh_dir(self, directory, recursive, kind, dirs):
+        """Reuse a directory's listing while its mtime is unchanged, recursing into known subdirectories"""
+        if directory in dirs:
+            return 0
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            return 0
+
+        rescanned = 0
+        state = self._dirs.get(directory)
+        if not state or state["mtime"] != mtime or state["kind"] != kind or state["recursive"] != recursive:
+            files, subdirs = [], []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir():
+                                if recursive:
+                                    subdirs.append(entry.path)
+                            elif self._accepts(entry, kind):
+                                name = self._display_name(entry.name)
+                                if name:
+                                    files.append([name, entry.path])
+                        except OSError:
+                            continue
+            except OSError:
+                return 0
+            state = {"mtime": mtime, "kind": kind, "recursive": recursive, "files": files, "subdirs": subdirs}
+            rescanned = 1
+
+        dirs[directory] = state
+        for subdir in state["subdirs"]:
+            rescanned += self._refresh_dir(subdir, True, kind, dirs)
+        return rescanned
+
+    @staticmethod
+    def _accepts(entry, kind):
+        """Whether a directory entry is something the user can launch"""
+        extension = os.path.splitext(entry.name)[1].lower()
+        if kind == SHORTCUT:
+            return extension in (".lnk", ".exe")
+        if sys.platform == "win32":
+            return extension == ".exe"
+        return entry.is_file() and os.access(entry.path, os.X_OK)
+
+    @staticmethod
+    def _display_name(filename):
+        """Application name from a shortcut or executable file name"""
+        name = os.path.splitext(filename)[0]
+        if name.lower().endswith(" - shortcut"):
+            name = name[:-len(" - shortcut")]
+        if name.lower().startswith(_SKIP_PREFIXES):
+            return None
+        return name.strip()
+
+    def _refresh_registry(self, registry):
+        """Read App Paths and Uninstall keys, skipping keys whose last-write time is unchanged"""
+        rescanned = 0
+        keys = [(winreg.HKEY_LOCAL_MACHINE, _REGISTRY_APP_PATHS), (winreg.HKEY_CURRENT_USER, _REGISTRY_APP_PATHS)]
+        keys += [(winreg.HKEY_LOCAL_MACHINE, path) for path in _REGISTRY_UNINSTALL]
+        for hive, path in keys:
+            name = f"{hive}\\{path}"
+            try:
+                key = winreg.OpenKey(hive, path)
+            except OSError:
+                continue
+            try:
+                subkey_count, _, modified = winreg.QueryInfoKey(key)
+                state = self._registry.get(name)
+                if not state or state["mtime"] != modified:
+                    apps, programs = [], []
+                    for i in range(subkey_count):
+                        try:
+                            subkey_name = winreg.EnumKey(key, i)
+                            with winreg.OpenKey(key, subkey_name) as subkey:
+                                if path == _REGISTRY_APP_PATHS:
+                                    target = winreg.QueryValueEx(subkey, "")[0].strip('"')
+                                    apps.append([os.path.splitext(subkey_name)[0], target])
+                                else:
+                                    programs.append(winreg.QueryValueEx(subkey, "DisplayName")[0])
+                        except OSError:
+                            continue
+                    state = {"mtime": modified, "apps": apps, "programs": programs}
+                    rescanned += 1
+                registry[name] = state
+            finally:
+                winreg.CloseKey(key)
+        return rescanned
+
+    # ------------------------------------------------------------------
+    # Lookup structures
+    # ------------------------------------------------------------------
+
+    def _rebuild(self):
+        """Rebuild the in-memory lookup tables, then swap them in"""
+        entries = []
+        seen = set()
+        for state in self._dirs.values():
+            source = SHORTCUT if state["kind"] == SHORTCUT else PATH
+            for name, path in state["files"]:
+                if (name.lower(), path.lower()) not in seen:
+                    seen.add((name.lower(), path.lower()))
+                    entries.append(AppEntry(name, path, source))
+        programs = set()
+        for state in self._registry.values():
+            for name, path in state["apps"]:
+                if (name.lower(), path.lower()) not in seen:
+                    seen.add((name.lower(), path.lower()))
+                    entries.append(AppEntry(name, path, REGISTRY))
+            programs.update(state["programs"])
+
+        exact, prefixes, initials = {}, {}, {}
+        fuzzy = FuzzyIndex()
+        entry_words = [tokenize(entry.name) for entry in entries]
+        for entry_id, entry in enumerate(entries):
+            words = entry_words[entry_id]
+            if not words:
+                continue
+            fuzzy.add(entry.name, entry_id)
+            exact.setdefault(" ".join(words), []).append(entry_id)
+            exact.setdefault("".join(words), []).append(entry_id)
+            for word in words:
+                for end in range(1, len(word) + 1):
+                    prefixes.setdefault(word[:end], set()).add(entry_id)
+            # "vs" for "Visual Studio", "vsc" for "Visual Studio Code"
+            for start in range(len(words)):
+                for end in range(start + 2, min(len(words), start + 4) + 1):
+                    initials.setdefault("".join(word[0] for word in words[start:end]), set()).add(entry_id)
+
+        self._tables = _Tables(entries, entry_words, exact, prefixes, initials, fuzzy,
+                               sorted(programs, key=str.lower))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(self, query, limit=5):
+        """Best matching applications for a spoken or typed name"""
+        tables = self._tables
+        entries, exact = tables.entries, tables.exact
+        words = [word for word in tokenize(query) if word not in _STOP_WORDS] or tokenize(query)
+        if not words:
+            return []
+
+        scores = {}
+        for entry_id in exact.get(" ".join(words), []) + exact.get("".join(words), []):
+            scores[entry_id] = 10.0
+
+        if not scores:
+            candidates = None
+            for word in words:
+                matches = tables.prefixes.get(word, set()) | tables.initials.get(word, set())
+                candidates = matches if candidates is None else candidates & matches
+                if not candidates:
+                    break
+            for entry_id in candidates or ():
+                entry_words = tables.entry_words[entry_id]
+                score = 0.0
+                for word in words:
+                    if word in entry_words:
+                        score += 3
+                    elif word in tables.initials and entry_id in tables.initials[word]:
+                        score += 2
+                    else:
+                        score += 1
+                scores[entry_id] = score - 0.5 * max(0, len(entry_words) - len(words))
+
+        if not scores:
+            # Misspelled or extra words ("calculater", "chrome browser"): fall back to trigram similarity
+            for match in tables.fuzzy.search(" ".join(words), limit=limit * 2, min_score=0.45):
+                scores[match.value] = match.score
+
+        ranked = sorted(scores, key=lambda entry_id: (-(scores[entry_id] + _SOURCE_RANK[entries[entry_id].source]),
+                                                      len(entries[entry_id].name)))
+        return [entries[entry_id] for entry_id in ranked[:limit]]
+
+    def lookup(self, query):
+        """Single best application for a name, or None"""
+        results = self.search(query, limit=1)
+        return results[0] if results else None
+
+    def installed_programs(self):
+        """Display names of installed programs from the registry"""
+        return list(self._tables.programs)
+
+    def __len__(self):
+        return len(self._tables.entries)
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    def start_background_refresh(self, interval):
+        """Load the saved index, then refresh every interval seconds on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refresh_loop, args=(interval,),
+                                            name="app-index", daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self, interval):
+        # Loading the saved index first makes lookups work before the first rescan finishes
+        self.load()
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"App index refresh error: {e}")
+            self._stop.wait(interval)
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for Magic Wand AI Tool components
+Run all benchmarks with `python benchmark.py`, or pick some: `python benchmark.py router`
+"""
+
+import random
+import sys
+import time
+
+
+def bench_intent_router(count=100_000):
+    """Route synthetic commands through the precompiled intent router"""
+    from intent_router import build_default_router
+
+    router = build_default_router()
+    templates = [
+        "open {w}", "start {w} please", "search for {w} tutorials", "restart the computer",
+        "kill {w}", "go to {w}.com", "take screenshot", "speed test", "remind me to {w} in 5 minutes",
+        "qr code {w}", "what is the meaning of {w}", "explain {w} to me like I'm five",
+    ]
+    words = ["chrome", "notepad", "python", "spotify", "vlc", "discord", "excel", "paint"]
+    rng = random.Random(42)
+    commands = [rng.choice(templates).format(w=rng.choice(words)) for _ in range(count)]
+
+    start = time.perf_counter()
+    routed = sum(1 for command in commands if router.route(command))
+    elapsed = time.perf_counter() - start
+
+    print(f"🧭 Intent router: {count:,} commands in {elapsed * 1000:.1f} ms "
+          f"({count / elapsed:,.0f} commands/sec, {elapsed / count * 1e6:.2f} µs/command, {routed:,} routed)")
+    return elapsed
+
+
+def bench_response_cache(count=2_000):
+    """Look up a recurring set of prompts, filling the cache on misses"""
+    import os
+    import tempfile
+    from response_cache import ResponseCache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(os.path.join(tmp_dir, "cache.sqlite"), "bench-model", max_entries=count)
+        prompts = [f"fix grammar\nTemplate paragraph number {i % 50} with some text" for i in range(count)]
+
+        start = time.perf_counter()
+        for prompt in prompts:
+            if cache.get(prompt) is None:
+                cache.put(prompt, prompt.upper())
+        elapsed = time.perf_counter() - start
+        stats = cache.stats()
+        cache.close()
+
+    print(f"🗃️  Response cache: {count:,} lookups in {elapsed * 1000:.1f} ms "
+          f"({elapsed / count * 1e3:.3f} ms/lookup, hit rate {stats['hit_rate']:.0%})")
+    return elapsed
+
+
+def bench_history_writer(count=20_000):
+    """Compare batched history writes with one commit per row"""
+    import os
+    import sqlite3
+    import tempfile
+    from history_store import HistoryWriter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "history.sqlite")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE command_history (id INTEGER PRIMARY KEY, command TEXT, response TEXT, timestamp DATETIME, success BOOLEAN)")
+        single = count // 10
+        start = time.perf_counter()
+        for i in range(single):
+            conn.execute("INSERT INTO command_history (command, response, timestamp, success) VALUES (?, ?, ?, ?)",
+                         (f"open app {i}", "✅ Opened", "2024-01-01 00:00:00", True))
+            conn.commit()
+        per_row = single / (time.perf_counter() - start)
+        conn.close()
+
+        writer = HistoryWriter(db_path)
+        start = time.perf_counter()
+        for i in range(count):
+            writer.write(f"open app {i}", "✅ Opened", True)
+        writer.flush()
+        batched = count / (time.perf_counter() - start)
+        writer.shutdown()
+
+    print(f"📝 History writer: {batched:,.0f} rows/sec batched "
+          f"({writer.rows_per_second:,.0f} rows/sec inside transactions, {writer.batches_written} batches) "
+          f"vs {per_row:,.0f} rows/sec with a commit per row")
+    return batched
+
+
+def bench_history_search(count=1_000_000, queries=50):
+    """Full-text search latency over a large synthetic history"""
+    import os
+    import random
+    import tempfile
+    from history_store import HistoryWriter, connect
+
+    rng = random.Random(7)
+    verbs = ["open", "search", "explain", "translate", "summarize", "kill", "fix grammar", "remind me"]
+    topics = ["python", "chrome", "notepad", "weather", "invoice", "meeting", "recipe", "budget",
+              "football", "spotify", "holiday", "report", "database", "kubernetes", "poetry"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "history.sqlite")
+        conn = connect(db_path)
+        start = time.perf_counter()
+        with conn:
+            conn.executemany(
+                "INSERT INTO command_history (command, response, timestamp, success) VALUES (?, ?, ?, ?)",
+                ((f"{rng.choice(verbs)} {rng.choice(topics)} {i}",
+                  f"Result about {rng.choice(topics)} and {rng.choice(topics)}",
+                  f"2024-{1 + i % 12:02d}-{1 + i % 28:02d} 12:00:00", True) for i in range(count))
+            )
+        conn.close()
+        print(f"📚 History search: built {count:,} rows in {time.perf_counter() - start:.1f} s")
+
+        writer = HistoryWriter(db_path, retention_days=0, max_rows=0)
+        timings = []
+        for i in range(queries):
+            query = rng.choice(topics) if i % 2 else f"{rng.choice(verbs)} {rng.choice(topics)}"
+            start = time.perf_counter()
+            writer.search(query, page=1 + i % 3)
+            timings.append(time.perf_counter() - start)
+        writer.shutdown()
+
+    timings.sort()
+    print(f"📚 History search: {queries} queries, median {timings[len(timings) // 2] * 1000:.1f} ms, "
+          f"max {timings[-1] * 1000:.1f} ms")
+    return timings[-1]
+
+
+def bench_llm_client(count=200, concurrency=8):
+    """Compare pooled keep-alive requests with a fresh connection per request against the fake API"""
+    import http.client
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+    from fake_llm_server import FakeLLMServer
+    from llm_client import LLMClient
+
+    body = json.dumps({"contents": [{"parts": [{"text": "ping"}]}]})
+    with FakeLLMServer() as server:
+        host, port = server.url.rsplit("/", 1)[-1].split(":")
+
+        start = time.perf_counter()
+        for _ in range(count):
+            conn = http.client.HTTPConnection(host, int(port))
+            conn.request("POST", "/v1beta/models/bench:generateContent", body, {"Content-Type": "application/json"})
+            conn.getresponse().read()
+            conn.close()
+        fresh = time.perf_counter() - start
+
+        client = LLMClient("bench-key", "bench", base_url=server.url, max_connections=concurrency)
+        start = time.perf_counter()
+        for _ in range(count):
+            client.generate_content("ping")
+        pooled = time.perf_counter() - start
+        client.close()
+
+        server.delay = 0.05
+        client = LLMClient("bench-key", "bench", base_url=server.url, max_connections=concurrency)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(client.generate_content, ["ping"] * (concurrency * 4)))
+        concurrent = time.perf_counter() - start
+        connections = client.connections_opened
+        client.close()
+
+    print(f"🌐 LLM client: {count} sequential requests, fresh connections {fresh / count * 1000:.2f} ms/request, "
+          f"keep-alive {pooled / count * 1000:.2f} ms/request")
+    print(f"🌐 LLM client: {concurrency * 4} requests with 50 ms latency in {concurrent * 1000:.0f} ms "
+          f"({concurrency} in flight, {connections} connections)")
+    return pooled
+
+
+def bench_prompt_builder(size_mb=8, repeats=20):
+    """Build text prompts from a multi-megabyte clipboard with and without the token budget"""
+    import config
+    from prompt_builder import PromptBuilder, estimate_tokens
+
+    line = "2024-01-01 12:00:{:02d}  INFO   worker {:>6}   request handled in {} ms\n"
+    count = size_mb * 1024 * 1024 // len(line.format(0, 0, 10))
+    clipboard = "".join(line.format(i % 60, i % 5000, 10 + i % 90) for i in range(count))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        naive = config.PROMPT_TEMPLATE.format(command="summarize", text=clipboard)
+    naive_elapsed = (time.perf_counter() - start) / repeats
+
+    builder = PromptBuilder(config.PROMPT_TEMPLATE, config.PROMPT_MAX_INPUT_TOKENS)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        prompt = builder.build("summarize", clipboard)
+    elapsed = (time.perf_counter() - start) / repeats
+
+    print(f"✂️  Prompt builder: {len(clipboard) / 1e6:.1f} MB clipboard, format() {naive_elapsed * 1000:.2f} ms "
+          f"(~{estimate_tokens(naive):,} tokens), budgeted {elapsed * 1000:.2f} ms (~{estimate_tokens(prompt):,} tokens)")
+    return elapsed
+
+
+def bench_chunked_engine(pages=50, latency=0.2):
+    """Wall-clock time to transform a long document against the fake API at several concurrency limits"""
+    import config
+    from chunked_engine import ChunkedEngine, split_text
+    from fake_llm_server import FakeLLMServer
+    from llm_client import LLMClient
+    from prompt_builder import CHARS_PER_TOKEN
+
+    paragraph = "The quarterly report covers revenue, hiring and the product roadmap in some detail. " * 6
+    document = "\n\n".join(f"{page}.{i} {paragraph}" for page in range(pages) for i in range(6))
+    segments = split_text(document, config.CHUNK_SIZE_TOKENS * CHARS_PER_TOKEN,
+                          config.CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN)
+
+    with FakeLLMServer(reply=lambda prompt: prompt[-200:], delay=latency) as server:
+        client = LLMClient("bench-key", "bench", base_url=server.url, max_connections=16)
+        baseline = None
+        for concurrency in (1, 2, 4, 8, 16):
+            engine = ChunkedEngine(concurrency)
+            start = time.perf_counter()
+            engine.run(lambda segment: client.generate_content(segment.text).text, segments)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"🧩 Chunked engine: {pages} pages ({len(document):,} chars, {len(segments)} segments), "
+                  f"concurrency {concurrency:>2}: {elapsed:.2f} s ({baseline / elapsed:.1f}x)")
+        client.close()
+    return elapsed
+
+
+def bench_app_index(apps=3_000, lookups=20_000):
+    """Build an index over a synthetic Start Menu and time fuzzy lookups and no-change refreshes"""
+    import os
+    import random
+    import tempfile
+    from app_index import AppIndex, SHORTCUT
+
+    rng = random.Random(3)
+    vendors = ["Microsoft", "Adobe", "Google", "Mozilla", "JetBrains", "Autodesk", "Valve", "Oracle"]
+    products = ["Studio", "Player", "Editor", "Manager", "Viewer", "Tools", "Suite", "Client", "Designer"]
+    syllables = ["ka", "lo", "mi", "ter", "on", "pra", "vex", "ul", "dor", "sin", "qua", "ber", "nix", "tal"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        programs = os.path.join(tmp_dir, "Programs")
+        for i in range(apps):
+            folder = os.path.join(programs, rng.choice(vendors))
+            os.makedirs(folder, exist_ok=True)
+            brand = "".join(rng.choice(syllables) for _ in range(3)).title()
+            name = f"{rng.choice(vendors)} {brand} {rng.choice(products)}"
+            open(os.path.join(folder, f"{name}.lnk"), "w").close()
+        os.makedirs(os.path.join(programs, "Visual Studio Code"))
+        open(os.path.join(programs, "Visual Studio Code", "Visual Studio Code.lnk"), "w").close()
+
+        index = AppIndex(os.path.join(tmp_dir, "apps.json"), [(programs, True, SHORTCUT)], use_registry=False)
+        start = time.perf_counter()
+        index.refresh()
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        index.refresh()
+        refresh = time.perf_counter() - start
+        start = time.perf_counter()
+        AppIndex(index.index_path, [(programs, True, SHORTCUT)], use_registry=False).load()
+        load = time.perf_counter() - start
+
+        queries = ["vs code", "chrome", "adobe editor", "visual studio", "kalomi player", "vs coed"]
+        start = time.perf_counter()
+        for i in range(lookups):
+            index.lookup(queries[i % len(queries)])
+        elapsed = time.perf_counter() - start
+
+    print(f"🗂️  App index: {len(index):,} apps, full scan {build * 1000:.1f} ms, unchanged refresh "
+          f"{refresh * 1000:.1f} ms, load from disk {load * 1000:.1f} ms")
+    print(f"🗂️  App index: {lookups:,} lookups, {elapsed / lookups * 1e6:.1f} µs/lookup")
+    return elapsed / lookups
+
+
+def bench_fuzzy_match(count=5_000, lookups=5_000):
+    """Top-k trigram matching over thousands of app/process-like names"""
+    import random
+    from fuzzy_match import FuzzyIndex
+
+    rng = random.Random(11)
+    syllables = ["ka", "lo", "mi", "ter", "on", "pra", "vex", "ul", "dor", "sin", "qua", "ber", "nix", "tal", "fo"]
+    names = [" ".join("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+                      for _ in range(rng.randint(1, 3))) for _ in range(count)]
+    names += ["visual studio code", "spotify", "calculator", "google chrome", "notepad"]
+
+    start = time.perf_counter()
+    index = FuzzyIndex(names)
+    build = time.perf_counter() - start
+
+    queries = ["vs code", "spotfy", "calculater", "chrome browser", "notpad", "kalodor"]
+    timings = []
+    for i in range(lookups):
+        start = time.perf_counter()
+        index.search(queries[i % len(queries)], limit=5)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    print(f"🔤 Fuzzy match: {len(index):,} names indexed in {build * 1000:.1f} ms, top-5 lookup "
+          f"median {timings[len(timings) // 2] * 1e6:.0f} µs, p95 {timings[int(len(timings) * 0.95)] * 1e6:.0f} µs")
+    return timings[len(timings) // 2]
+
+
+def bench_metrics_sampler(samples=500):
+    """CPU cost of one background metrics sample, as a share of the sampling interval"""
+    import config
+    from lazy_imports import find_missing_dependencies
+    from system_monitor import MetricsSampler
+
+    if find_missing_dependencies({"psutil": "psutil"}):
+        print("📈 Metrics sampler: skipped (pip install psutil)")
+        return None
+
+    sampler = MetricsSampler(config.METRICS_SAMPLE_INTERVAL, config.METRICS_HISTORY_MINUTES * 60)
+    sampler.source.cpu_percent(interval=None)
+    start = time.thread_time()
+    for _ in range(samples):
+        sampler.sample()
+    per_sample = (time.thread_time() - start) / samples
+
+    print(f"📈 Metrics sampler: {per_sample * 1e6:.0f} µs CPU per sample, "
+          f"{per_sample / config.METRICS_SAMPLE_INTERVAL:.4%} of one core at a {config.METRICS_SAMPLE_INTERVAL}s interval")
+    return per_sample
+
+
+def bench_process_table(count=5_000, lookups=20_000):
+    """Process lookups against a cached, indexed snapshot of a synthetic process list"""
+    import contextlib
+    from types import SimpleNamespace
+    from process_table import ProcessTable
+
+    rng = random.Random(5)
+    names = ["chrome", "svchost", "code", "python", "node", "explorer", "RuntimeBroker", "conhost", "msedge"]
+    processes = {pid: f"{rng.choice(names)}{rng.randint(0, 200)}.exe" for pid in range(4, count * 4, 4)}
+
+    class Source:
+        """psutil-shaped view of the synthetic processes"""
+
+        @staticmethod
+        def pids():
+            return list(processes)
+
+        @staticmethod
+        def Process(pid):
+            name = processes[pid]
+            return SimpleNamespace(oneshot=contextlib.nullcontext, name=lambda: name, ppid=lambda: 4,
+                                   create_time=lambda: float(pid), exe=lambda: rf"C:\Program Files\{name}")
+
+    table = ProcessTable(min_refresh_interval=0, source=Source)
+    start = time.perf_counter()
+    table.refresh()
+    full = time.perf_counter() - start
+
+    for pid in list(processes)[:50]:
+        del processes[pid]
+    processes.update({pid: "notepad.exe" for pid in range(1, 200, 4)})
+    start = time.perf_counter()
+    table.refresh()
+    incremental = time.perf_counter() - start
+
+    table.min_refresh_interval = 60
+    queries = [rng.choice(list(processes.values()))[:-4] for _ in range(100)]
+    start = time.perf_counter()
+    for i in range(lookups):
+        table.find(queries[i % len(queries)])
+    per_lookup = (time.perf_counter() - start) / lookups
+
+    print(f"🧾 Process table: {len(table):,} processes, first snapshot {full * 1000:.1f} ms, "
+          f"refresh after 100 changes {incremental * 1000:.1f} ms, {per_lookup * 1e6:.1f} µs/lookup")
+    return per_lookup
+
+
+def bench_semantic_cache(count=100_000, lookups=2_000):
+    """Semantic cache lookups against a full ring of int8 command embeddings"""
+    import os
+    import tempfile
+    from lazy_imports import find_missing_dependencies
+    from semantic_cache import SemanticCache
+
+    if find_missing_dependencies({"numpy": "numpy"}):
+        print("🧠 Semantic cache: skipped (pip install numpy)")
+        return None
+
+    rng = random.Random(9)
+    words = ["summarize", "translate", "rewrite", "explain", "email", "formal", "casual", "bullet", "points",
+             "spanish", "french", "code", "python", "tone", "shorter", "meeting", "notes", "table", "list"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SemanticCache(os.path.join(tmp_dir, "cache.sqlite"), os.path.join(tmp_dir, "semantic"),
+                              "bench-model", max_entries=count)
+        start = time.perf_counter()
+        for i in range(count):
+            cache.put(" ".join(rng.sample(words, 3)), f"clipboard {i % 500}", "response")
+        fill = time.perf_counter() - start
+
+        queries = [(" ".join(rng.sample(words, 3)), f"clipboard {rng.randrange(500)}") for _ in range(100)]
+        timings = []
+        hits = 0
+        for i in range(lookups):
+            start = time.perf_counter()
+            hits += cache.get(*queries[i % len(queries)]) is not None
+            timings.append(time.perf_counter() - start)
+        cache.close()
+    timings.sort()
+
+    print(f"🧠 Semantic cache: {count:,} entries stored in {fill:.1f} s, lookup median "
+          f"{timings[len(timings) // 2] * 1000:.2f} ms, p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} ms "
+          f"({hits / lookups:.0%} hits)")
+    return timings[len(timings) // 2]
+
+
+def bench_clipboard_watcher(polls=20_000, clip_kb=256, searches=2_000):
+    """Cost of one unchanged-clipboard poll and of fuzzy search over a full clipboard history"""
+    import random
+    import config
+    from clipboard_watcher import ClipboardWatcher
+
+    rng = random.Random(5)
+    words = ["invoice", "meeting", "python", "deploy", "budget", "review", "customer", "release", "notes", "draft"]
+
+    class Clipboard:
+        text = " ".join(rng.choice(words) for _ in range(clip_kb * 1024 // 7))
+        sequence = 1
+
+        def paste(self):
+            return self.text
+
+    clipboard = Clipboard()
+    timings = {}
+    for label, counter in (("change counter", lambda: clipboard.sequence), ("digest", None)):
+        watcher = ClipboardWatcher(source=clipboard)
+        watcher.change_counter = counter
+        watcher.poll()
+        start = time.perf_counter()
+        for _ in range(polls if counter else polls // 100):
+            watcher.poll()
+        timings[label] = (time.perf_counter() - start) / (polls if counter else polls // 100)
+
+    watcher = ClipboardWatcher(max_entries=config.CLIPBOARD_HISTORY_SIZE, source=clipboard)
+    watcher.change_counter = None
+    for i in range(config.CLIPBOARD_HISTORY_SIZE):
+        clipboard.text = f"{i} " + " ".join(rng.choice(words) for _ in range(rng.randint(5, 400)))
+        watcher.poll()
+    stats = watcher.stats()
+    queries = ["invoce", "budget review", "relase notes", "customer"]
+    start = time.perf_counter()
+    for i in range(searches):
+        watcher.search(queries[i % len(queries)])
+    per_search = (time.perf_counter() - start) / searches
+
+    print(f"📋 Clipboard watcher: unchanged {clip_kb} KB clip costs {timings['change counter'] * 1e6:.1f} µs per poll "
+          f"with a change counter, {timings['digest'] * 1e6:.0f} µs by digest; {stats['clips']} clips stored in "
+          f"{stats['stored_bytes'] / 1024:.0f} KB ({stats['raw_chars'] / 1024:.0f} K chars), "
+          f"search {per_search * 1000:.2f} ms")
+    return timings["digest"]
+
+
+def bench_screen_capture(frames=12, width=3840, height=2160):
+    """Screenshot latency on a synthetic 4K frame source: synchronous PNG save vs the capture pipeline"""
+    import os
+    import tempfile
+    import config
+    from lazy_imports import find_missing_dependencies
+    from screen_capture import ScreenCapture
+
+    missing = find_missing_dependencies({"numpy": "numpy", "PIL": "Pillow"})
+    if missing:
+        print(f"📸 Screen capture: skipped (pip install {' '.join(missing)})")
+        return None
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(3)
+    # Flat desktop, a window of text-like glyph tiles and a photo; changed every other frame
+    # so about half the captures are duplicates
+    base = np.full((height, width, 4), 40, dtype=np.uint8)
+    glyphs = rng.integers(0, 2, (20, 16, 10, 1), dtype=np.uint8) * 200 + 30
+    rows = [np.concatenate([glyphs[i] for i in rng.integers(0, 20, 200)], axis=1) for _ in range(60)]
+    base[200:1160, 300:2300] = np.concatenate(rows, axis=0)
+    base[1300:1700, 2600:3200] = rng.integers(0, 256, (400, 600, 4), dtype=np.uint8)
+
+    class SyntheticSource:
+        raw_mode = "BGRX"
+        grabs = 0
+
+        def grab(self):
+            self.grabs += 1
+            frame = base.copy()
+            frame[:16, :16] = self.grabs // 2
+            return frame
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = SyntheticSource()
+        start = time.perf_counter()
+        for i in range(frames // 3):
+            Image.frombuffer("RGB", (width, height), source.grab(), "raw", "BGRX", 0, 1).save(
+                os.path.join(tmp_dir, f"sync_{i}.png"))
+        sync = (time.perf_counter() - start) / (frames // 3)
+
+        capture = ScreenCapture(tmp_dir, "png", config.SCREENSHOT_COMPRESS_LEVEL,
+                                workers=config.SCREENSHOT_ENCODE_WORKERS, source=SyntheticSource())
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(frames):
+            shot_start = time.perf_counter()
+            capture.capture()
+            latencies.append(time.perf_counter() - shot_start)
+        capture.close()
+        total = time.perf_counter() - start
+        stats = capture.stats()
+    latencies.sort()
+
+    print(f"📸 Screen capture ({width}x{height}): synchronous PNG save {sync * 1000:.0f} ms per screenshot; pipeline "
+          f"returns in {latencies[len(latencies) // 2] * 1000:.0f} ms median (grab + fingerprint), "
+          f"{stats['duplicates']} of {frames} duplicates skipped, {stats['saved']} encoded at "
+          f"{stats['encode_ms']:.0f} ms each, {total * 1000:.0f} ms until all files were written")
+    return latencies[len(latencies) // 2]
+
+
+def bench_screen_watch(frames=300, width=1920, height=1080):
+    """Frame-diff throughput of the screen watcher on a synthetic 1080p source, on one core"""
+    import threading
+    import config
+    from lazy_imports import find_missing_dependencies
+    from screen_watch import FrameDiffer, ScreenWatcher
+
+    if find_missing_dependencies({"numpy": "numpy"}):
+        print("👀 Screen watch: skipped (pip install numpy)")
+        return None
+    import numpy as np
+
+    rng = np.random.default_rng(4)
+    base = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+
+    class SyntheticSource:
+        """Static desktop whose progress bar grows every tenth frame"""
+        raw_mode = "BGRX"
+        grabs = 0
+
+        def grab(self, region=None):
+            self.grabs += 1
+            frame = base.copy()
+            frame[900:940, 200:200 + (self.grabs // 10) * 50] = 255
+            return frame
+
+    differ = FrameDiffer(config.SCREEN_WATCH_SCALE, config.SCREEN_WATCH_PIXEL_THRESHOLD,
+                         config.SCREEN_WATCH_CHANGE_THRESHOLD)
+    # Unpaced (fps far above what the source can deliver) to measure the ceiling
+    watcher = ScreenWatcher(fps=10_000, differ=differ, source=SyntheticSource())
+    sleep = threading.Event().wait
+    start = time.process_time()
+    changes = sum(1 for _ in watcher.watch(lambda timeout: watcher.frames >= frames or sleep(timeout)))
+    cpu = time.process_time() - start
+    stats = watcher.stats()
+
+    print(f"👀 Screen watch ({width}x{height}): {stats['diff_ms']:.1f} ms per downsampled diff, "
+          f"{stats['fps']:.0f} fps including the synthetic grab ({frames / cpu:.0f} fps per CPU second), "
+          f"{changes} changes reported")
+    return stats["diff_ms"]
+
+
+def bench_qr_codes(count=200, lookups=2_000):
+    """QR code render vs memo hit, and a batch rendered inline vs on the process pool"""
+    import os
+    import tempfile
+    from lazy_imports import find_missing_dependencies
+    from qr_codes import QRGenerator
+
+    missing = find_missing_dependencies({"qrcode": "qrcode[pil]", "PIL": "Pillow"})
+    if missing:
+        print(f"📱 QR codes: skipped (pip install {' '.join(missing)})")
+        return None
+
+    generator = QRGenerator()
+    start = time.perf_counter()
+    for i in range(20):
+        generator.generate(f"https://example.com/item/{i}")
+    render = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for i in range(lookups):
+        generator.generate(f"https://example.com/item/{i % 20}")
+    hit = (time.perf_counter() - start) / lookups
+
+    lines = [f"SKU-{i:05d} https://example.com/p/{i}" for i in range(count)]
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, workers in (("inline", 1), ("pool", os.cpu_count() or 1)):
+            generator = QRGenerator(workers=workers)
+            start = time.perf_counter()
+            generator.batch(lines, os.path.join(tmp_dir, f"{label}.zip"))
+            timings[label] = time.perf_counter() - start
+
+    print(f"📱 QR codes: render {render * 1000:.1f} ms, memo hit {hit * 1e6:.1f} µs; batch of {count} to zip "
+          f"{timings['inline']:.2f} s inline, {timings['pool']:.2f} s on {os.cpu_count()} worker process(es)")
+    return render
+
+
+BENCHMARKS = {
+    "router": bench_intent_router,
+    "cache": bench_response_cache,
+    "history": bench_history_writer,
+    "search": bench_history_search,
+    "llm": bench_llm_client,
+    "prompt": bench_prompt_builder,
+    "chunks": bench_chunked_engine,
+    "apps": bench_app_index,
+    "fuzzy": bench_fuzzy_match,
+    "metrics": bench_metrics_sampler,
+    "processes": bench_process_table,
+    "semantic": bench_semantic_cache,
+    "clipboard": bench_clipboard_watcher,
+    "screenshot": bench_screen_capture,
+    "watch": bench_screen_watch,
+    "qr": bench_qr_codes,
+}
+
+
+def main():
+    """Run the selected benchmarks"""
+    print("⏱️  Magic Wand AI Tool - Benchmarks")
+    print("=" * 40)
+
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"❌ Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            continue
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
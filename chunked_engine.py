@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Chunked Engine for the Ultimate AI Assistant
+Splits long text into overlapping segments and maps them concurrently, yielding results in order.
+"""
+
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# text is the part to transform; context is the overlap preceding it, sent for reference only
+Segment = namedtuple("Segment", ["index", "start", "end", "text", "context"])
+
+# Preferred places to end a segment, best first
+_BREAKS = ("\n\n", "\n", ". ", "? ", "! ", " ")
+
+
+def _break_point(text, low, high):
+    """Latest natural boundary in text[low:high], or high if there is none"""
+    for separator in _BREAKS:
+        position = text.rfind(separator, low, high)
+        if position != -1:
+            return position + len(separator)
+    return high
+
+
+def split_text(text, chunk_chars, overlap_chars=0):
+    """Split text into segments of at most chunk_chars, each carrying up to overlap_chars of preceding context"""
+    segments = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + chunk_chars)
+        if end < len(text):
+            end = _break_point(text, start + chunk_chars // 2, end)
+
+        context = ""
+        if overlap_chars and start:
+            context_start = max(0, start - overlap_chars)
+            context = text[context_start:start]
+            # Start the context on a word boundary
+            space = context.find(" ")
+            if context_start and 0 <= space < len(context) - 1:
+                context = context[space + 1:]
+
+        segments.append(Segment(len(segments), start, end, text[start:end], context))
+        start = end
+    return segments
+
+
+def joiner(segment):
+    """Separator to put after a transformed segment so stitched output keeps the original layout"""
+    if segment.text.endswith("\n\n"):
+        return "\n\n"
+    if segment.text.endswith("\n"):
+        return "\n"
+    return " "
+
+
+class ChunkedEngine:
+    """Runs a function over many items with a concurrency cap, yielding results in input order"""
+
+    def __init__(self, max_concurrency=4):
+        self.max_concurrency = max(1, max_concurrency)
+
+    def map_ordered(self, func, items, progress=None):
+        """Yield func(item) for each item in order; progress(done, total) is called as each finishes"""
+        items = list(items)
+        total = len(items)
+        done = [0]
+        lock = threading.Lock()
+
+        def finished(future):
+            if progress is None or future.cancelled():
+                return
+            with lock:
+                done[0] += 1
+                count = done[0]
+            progress(count, total)
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_concurrency, total or 1), thread_name_prefix="chunk")
+        try:
+            futures = []
+            for item in items:
+                future = pool.submit(func, item)
+                future.add_done_callback(finished)
+                futures.append(future)
+            for future in futures:
+                yield future.result()
+        finally:
+            # Closing the generator early (cancelled command) drops segments that have not started
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, func, items, reduce=None, progress=None):
+        """Map every item and return the ordered results, or reduce(results) when given"""
+        results = list(self.map_ordered(func, items, progress))
+        return reduce(results) if reduce else results
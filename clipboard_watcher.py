@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Clipboard Watcher for the Ultimate AI Assistant
+Background clipboard polling with hash-based dedup and a bounded, compressed history of recent clips.
+"""
+
+import hashlib
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+from fuzzy_match import FuzzyIndex, normalize
+from lazy_imports import lazy_import
+
+pyperclip = lazy_import("pyperclip")
+
+# A clip as returned by history() and search(); text is decompressed
+Clip = namedtuple("Clip", ["text", "copied_at", "size"])
+
+# Query words shorter than this are matched by substring only
+_MIN_FUZZY_WORD = 3
+
+
+def windows_change_counter():
+    """GetClipboardSequenceNumber on Windows (changes on every copy, costs no clipboard access), else None"""
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+        return ctypes.windll.user32.GetClipboardSequenceNumber
+    except (ImportError, AttributeError, OSError):
+        return None
+
+
+def copy_image(png):
+    """Put a PNG on the Windows clipboard as a bitmap; returns False where that is not supported"""
+    if sys.platform != "win32":
+        return False
+    import io
+    import win32clipboard
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.open(io.BytesIO(png)).convert("RGB").save(output, "BMP")
+    # CF_DIB is the bitmap file without its 14-byte file header
+    win32clipboard.OpenClipboard()
+    try:
+        win32clipboard.EmptyClipboard()
+        win32clipboard.SetClipboardData(win32clipboard.CF_DIB, output.getvalue()[14:])
+    finally:
+        win32clipboard.CloseClipboard()
+    return True
+
+
+class _Entry:
+    """Stored clip: UTF-8 bytes, zlib-compressed when that saves space"""
+
+    __slots__ = ("data", "compressed", "size", "copied_at")
+
+    def __init__(self, text, copied_at, compress_over):
+        data = text.encode("utf-8")
+        self.size = len(text)
+        self.compressed = False
+        if len(data) > compress_over:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                data, self.compressed = packed, True
+        self.data = data
+        self.copied_at = copied_at
+
+    def text(self):
+        data = zlib.decompress(self.data) if self.compressed else self.data
+        return data.decode("utf-8")
+
+
+class ClipboardWatcher:
+    """Keeps the current clip and the last max_entries distinct clips, newest first
+
+    Polls a change counter when the platform has one and only reads the clipboard
+    after it moves; otherwise reads it and compares a digest with the current clip.
+    """
+
+    def __init__(self, interval=0.5, max_entries=50, compress_over=1024, max_clip_chars=1_000_000,
+                 source=None, change_counter=None):
+        self.interval = interval
+        self.max_entries = max_entries
+        self.compress_over = compress_over
+        # Larger clips are handed to the spotlight but not kept in the history
+        self.max_clip_chars = max_clip_chars
+        self.source = pyperclip if source is None else source
+        self.change_counter = windows_change_counter() if change_counter is None else change_counter
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._current = None
+        self._current_digest = None
+        self._counter = None
+        self._fuzzy = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.reads = 0
+        self.changes = 0
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def poll(self):
+        """Check the clipboard once; returns True when it holds a new clip"""
+        self.polls += 1
+        if self.change_counter is not None:
+            try:
+                counter = self.change_counter()
+            except Exception:
+                counter = None
+            if counter is not None and counter == self._counter:
+                return False
+            self._counter = counter
+
+        try:
+            text = self.source.paste()
+        except Exception:
+            return False
+        self.reads += 1
+        if not isinstance(text, str):
+            return False
+
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            if digest == self._current_digest:
+                return False
+            self._current, self._current_digest = text, digest
+            if text.strip() and len(text) <= self.max_clip_chars:
+                self._remember(digest, text)
+            self.changes += 1
+            return True
+
+    def _remember(self, digest, text):
+        """Move a clip to the front of the history, evicting the oldest past max_entries"""
+        if digest in self._entries:
+            # Copied again: refresh its time and position instead of keeping a duplicate
+            self._entries[digest].copied_at = time.time()
+            self._entries.move_to_end(digest)
+        else:
+            self._entries[digest] = _Entry(text, time.time(), self.compress_over)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._fuzzy = None
+
+    def current(self, fresh=True):
+        """Text on the clipboard without blocking on it, or None before the first read
+
+        With fresh and a change counter, a copy made since the last poll is read now;
+        without a counter the result can be up to one interval old.
+        """
+        if fresh and self.change_counter is not None:
+            self.poll()
+        with self._lock:
+            return self._current
+
+    # ------------------------------------------------------------------
+    # History
+    # ------------------------------------------------------------------
+
+    def history(self, limit=None):
+        """Recent distinct clips, newest first"""
+        with self._lock:
+            entries = list(reversed(self._entries.values()))
+        return [Clip(entry.text(), entry.copied_at, entry.size) for entry in entries[:limit]]
+
+    def search(self, query, limit=5, min_score=0.5):
+        """Clips containing query, then clips whose words fuzzily match its words, best first"""
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        words = [word for word in normalized.split() if len(word) >= _MIN_FUZZY_WORD]
+
+        with self._lock:
+            entries = list(reversed(self._entries.values()))
+            if self._fuzzy is None:
+                # Rebuilt only after the history changed; one key per distinct word of each clip
+                self._fuzzy = FuzzyIndex(
+                    (word, position)
+                    for position, entry in enumerate(entries)
+                    for word in set(normalize(entry.text()).split()) if len(word) >= _MIN_FUZZY_WORD
+                )
+            fuzzy = self._fuzzy
+
+        scores = {}
+        for word in words:
+            best = {}
+            for match in fuzzy.search(word, limit=len(fuzzy), min_score=min_score):
+                best[match.value] = max(best.get(match.value, 0.0), match.score)
+            for position, score in best.items():
+                scores[position] = scores.get(position, 0.0) + score / len(words)
+
+        ranked = []
+        for position, entry in enumerate(entries):
+            text = entry.text()
+            score = scores.get(position, 0.0)
+            if normalized in normalize(text):
+                score += 2.0
+            if score >= min_score:
+                # Ties go to the more recent clip
+                ranked.append((score, -position, Clip(text, entry.copied_at, entry.size)))
+        ranked.sort(key=lambda item: item[:2], reverse=True)
+        return [clip for _, _, clip in ranked[:limit]]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Poll counters and how much memory the history takes"""
+        with self._lock:
+            stored = sum(len(entry.data) for entry in self._entries.values())
+            raw = sum(entry.size for entry in self._entries.values())
+            return {"clips": len(self._entries), "stored_bytes": stored, "raw_chars": raw,
+                    "polls": self.polls, "reads": self.reads, "changes": self.changes}
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start polling on a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="clipboard-watcher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.poll()
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        """Stop the polling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
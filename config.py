@@ -64,6 +64,16 @@ Selected text:
 Please transform the text according to the user's command. Return ONLY the transformed text, nothing else.
 """
 
+# Selected text beyond this many (estimated) tokens is compacted and truncated before sending
+PROMPT_MAX_INPUT_TOKENS = 8000
+
+# Selected text longer than one chunk is split into overlapping parts processed concurrently
+# (parts in flight are also limited by API_MAX_CONNECTIONS)
+CHUNK_SIZE_TOKENS = 2000
+CHUNK_OVERLAP_TOKENS = 100
+CHUNK_MAX_CONCURRENCY = 4
+CHUNK_MAX_SEGMENTS = 50
+
 # ============================================================================
 # SYSTEM TRAY CONFIGURATION
 # ============================================================================
@@ -96,12 +106,132 @@ VERBOSE_LOGGING = False
 # Threading settings
 MAX_WORKER_THREADS = 2
 
+# Interval at which queued UI updates are applied on the main thread (milliseconds)
+UI_BUS_INTERVAL_MS = 16
+
 # API timeout settings (seconds)
 API_TIMEOUT = 30
 
+# AI service endpoint and how many keep-alive connections may be open to it at once
+API_BASE_URL = "https://generativelanguage.googleapis.com"
+API_MAX_CONNECTIONS = 4
+
 # Clipboard settings
 CLIPBOARD_TIMEOUT = 5
 
+# Clipboard watcher: seconds between checks, distinct clips kept for "clipboard history",
+# and the size above which a stored clip is compressed (characters)
+CLIPBOARD_POLL_INTERVAL = 0.5
+CLIPBOARD_HISTORY_SIZE = 50
+CLIPBOARD_COMPRESS_OVER = 1024
+
+# How often the application index rescans Start Menu, PATH and registry for changes (seconds)
+APP_INDEX_REFRESH_INTERVAL = 15 * 60
+
+# Background system metrics: seconds between samples and how much history is kept (minutes)
+METRICS_SAMPLE_INTERVAL = 2
+METRICS_HISTORY_MINUTES = 30
+
+# Window reported by "system info" when the command does not name one (minutes)
+METRICS_SUMMARY_MINUTES = 5
+
+# Minimum time between process table refreshes; lookups in between use the cached snapshot (seconds)
+PROCESS_TABLE_REFRESH_INTERVAL = 1.0
+
+# "top processes": how often the live view refreshes (seconds) and how many processes it lists
+PROCESS_MONITOR_INTERVAL = 1.0
+PROCESS_MONITOR_TOP_N = 10
+
+# ============================================================================
+# CACHE CONFIGURATION
+# ============================================================================
+
+# Cache AI responses so repeated command + text pairs skip the API round trip
+RESPONSE_CACHE_ENABLED = True
+
+# Maximum number of cached responses (least recently used are evicted first)
+RESPONSE_CACHE_MAX_ENTRIES = 500
+
+# Cached responses older than this are discarded, by both the exact and the semantic cache (seconds)
+RESPONSE_CACHE_TTL = 24 * 3600
+
+# Reuse responses for reworded commands on the same text ("summarize this" / "give me a summary")
+SEMANTIC_CACHE_ENABLED = True
+
+# Maximum number of remembered commands (the oldest are overwritten first)
+SEMANTIC_CACHE_MAX_ENTRIES = 100_000
+
+# Minimum cosine similarity between two commands for a cached response to be reused (0-1)
+SEMANTIC_CACHE_THRESHOLD = 0.9
+
+# Local embedding function as "module:function" (text -> vector); empty uses the built-in offline embedder
+SEMANTIC_CACHE_EMBEDDER = ""
+
+# ============================================================================
+# HISTORY CONFIGURATION
+# ============================================================================
+
+# Commands older than this are removed from the history database (days)
+HISTORY_RETENTION_DAYS = 180
+
+# Maximum number of commands kept in the history database
+HISTORY_MAX_ROWS = 100_000
+
+# Longer responses are truncated before being stored
+HISTORY_MAX_RESPONSE_CHARS = 4000
+
+# Results per page for 'history search'
+HISTORY_PAGE_SIZE = 10
+
+# ============================================================================
+# SCREENSHOT CONFIGURATION
+# ============================================================================
+
+# Screenshots are saved in per-day folders under this directory
+SCREENSHOT_DIR = os.path.join(os.path.expanduser("~"), "Pictures", "Magic Wand Screenshots")
+
+# File format: "png", "jpg", "webp" or "bmp"
+SCREENSHOT_FORMAT = "png"
+
+# PNG compression level (0-9); 1 is several times faster to encode than the default 6 for a slightly larger file
+SCREENSHOT_COMPRESS_LEVEL = 1
+
+# JPEG/WebP quality (1-100)
+SCREENSHOT_QUALITY = 90
+
+# Background threads encoding screenshots
+SCREENSHOT_ENCODE_WORKERS = 2
+
+# "watch screen": frames captured per second, and the side of the pixel blocks frames are averaged into
+SCREEN_WATCH_FPS = 10
+SCREEN_WATCH_SCALE = 8
+
+# A block changed when its mean brightness moved by more than this (0-255); a frame changed when
+# at least this share of its blocks did, or at least SCREEN_WATCH_MIN_BLOCKS blocks (so a small
+# dialog or a line of text counts on a full screen, while a blinking cursor does not)
+SCREEN_WATCH_PIXEL_THRESHOLD = 24
+SCREEN_WATCH_CHANGE_THRESHOLD = 0.005
+SCREEN_WATCH_MIN_BLOCKS = 4
+
+# A forgotten watch stops by itself after this long (minutes)
+SCREEN_WATCH_MAX_MINUTES = 60
+
+# ============================================================================
+# QR CODE CONFIGURATION
+# ============================================================================
+
+# Pixels per QR module, quiet-zone width (modules) and error correction level ("L", "M", "Q" or "H")
+QR_BOX_SIZE = 10
+QR_BORDER = 4
+QR_ERROR_CORRECTION = "M"
+
+# Recently generated codes kept in memory, keyed by text and the settings above
+QR_CACHE_SIZE = 128
+
+# "qr batch": where zips and sprite sheets are written, and worker processes (None = one per CPU)
+QR_OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "Pictures", "Magic Wand QR Codes")
+QR_BATCH_WORKERS = None
+
 # ============================================================================
 # ENVIRONMENT DETECTION
 # ============================================================================
@@ -8,6 +8,7 @@ import os
 import sys
 import config
 import google.generativeai as genai
+from prompt_builder import PromptBuilder
 
 def demo_text_transformations():
     """Demonstrate various text transformations"""
@@ -58,6 +59,8 @@ def demo_text_transformations():
         print(f"❌ API connection failed: {e}")
         return False
     
+    prompt_builder = PromptBuilder(config.PROMPT_TEMPLATE, config.PROMPT_MAX_INPUT_TOKENS)
+    
     print(f"\n🎯 Running {len(demos)} demo transformations...")
     print("=" * 50)
     
@@ -70,10 +73,7 @@ def demo_text_transformations():
         
         try:
             # Create the prompt
-            prompt = config.PROMPT_TEMPLATE.format(
-                command=demo['command'],
-                text=demo['text']
-            )
+            prompt = prompt_builder.build(demo['command'], demo['text'])
             
             # Get AI response
             response = model.generate_content(prompt)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Fake LLM Server for the AI Assistants
+Local stand-in for the Gemini REST API used by tests and benchmarks.
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def echo_reply(prompt):
+    """Default reply: echo the prompt back"""
+    return f"Echo: {prompt}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # An idle keep-alive connection is closed after the server's idle timeout
+        self.timeout = self.server.fake.idle_timeout
+        self.served = 0
+        super().setup()
+        with self.server.fake._lock:
+            self.server.fake.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if fake.requests_per_connection and self.served >= fake.requests_per_connection:
+            # Hang up without a response, like a server that closed the connection as the request arrived
+            self.close_connection = True
+            return
+        self.served += 1
+        try:
+            prompt = request["contents"][-1]["parts"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            self._send_json(400, {"error": {"code": 400, "message": "Invalid request"}})
+            return
+
+        with fake._lock:
+            fake.requests += 1
+            fake.prompts.append(prompt)
+            fake.active += 1
+            fake.max_active = max(fake.max_active, fake.active)
+            fake.api_keys.add(self.headers.get("x-goog-api-key"))
+        try:
+            time.sleep(fake.delay)
+            if "FAIL" in prompt:
+                self._send_json(500, {"error": {"code": 500, "message": "Internal error"}})
+            elif ":streamGenerateContent" in self.path:
+                self._send_stream(fake.reply(prompt), fake.chunks, fake.chunk_delay)
+            elif ":generateContent" in self.path:
+                self._send_json(200, self._payload(fake.reply(prompt)))
+            else:
+                self._send_json(404, {"error": {"code": 404, "message": "Unknown method"}})
+        finally:
+            with fake._lock:
+                fake.active -= 1
+
+    @staticmethod
+    def _payload(text):
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, text, chunks, chunk_delay):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        size = max(1, -(-len(text) // max(1, chunks)))
+        for start in range(0, len(text), size):
+            event = f"data: {json.dumps(self._payload(text[start:start + size]))}\r\n\r\n".encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+            self.wfile.flush()
+            time.sleep(chunk_delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose when a request is cancelled or times out
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeLLMServer:
+    """Threaded HTTP/1.1 server answering generateContent and streamGenerateContent"""
+
+    def __init__(self, reply=echo_reply, delay=0.0, chunks=3, chunk_delay=0.0, idle_timeout=None,
+                 requests_per_connection=None):
+        self.reply = reply
+        self.delay = delay
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.idle_timeout = idle_timeout
+        self.requests_per_connection = requests_per_connection
+        self.requests = 0
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.prompts = []
+        self.api_keys = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Listen on a free localhost port"""
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Matching for the AI Assistants
+Trigram index that ranks app, process and command names against misspelled or partial queries.
+"""
+
+import heapq
+import re
+from collections import namedtuple
+
+FuzzyMatch = namedtuple("FuzzyMatch", ["score", "key", "value"])
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase words separated by single spaces"""
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def trigrams(normalized):
+    """Set of padded character trigrams of normalized text"""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """Precomputed trigram postings with Dice-coefficient scoring"""
+
+    def __init__(self, items=(), max_candidates=64):
+        # items are names or (name, value) pairs
+        # Queries whose trigrams are all common score only this many candidates (or limit, if larger)
+        self.max_candidates = max_candidates
+        self._keys = []
+        self._words = []
+        self._values = []
+        self._grams = []
+        self._postings = {}
+        self._masks = None
+        for item in items:
+            if isinstance(item, str):
+                self.add(item)
+            else:
+                self.add(*item)
+
+    def add(self, key, value=None):
+        """Index a name; value is returned with matches (defaults to the name itself)"""
+        normalized = normalize(key)
+        if not normalized:
+            return
+        item_id = len(self._keys)
+        grams = trigrams(normalized)
+        self._keys.append(normalized)
+        self._words.append(frozenset(normalized.split()))
+        self._values.append(key if value is None else value)
+        self._grams.append(frozenset(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(item_id)
+        self._masks = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, query, limit=5, min_score=0.3):
+        """Top matches for a query, best first
+
+        The score is the trigram Dice coefficient (0-1) plus a bonus when the query
+        equals (+1), prefixes (+0.5) or is contained in (+0.25) the name, and up to
+        +0.25 for the share of the name's words that appear in the query.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        grams = trigrams(normalized)
+
+        query_size = len(grams)
+        # A name must share at least a quarter of the query's trigrams (fewer, e.g. only a common
+        # first letter, is noise). By pigeonhole it then contains one of the rarest
+        # len(postings) - required + 1 indexed trigrams, so candidates come from those lists only.
+        # When those lists are long, only the names sharing the most trigrams are scored.
+        required = max(1, -(-query_size // 4))
+        postings = sorted((self._postings[gram] for gram in grams if gram in self._postings), key=len)
+        postings = postings[:max(0, len(postings) - required + 1)]
+        cap = max(self.max_candidates, limit)
+        if sum(map(len, postings)) <= cap:
+            candidates = set().union(*postings)
+        else:
+            candidates = self._most_shared(grams, required, cap)
+
+        query_words = set(normalized.split())
+        keys, words, item_grams = self._keys, self._words, self._grams
+        scored = []
+        for item_id in candidates:
+            count = len(grams & item_grams[item_id])
+            if count < required:
+                continue
+            score = 2.0 * count / (query_size + len(item_grams[item_id]))
+            key = keys[item_id]
+            if key == normalized:
+                score += 1.0
+            elif key.startswith(normalized):
+                score += 0.5
+            elif normalized in key:
+                score += 0.25
+            overlap = len(query_words & words[item_id])
+            if overlap:
+                score += 0.25 * overlap / len(words[item_id])
+            if score >= min_score:
+                # Ties go to the shorter, then the earlier added name
+                scored.append((score, -len(key), -item_id))
+
+        return [FuzzyMatch(score, keys[-negated_id], self._values[-negated_id])
+                for score, _, negated_id in heapq.nlargest(limit, scored)]
+
+    def _bitsets(self):
+        """Postings as integer bitsets over item ids, rebuilt on first use after an add"""
+        masks = self._masks
+        if masks is None:
+            size = len(self._keys) // 8 + 1
+            masks = {}
+            for gram, item_ids in self._postings.items():
+                bits = bytearray(size)
+                for item_id in item_ids:
+                    bits[item_id >> 3] |= 1 << (item_id & 7)
+                masks[gram] = int.from_bytes(bits, "little")
+            self._masks = masks
+        return masks
+
+    def _most_shared(self, grams, required, cap):
+        """Up to cap item ids sharing the most of the query's trigrams (at least required)
+
+        at_least[k] is the set of items sharing k or more trigrams, built with AND/OR over
+        bitsets, so the cost grows with the query's length rather than with how many items
+        a common trigram appears in. Ties within a level go to earlier added names.
+        """
+        masks = self._bitsets()
+        present = [masks[gram] for gram in grams if gram in masks]
+        top = len(present)
+        at_least = [-1] + [0] * (top + 1)
+        for i, mask in enumerate(present):
+            for k in range(i + 1, 0, -1):
+                at_least[k] |= at_least[k - 1] & mask
+
+        chosen = []
+        for k in range(top, required - 1, -1):
+            # Bit i of the level is item i; read the set bits from the reversed binary string
+            bits = bin(at_least[k] & ~at_least[k + 1])[:1:-1]
+            position = bits.find("1")
+            while position >= 0 and len(chosen) < cap:
+                chosen.append(position)
+                position = bits.find("1", position + 1)
+            if len(chosen) >= cap:
+                break
+        return chosen
+
+    def best(self, query, min_score=0.3):
+        """Single best match, or None"""
+        matches = self.search(query, limit=1, min_score=min_score)
+        return matches[0] if matches else None
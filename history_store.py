@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+History Store for the Ultimate AI Assistant
+Write-behind queue that batches command_history inserts on a dedicated thread,
+plus full-text search and retention over the stored history.
+"""
+
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+_STOP = object()
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Matches considered for ranking; the most recent ones win when a term is very common
+SEARCH_CANDIDATES = 1000
+
+
+def connect(db_path):
+    """Open a connection configured for the history database"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0:
+        # A database created without auto_vacuum only switches mode after one full VACUUM
+        conn.execute("VACUUM")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS command_history (
+            id INTEGER PRIMARY KEY,
+            command TEXT,
+            response TEXT,
+            timestamp DATETIME,
+            success BOOLEAN
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_command_history_timestamp ON command_history (timestamp)")
+
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'command_history_fts'"
+    ).fetchone()
+    if not has_fts:
+        conn.executescript('''
+            CREATE VIRTUAL TABLE command_history_fts USING fts5(
+                command, response, content='command_history', content_rowid='id',
+                tokenize='porter unicode61'
+            );
+            CREATE TRIGGER command_history_ai AFTER INSERT ON command_history BEGIN
+                INSERT INTO command_history_fts (rowid, command, response)
+                VALUES (new.id, new.command, new.response);
+            END;
+            CREATE TRIGGER command_history_ad AFTER DELETE ON command_history BEGIN
+                INSERT INTO command_history_fts (command_history_fts, rowid, command, response)
+                VALUES ('delete', old.id, old.command, old.response);
+            END;
+            INSERT INTO command_history_fts (command_history_fts) VALUES ('rebuild');
+        ''')
+    conn.commit()
+    return conn
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query where every (stemmed) word must match"""
+    words = _WORD_RE.findall(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+class HistoryWriter:
+    """Owns the history connection and writes queued rows in batched transactions"""
+
+    def __init__(self, db_path, batch_size=100, flush_interval=0.5, max_response_chars=4000,
+                 retention_days=180, max_rows=100_000, compact_interval=24 * 3600):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_response_chars = max_response_chars
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.compact_interval = compact_interval
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rows_compacted = 0
+        self.write_seconds = 0.0
+        self._last_compaction = 0.0
+        self._queue = queue.Queue()
+        self._readers = threading.local()
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    def write(self, command, response, success=True):
+        """Queue a history row; returns immediately"""
+        if self.max_response_chars and len(response) > self.max_response_chars:
+            response = response[:self.max_response_chars] + "\n... [truncated]"
+        self._queue.put((command, response, datetime.now().isoformat(" "), success))
+
+    def flush(self):
+        """Block until every queued row has been committed"""
+        self._queue.join()
+
+    def shutdown(self):
+        """Flush outstanding rows and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    @property
+    def pending(self):
+        """Rows waiting to be written"""
+        return self._queue.qsize()
+
+    @property
+    def rows_per_second(self):
+        """Insert throughput measured over time spent writing"""
+        return self.rows_written / self.write_seconds if self.write_seconds else 0.0
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, text, page=1, page_size=10):
+        """Ranked full-text search over commands and responses, one page at a time"""
+        match = build_match_query(text)
+        if match is None:
+            return []
+
+        conn = self._reader()
+        rows = conn.execute('''
+            SELECT h.id, h.command, h.response, h.timestamp, h.success
+            FROM (
+                SELECT rowid, bm25(command_history_fts, 2.0, 1.0) AS score
+                FROM command_history_fts
+                WHERE command_history_fts MATCH ?
+                ORDER BY rowid DESC
+                LIMIT ?
+            ) AS hits
+            JOIN command_history AS h ON h.id = hits.rowid
+            ORDER BY hits.score, h.id DESC
+            LIMIT ? OFFSET ?
+        ''', (match, SEARCH_CANDIDATES, page_size, (max(page, 1) - 1) * page_size)).fetchall()
+        return rows
+
+    def recent(self, since, limit=50):
+        """Most recent rows newer than a datetime, using the timestamp index"""
+        conn = self._reader()
+        return conn.execute(
+            "SELECT id, command, response, timestamp, success FROM command_history "
+            "WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?",
+            (since.isoformat(" "), limit)
+        ).fetchall()
+
+    def _reader(self):
+        """Per-thread read connection (WAL lets readers run alongside the writer)"""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            self._readers.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        """Writer loop: collect a batch, insert it in one transaction, repeat"""
+        try:
+            conn = connect(self.db_path)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._compact(conn)
+        self._ready.set()
+
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(conn, batch)
+            if time.monotonic() - self._last_compaction > self.compact_interval:
+                self._compact(conn)
+
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        """Insert a batch of rows in a single transaction"""
+        start = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO command_history (command, response, timestamp, success) VALUES (?, ?, ?, ?)",
+                    batch
+                )
+            self.rows_written += len(batch)
+            self.batches_written += 1
+        except Exception as e:
+            print(f"History save error: {e}")
+        finally:
+            self.write_seconds += time.perf_counter() - start
+            for _ in batch:
+                self._queue.task_done()
+
+    def _compact(self, conn):
+        """Apply the retention policy and reclaim the space it frees"""
+        self._last_compaction = time.monotonic()
+        try:
+            with conn:
+                removed = 0
+                if self.retention_days:
+                    cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat(" ")
+                    removed += conn.execute(
+                        "DELETE FROM command_history WHERE timestamp < ?", (cutoff,)
+                    ).rowcount
+                if self.max_rows:
+                    removed += conn.execute(
+                        "DELETE FROM command_history WHERE id <= "
+                        "(SELECT id FROM command_history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (self.max_rows,)
+                    ).rowcount
+                if removed:
+                    conn.execute("INSERT INTO command_history_fts (command_history_fts) VALUES ('optimize')")
+            if removed:
+                conn.execute("PRAGMA incremental_vacuum").fetchall()
+            self.rows_compacted += removed
+        except Exception as e:
+            print(f"History compaction error: {e}")
@@ -119,11 +119,10 @@ def install_advanced_dependencies():
     print("\n🚀 Installing advanced feature dependencies...")
     
     advanced_packages = [
-        "pyautogui>=0.9.54",
+        "mss>=9.0.0",
         "speedtest-cli>=2.1.3",
         "qrcode[pil]>=7.4.2",
         "plyer>=2.1.0",
-        "schedule>=1.2.0",
         "requests>=2.31.0",
         "python-dotenv>=1.0.0",
         "opencv-python>=4.8.0"
@@ -147,7 +146,7 @@ def test_installation():
         ("pynput", "Hotkey detection"),
         ("psutil", "System monitoring"),
         ("pyttsx3", "Text-to-speech"),
-        ("pyautogui", "Screenshot capability"),
+        ("mss", "Screenshot capability"),
         ("qrcode", "QR code generation"),
         ("plyer", "System notifications")
     ]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Intent Router for the Ultimate AI Assistant
+Routes a command to an intent in a single pass using a precompiled keyword trie.
+"""
+
+import re
+from collections import namedtuple
+
+# Result of routing a command
+# name: intent name, keyword: phrase that matched, argument: text after the
+# keyword (or before it when nothing follows), command: the original command
+IntentMatch = namedtuple("IntentMatch", ["name", "keyword", "argument", "command"])
+
+_TOKEN_RE = re.compile(r"\S+")
+_PUNCTUATION = ".,:;!?\"'()[]{}"
+
+# ============================================================================
+# DEFAULT INTENT TABLE
+# ============================================================================
+
+# (intent, priority, keywords, filler words stripped from the argument)
+# Higher priority wins when several intents match the same command, so
+# specific phrases ("speed test", "restart") beat generic verbs ("start").
+DEFAULT_INTENTS = [
+    ("history_search", 95, ["history search", "search history"], ("for",)),
+    ("startup_report", 95, ["startup report", "startup time"], ()),
+    ("clipboard_history", 95, ["clipboard history", "clipboard search", "search clipboard", "paste history"],
+     ("for",)),
+    ("stop_watch_screen", 95, ["stop watching", "stop screen watch", "stop recording screen"], ()),
+    ("stats", 95, ["assistant stats", "show stats", "cache stats", "ai stats"], ()),
+    ("wifi_passwords", 90, ["wifi password", "wifi passwords", "wifi info"], ()),
+    ("speed_test", 90, ["speed test", "network speed"], ()),
+    ("system_info", 90, ["system info", "system status"], ()),
+    ("top_processes", 90, ["top processes", "process monitor", "eating my cpu", "using my cpu",
+                           "eating my memory", "using my memory"], ()),
+    ("watch_screen", 90, ["watch screen", "watch the screen", "watching screen", "watching the screen",
+                          "watch region", "screen watch", "record screen", "screen changes", "monitor screen"], ()),
+    ("installed_programs", 90, ["installed programs", "list programs"], ()),
+    ("empty_recycle_bin", 90, ["empty recycle bin", "clear trash"], ()),
+    ("create_file", 90, ["create file", "new file", "make file"], ()),
+    ("send_email", 90, ["send email"], ()),
+    ("reminder", 90, ["remind me", "set reminder"], ()),
+    ("voice_input", 90, ["voice input"], ()),
+    ("qr_batch", 90, ["qr batch", "batch qr", "bulk qr", "qr sheet", "qr codes from clipboard"], ()),
+    ("qr_code", 85, ["qr code", "qr codes"], ()),
+    ("power", 80, ["shutdown", "restart", "reboot", "sleep", "hibernate"], ()),
+    ("screenshot", 70, ["screenshot", "take screenshot"], ()),
+    ("battery", 70, ["battery", "power status"], ()),
+    ("notification", 70, ["notification", "notify"], ()),
+    ("listen", 70, ["listen"], ()),
+    ("speak", 60, ["speak", "say"], ()),
+    ("website", 50, ["website", "browse", "go to"], ()),
+    ("search", 40, ["search", "google", "find"], ("for",)),
+    # Kill verbs outrank launch verbs so "kill node dry run" previews instead of running anything
+    ("kill_process", 35, ["kill", "close", "stop"], ()),
+    ("app_launch", 30, ["open", "launch", "start", "run"], ()),
+]
+
+# Intents whose keywords only count at the start of the command (after LEAD_WORDS), so
+# "search for how to restart windows" searches and "open google chrome" opens an app
+ANCHORED_INTENTS = ("power", "search", "qr_code")
+
+# Words that may come before an anchored keyword ("please restart", "generate a qr code ...")
+LEAD_WORDS = frozenset(["please", "now", "generate", "create", "make", "show", "me", "a", "an", "the"])
+
+
+class IntentRouter:
+    """Precompiled keyword trie that maps a command to its highest-priority intent"""
+
+    def __init__(self, intents=None):
+        self._trie = {}
+        self._priorities = {}
+        self._fillers = {}
+        self._order = {}
+        self._anchored = set()
+        for name, priority, keywords, fillers in (intents or []):
+            self.add_intent(name, keywords, priority, fillers, anchored=name in ANCHORED_INTENTS)
+
+    def add_intent(self, name, keywords, priority=0, fillers=(), anchored=False):
+        """Register an intent with its trigger phrases
+
+        An anchored intent matches only when its keyword starts the command,
+        optionally after LEAD_WORDS.
+        """
+        self._priorities[name] = priority
+        self._fillers[name] = tuple(fillers)
+        if anchored:
+            self._anchored.add(name)
+        self._order.setdefault(name, len(self._order))
+        for keyword in keywords:
+            node = self._trie
+            for word in keyword.lower().split():
+                node = node.setdefault(word, {})
+            node[None] = (name, keyword)
+
+    @property
+    def intents(self):
+        """Names of all registered intents"""
+        return list(self._priorities)
+
+    def route(self, command):
+        """Return the best IntentMatch for a command, or None if no intent matches"""
+        tokens = [(m.group().strip(_PUNCTUATION).lower(), m.start(), m.end())
+                  for m in _TOKEN_RE.finditer(command)]
+
+        lead = 0
+        while lead < len(tokens) and tokens[lead][0] in LEAD_WORDS:
+            lead += 1
+
+        best = None
+        best_rank = None
+        for i in range(len(tokens)):
+            node = self._trie
+            j = i
+            while j < len(tokens):
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                j += 1
+                terminal = node.get(None)
+                if terminal is None:
+                    continue
+                name = terminal[0]
+                if i > lead and name in self._anchored:
+                    continue
+                # Higher priority first, then longer phrase, then earlier position
+                rank = (self._priorities[name], j - i, -i, -self._order[name])
+                if best_rank is None or rank > best_rank:
+                    best_rank = rank
+                    best = (terminal, i, j)
+
+        if best is None:
+            return None
+
+        (name, keyword), start, end = best
+        return IntentMatch(name, keyword, self._extract_argument(name, command, tokens, start, end), command)
+
+    def _extract_argument(self, name, command, tokens, start, end):
+        """Text following the matched keyword, or preceding it when nothing follows"""
+        fillers = self._fillers[name]
+        while end < len(tokens) and tokens[end][0] in fillers:
+            end += 1
+
+        if end < len(tokens):
+            return command[tokens[end][1]:].strip()
+        if start > 0:
+            return command[:tokens[start - 1][2]].strip()
+        return ""
+
+
+def build_default_router():
+    """Build a router preloaded with the assistant's intent table"""
+    return IntentRouter(DEFAULT_INTENTS)
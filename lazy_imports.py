@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports for the Ultimate AI Assistant
+Defers heavy optional dependencies until a feature first uses them and records startup timings.
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+
+# Origin of the startup timeline (this module is imported before any heavy dependency)
+STARTUP_ORIGIN = time.perf_counter()
+
+_startup_marks = []
+_lazy_modules = {}
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name, pip_name=None):
+        self._name = name
+        self._pip_name = pip_name or name
+        self._module = None
+        self._load_seconds = None
+        self._load_error = None
+
+    def _load(self):
+        """Import the wrapped module (once) and return it"""
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    try:
+                        module = importlib.import_module(self._name)
+                    except ImportError as e:
+                        self._load_error = e
+                        raise ImportError(
+                            f"{self._name} is required for this feature. Install with: pip install {self._pip_name}"
+                        ) from e
+                    self._load_seconds = time.perf_counter() - start
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    @property
+    def is_loaded(self):
+        """True once the real module has been imported"""
+        return self._module is not None
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name, pip_name=None):
+    """Return a proxy for a module that is imported on first use"""
+    with _lock:
+        if name not in _lazy_modules:
+            _lazy_modules[name] = LazyModule(name, pip_name)
+        return _lazy_modules[name]
+
+
+def mark_startup(phase):
+    """Record the time since startup at which a phase completed"""
+    _startup_marks.append((phase, time.perf_counter() - STARTUP_ORIGIN))
+
+
+def find_missing_dependencies(requirements):
+    """Check {module: pip name} requirements without importing anything"""
+    missing = []
+    for module_name, pip_name in requirements.items():
+        try:
+            if importlib.util.find_spec(module_name) is None:
+                missing.append(pip_name)
+        except (ImportError, ValueError):
+            missing.append(pip_name)
+    return missing
+
+
+def startup_report():
+    """Human readable startup timeline and lazy import costs"""
+    lines = ["⏱️ Startup Report:"]
+    previous = 0.0
+    for phase, elapsed in _startup_marks:
+        lines.append(f"  {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:7.1f} ms)  {phase}")
+        previous = elapsed
+
+    lines.append("\n📦 Lazy dependencies:")
+    with _lock:
+        modules = sorted(_lazy_modules.values(), key=lambda m: -(m._load_seconds or 0))
+    for module in modules:
+        if module.is_loaded:
+            lines.append(f"  {module._load_seconds * 1000:8.1f} ms  {module._name}")
+        elif module._load_error:
+            lines.append(f"  {'missing':>11}  {module._name}")
+        else:
+            lines.append(f"  {'deferred':>11}  {module._name}")
+    return "\n".join(lines)
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+LLM Client for the AI Assistants
+Asyncio HTTP client for the Gemini REST API with deadlines, keep-alive connection reuse,
+concurrent requests and cancellation. Exposes a blocking generate_content() so worker threads
+can use it exactly like a google.generativeai model.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import queue
+import socket
+import ssl
+import threading
+import urllib.parse
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+
+_END = object()
+
+
+class LLMError(Exception):
+    """The API returned an error or an unreadable response"""
+
+
+class LLMTimeout(LLMError):
+    """The request did not finish before its deadline"""
+
+
+class LLMCancelled(LLMError):
+    """The request was cancelled because a newer command replaced it"""
+
+
+class _ConnectionDropped(LLMError):
+    """The connection closed before any response bytes arrived"""
+
+
+class LLMResponse:
+    """Response (or streamed chunk) with the same .text attribute as the SDK objects"""
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return f"LLMResponse({self.text!r})"
+
+
+def extract_text(payload):
+    """Concatenate the text parts of the first candidate in a generateContent payload"""
+    try:
+        parts = payload["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        block = payload.get("promptFeedback", {}).get("blockReason") if isinstance(payload, dict) else None
+        if block:
+            raise LLMError(f"Prompt blocked: {block}")
+        return ""
+    return "".join(part.get("text", "") for part in parts)
+
+
+class LLMClient:
+    """Gemini REST client running on its own asyncio event loop"""
+
+    def __init__(self, api_key, model_name, base_url=DEFAULT_BASE_URL, timeout=30, max_connections=4):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.timeout = timeout
+
+        url = urllib.parse.urlsplit(base_url)
+        self._https = url.scheme == "https"
+        self._host = url.hostname
+        self._port = url.port or (443 if self._https else 80)
+        self._host_header = url.netloc
+        self._base_path = url.path.rstrip("/")
+        self._ssl_context = ssl.create_default_context() if self._https else None
+
+        self.requests = 0
+        self.connections_opened = 0
+        self.reconnects = 0
+        self.cancelled = 0
+        self.timeouts = 0
+
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self._inflight = set()
+        self._inflight_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Blocking API (called from worker threads)
+    # ------------------------------------------------------------------
+
+    def generate_content(self, prompt, stream=False):
+        """Generate a response; with stream=True returns an iterator of chunks"""
+        if stream:
+            return self._stream_chunks(prompt)
+
+        future = self._submit(self._with_deadline(self.generate_async(prompt)))
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise LLMCancelled("Request cancelled") from None
+
+    def cancel_all(self):
+        """Cancel every in-flight request (e.g. when the user submits a new command)"""
+        with self._inflight_lock:
+            pending = list(self._inflight)
+        for future in pending:
+            if future.cancel():
+                self.cancelled += 1
+
+    @property
+    def in_flight(self):
+        """Number of requests currently running"""
+        with self._inflight_lock:
+            return len(self._inflight)
+
+    def close(self):
+        """Cancel outstanding work, close pooled connections and stop the event loop"""
+        self.cancel_all()
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+
+    def _submit(self, coroutine):
+        """Schedule a coroutine on the client loop and track it for cancellation"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        with self._inflight_lock:
+            self._inflight.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._inflight_lock:
+            self._inflight.discard(future)
+
+    def _stream_chunks(self, prompt):
+        """Bridge the async stream to a blocking iterator, enforcing an idle deadline per chunk"""
+        chunks = queue.Queue()
+
+        async def produce():
+            try:
+                async for text in self.stream_async(prompt):
+                    chunks.put(text)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(_END)
+
+        future = self._submit(produce())
+        # A request cancelled before its coroutine starts never runs produce's finally
+        future.add_done_callback(lambda f: chunks.put(_END) if f.cancelled() else None)
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=self.timeout)
+                except queue.Empty:
+                    future.cancel()
+                    self.timeouts += 1
+                    raise LLMTimeout(f"No response from the AI within {self.timeout} seconds") from None
+                if item is _END:
+                    if future.cancelled():
+                        raise LLMCancelled("Request cancelled")
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield LLMResponse(item)
+        finally:
+            future.cancel()
+
+    # ------------------------------------------------------------------
+    # Async API (runs on the client loop)
+    # ------------------------------------------------------------------
+
+    async def generate_async(self, prompt):
+        """POST :generateContent and return the full response"""
+        status, body = await self._request(self._path("generateContent"), self._payload(prompt))
+        payload = self._decode(status, body)
+        return LLMResponse(extract_text(payload))
+
+    async def stream_async(self, prompt):
+        """POST :streamGenerateContent and yield text as server-sent events arrive"""
+        async with self._slots:
+            reader, writer, status, headers = await self._start(self._path("streamGenerateContent") + "?alt=sse",
+                                                                self._payload(prompt))
+            reusable = False
+            try:
+                if status != 200:
+                    body = b"".join([chunk async for chunk in self._iter_body(reader, headers)])
+                    reusable = self._keep_alive(headers)
+                    self._decode(status, body)
+
+                buffer = b""
+                data_lines = []
+                async for chunk in self._iter_body(reader, headers):
+                    buffer += chunk
+                    while b"\n" in buffer:
+                        line, buffer = buffer.split(b"\n", 1)
+                        line = line.rstrip(b"\r")
+                        if line.startswith(b"data:"):
+                            data_lines.append(line[5:].strip())
+                        elif not line and data_lines:
+                            text = extract_text(json.loads(b"".join(data_lines)))
+                            data_lines = []
+                            if text:
+                                yield text
+                if data_lines:
+                    text = extract_text(json.loads(b"".join(data_lines)))
+                    if text:
+                        yield text
+                reusable = self._keep_alive(headers)
+            finally:
+                self._release(reader, writer, reusable)
+
+    async def _with_deadline(self, coroutine):
+        """Apply the per-request deadline"""
+        try:
+            return await asyncio.wait_for(coroutine, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise LLMTimeout(f"No response from the AI within {self.timeout} seconds") from None
+
+    async def _request(self, path, payload):
+        """Send a request over a pooled connection and read the whole body"""
+        async with self._slots:
+            reader, writer, status, headers = await self._start(path, payload)
+            reusable = False
+            try:
+                body = b"".join([chunk async for chunk in self._iter_body(reader, headers)])
+                reusable = self._keep_alive(headers)
+                return status, body
+            finally:
+                self._release(reader, writer, reusable)
+
+    async def _start(self, path, payload):
+        """Send a request and read its headers; returns (reader, writer, status, headers)
+
+        A server may close a keep-alive connection while it sits idle in the pool, and
+        that only shows when the next request gets no response at all. Such a reused
+        connection is dropped and the request is sent once more on a new one.
+        """
+        for attempt in range(2):
+            reader, writer, reused = await self._acquire(reuse=attempt == 0)
+            try:
+                status, headers = await self._send(reader, writer, path, payload)
+                return reader, writer, status, headers
+            except _ConnectionDropped:
+                writer.close()
+                if not reused:
+                    raise
+                self.reconnects += 1
+            except BaseException:
+                writer.close()
+                raise
+
+    async def _acquire(self, reuse=True):
+        """Reuse an idle keep-alive connection or open a new one; returns (reader, writer, reused)"""
+        while reuse and self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+
+        reader, writer = await asyncio.open_connection(
+            self._host, self._port, ssl=self._ssl_context,
+            server_hostname=self._host if self._https else None
+        )
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections_opened += 1
+        return reader, writer, False
+
+    def _release(self, reader, writer, reusable):
+        """Return a connection to the pool, or close it if it cannot be reused"""
+        if reusable and not writer.is_closing():
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def _shutdown(self):
+        """Let cancelled requests unwind, then close pooled connections"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def _send(self, reader, writer, path, payload):
+        """Write an HTTP/1.1 request and read the status line and headers"""
+        self.requests += 1
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"POST {path} HTTP/1.1\r\n"
+            f"Host: {self._host_header}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"x-goog-api-key: {self.api_key}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        )
+        try:
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+            status_line = await reader.readline()
+        except ConnectionError:
+            status_line = b""
+        if not status_line:
+            raise _ConnectionDropped("Connection closed by the AI service")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise LLMError(f"Malformed response: {status_line[:80]!r}") from None
+
+        headers = {"_version": status_line.split()[0].decode("latin-1")}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    async def _iter_body(self, reader, headers):
+        """Yield body bytes as they arrive (chunked, Content-Length or until close)"""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                chunk = await reader.readexactly(size)
+                await reader.readexactly(2)
+                yield chunk
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining:
+                chunk = await reader.read(min(remaining, 65536))
+                if not chunk:
+                    raise LLMError("Connection closed mid-response")
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            headers["connection"] = "close"
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                yield chunk
+
+    @staticmethod
+    def _keep_alive(headers):
+        """Whether the server left the connection open for another request"""
+        if headers.get("connection", "").lower() == "close":
+            return False
+        return headers.get("_version") == "HTTP/1.1" or headers.get("connection", "").lower() == "keep-alive"
+
+    def _path(self, method):
+        return f"{self._base_path}/v1beta/models/{self.model_name}:{method}"
+
+    @staticmethod
+    def _payload(prompt):
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+
+    @staticmethod
+    def _decode(status, body):
+        """Parse a JSON body, raising LLMError for API errors"""
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            raise LLMError(f"HTTP {status}: unreadable response") from None
+        if status != 200:
+            message = payload.get("error", {}).get("message") if isinstance(payload, dict) else None
+            raise LLMError(f"HTTP {status}: {message or 'request failed'}")
+        return payload
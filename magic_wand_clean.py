@@ -4,6 +4,7 @@ Ultimate AI Windows Assistant - All-in-One Companion
 A powerful AI assistant that can actually control your system, launch apps, browse web, and more.
 """
 
+from lazy_imports import lazy_import, mark_startup, find_missing_dependencies, startup_report
 import tkinter as tk
 import customtkinter as ctk
 import pyperclip
@@ -13,34 +14,59 @@ import os
 import sys
 import subprocess
 import webbrowser
-import requests
-import json
 import re
+import multiprocessing
+from collections import deque
 from datetime import datetime
-import psutil
-import win32gui
-import win32con
-import win32api
-from pathlib import Path
-import sqlite3
-import hashlib
-import winreg
-import socket
-import speedtest
-from PIL import Image, ImageTk
-import cv2
-import numpy as np
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import smtplib
-import schedule
-import pyautogui
-import speech_recognition as sr
-import pyttsx3
-from plyer import notification
-import qrcode
-from io import BytesIO
 import base64
+import config
+from intent_router import build_default_router
+from response_cache import ResponseCache, prompt_key
+from semantic_cache import SemanticCache, load_embedder
+from response_stream import ResponseStream
+from history_store import HistoryWriter
+from request_scheduler import RequestScheduler, FAST, SLOW
+from single_flight import SingleFlight
+from prompt_builder import PromptBuilder, PromptTemplate, compact_text, CHARS_PER_TOKEN
+from chunked_engine import ChunkedEngine, split_text, joiner
+from app_index import AppIndex
+from system_monitor import MetricsSampler
+from process_table import ProcessTable
+from process_monitor import ProcessMonitor
+from fuzzy_match import FuzzyIndex
+from timer_scheduler import TimerScheduler
+from reminder_store import ReminderStore, parse_due
+from clipboard_watcher import ClipboardWatcher, copy_image
+from screen_capture import ScreenCapture
+from screen_watch import ScreenWatcher, FrameDiffer, parse_region
+from qr_codes import QRGenerator, QRImage
+from ui_bus import UIBus, COALESCE
+from llm_client import LLMClient
+
+# Heavy or single-feature dependencies are imported on first use
+psutil = lazy_import("psutil")
+winreg = lazy_import("winreg", "pywin32")
+speedtest = lazy_import("speedtest", "speedtest-cli")
+smtplib = lazy_import("smtplib")
+sr = lazy_import("speech_recognition", "SpeechRecognition")
+pyttsx3 = lazy_import("pyttsx3")
+plyer = lazy_import("plyer")
+
+mark_startup("core imports")
+
+# Dependencies checked at startup: {module: pip package}
+REQUIRED_DEPENDENCIES = {
+    "customtkinter": "customtkinter",
+    "pyperclip": "pyperclip",
+    "psutil": "psutil",
+    "win32gui": "pywin32",
+    "pynput": "pynput",
+    "pyttsx3": "pyttsx3",
+    "speech_recognition": "SpeechRecognition",
+    "speedtest": "speedtest-cli",
+    "qrcode": "qrcode[pil]",
+    "plyer": "plyer",
+}
 
 # Configure customtkinter appearance
 ctk.set_appearance_mode("dark")
@@ -89,42 +115,21 @@ class AdvancedSystemController:
             return f"❌ Speed test failed: {str(e)}"
     
     @staticmethod
-    def take_screenshot(save_path=None):
-        """Take a screenshot"""
+    def take_screenshot(capture, save_path=None):
+        """Take a screenshot; the file is encoded in the background"""
         try:
-            screenshot = pyautogui.screenshot()
-            if save_path:
-                screenshot.save(save_path)
-                return f"📸 Screenshot saved to: {save_path}"
-            else:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                default_path = f"screenshot_{timestamp}.png"
-                screenshot.save(default_path)
-                return f"📸 Screenshot saved as: {default_path}"
+            screenshot = capture.capture(save_path)
+            if screenshot.duplicate:
+                return f"📸 Screen unchanged since the last screenshot: {screenshot.path}"
+            return f"📸 Screenshot ({screenshot.width}x{screenshot.height}) saving to: {screenshot.path}"
         except Exception as e:
             return f"❌ Screenshot failed: {str(e)}"
     
-    @staticmethod
-    def generate_qr_code(text):
-        """Generate QR code for text"""
-        try:
-            qr = qrcode.QRCode(version=1, box_size=10, border=5)
-            qr.add_data(text)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"qr_code_{timestamp}.png"
-            img.save(filename)
-            return f"📱 QR code generated: {filename}"
-        except Exception as e:
-            return f"❌ QR generation failed: {str(e)}"
-    
     @staticmethod
     def send_notification(title, message):
         """Send system notification"""
         try:
-            notification.notify(
+            plyer.notification.notify(
                 title=title,
                 message=message,
                 timeout=10
@@ -134,9 +139,13 @@ class AdvancedSystemController:
             return f"❌ Notification failed: {str(e)}"
     
     @staticmethod
-    def get_installed_programs():
+    def get_installed_programs(app_index=None):
         """Get list of installed programs"""
         try:
+            if app_index is not None and app_index.ready.is_set() and app_index.use_registry:
+                programs = app_index.installed_programs()
+                return f"💻 Installed Programs ({len(programs)} found):\n" + "\n".join(f"• {prog}" for prog in programs[:20]) + ("\n... and more" if len(programs) > 20 else "")
+            
             programs = []
             reg_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
             
@@ -150,7 +159,7 @@ class AdvancedSystemController:
                     except FileNotFoundError:
                         pass
                     winreg.CloseKey(subkey)
-                except WindowsError:
+                except OSError:
                     pass
             
             winreg.CloseKey(reg_key)
@@ -243,6 +252,9 @@ class EmailManager:
             if not from_email or not password:
                 return "❌ Email credentials not configured. Set SMTP_EMAIL and SMTP_PASSWORD environment variables."
             
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+            
             msg = MIMEMultipart()
             msg['From'] = from_email
             msg['To'] = to_email
@@ -265,75 +277,142 @@ class EmailManager:
 class SmartScheduler:
     """Task scheduling and reminders"""
     
-    def __init__(self):
-        self.scheduled_tasks = []
+    # Missed reminders beyond this many are shown as one summary notification
+    MAX_CATCH_UP_NOTIFICATIONS = 3
+    
+    def __init__(self, db_path=None):
+        self.timer = TimerScheduler()
+        self.store = None
+        if db_path:
+            try:
+                self.store = ReminderStore(db_path)
+            except Exception as e:
+                print(f"Reminder store setup error: {e}")
+        self.restore()
+        self.timer.start()
+    
+    @property
+    def scheduled_tasks(self):
+        """Reminders that have not fired yet"""
+        return self.timer.pending()
+    
+    def restore(self):
+        """Schedule saved reminders and show the ones that came due while the assistant was not running"""
+        if not self.store:
+            return 0
+        try:
+            now = time.time()
+            missed = self.store.pending(before=now)
+            if len(missed) > self.MAX_CATCH_UP_NOTIFICATIONS:
+                summary = "; ".join(reminder.message for reminder in missed[:5])
+                more = f" and {len(missed) - 5} more" if len(missed) > 5 else ""
+                self.timer.schedule_at(now, self.show_missed_reminders, [reminder.id for reminder in missed],
+                                       f"{len(missed)} missed reminders: {summary}{more}")
+            else:
+                for reminder in missed:
+                    self.timer.schedule_at(now, self.show_reminder, reminder.message, reminder.id, reminder.due_at)
+            
+            upcoming = self.store.pending()[len(missed):]
+            for reminder in upcoming:
+                self.timer.schedule_at(reminder.due_at, self.show_reminder, reminder.message, reminder.id)
+            if missed or upcoming:
+                print(f"⏰ Restored {len(upcoming)} reminder(s), {len(missed)} missed")
+            return len(missed) + len(upcoming)
+        except Exception as e:
+            print(f"Reminder restore error: {e}")
+            return 0
     
     def add_reminder(self, message, when):
         """Add a reminder"""
         try:
-            # Simple time parsing (extend as needed)
-            if 'minute' in when:
-                minutes = int(re.findall(r'\d+', when)[0])
-                schedule.every(minutes).minutes.do(self.show_reminder, message)
-            elif 'hour' in when:
-                hours = int(re.findall(r'\d+', when)[0])
-                schedule.every(hours).hours.do(self.show_reminder, message)
-            
-            return f"⏰ Reminder set: {message} in {when}"
+            due_at = parse_due(when)
+            if due_at is None:
+                return f"❌ Reminder failed: could not understand '{when}'"
+            reminder_id = self.store.add(message, due_at).id if self.store else None
+            self.timer.schedule_at(due_at, self.show_reminder, message, reminder_id)
+            return f"⏰ Reminder set: {message} {when} ({datetime.fromtimestamp(due_at).strftime('%a %H:%M')})"
         except Exception as e:
             return f"❌ Reminder failed: {str(e)}"
     
-    def show_reminder(self, message):
+    def show_reminder(self, message, reminder_id=None, missed_at=None):
         """Show reminder notification"""
+        if missed_at is not None:
+            message = f"{message} (missed at {datetime.fromtimestamp(missed_at).strftime('%a %H:%M')})"
         AdvancedSystemController.send_notification("Reminder", message)
-        return schedule.CancelJob  # Remove after showing
+        if self.store and reminder_id is not None:
+            self.store.mark_fired([reminder_id])
+    
+    def show_missed_reminders(self, reminder_ids, message):
+        """Show one notification for many reminders that came due while the assistant was closed"""
+        AdvancedSystemController.send_notification("Missed reminders", message)
+        self.store.mark_fired(reminder_ids)
     
-    def run_pending(self):
-        """Run pending scheduled tasks"""
-        schedule.run_pending()
+    def shutdown(self):
+        """Stop the timer thread"""
+        self.timer.stop()
+        if self.store:
+            self.store.close()
 
 class SystemController:
     """Handles all system-level operations"""
     
+    # Friendly names for apps whose executable or shortcut is named differently
+    APP_ALIASES = {
+        'calculator': 'calc',
+        'paint': 'mspaint',
+        'task manager': 'taskmgr',
+        'control panel': 'control',
+        'command prompt': 'cmd',
+        'file explorer': 'explorer',
+        'settings': 'ms-settings:',
+        'vscode': 'visual studio code',
+        'word': 'winword',
+        'powerpoint': 'powerpnt',
+    }
+    
+    # Default install locations, used when the app index has not found an app (yet)
+    INSTALL_PATHS = {
+        'chrome': [r'%ProgramFiles%\Google\Chrome\Application\chrome.exe'],
+        'firefox': [r'%ProgramFiles%\Mozilla Firefox\firefox.exe'],
+        'word': [r'%ProgramFiles%\Microsoft Office\root\Office16\WINWORD.EXE'],
+        'excel': [r'%ProgramFiles%\Microsoft Office\root\Office16\EXCEL.EXE'],
+        'powerpoint': [r'%ProgramFiles%\Microsoft Office\root\Office16\POWERPNT.EXE'],
+        'vscode': [r'%LOCALAPPDATA%\Programs\Microsoft VS Code\Code.exe'],
+        'discord': [r'%LOCALAPPDATA%\Discord\Update.exe', '--processStart', 'Discord.exe'],
+        'spotify': [r'%APPDATA%\Spotify\Spotify.exe'],
+        'vlc': [r'%ProgramFiles%\VideoLAN\VLC\vlc.exe'],
+    }
+    
     @staticmethod
-    def open_application(app_name):
-        """Launch applications by name"""
-        app_paths = {
-            'notepad': 'notepad.exe',
-            'calculator': 'calc.exe',
-            'paint': 'mspaint.exe',
-            'chrome': r'C:\Program Files\Google\Chrome\Application\chrome.exe',
-            'firefox': r'C:\Program Files\Mozilla Firefox\firefox.exe',
-            'edge': 'msedge.exe',
-            'explorer': 'explorer.exe',
-            'cmd': 'cmd.exe',
-            'powershell': 'powershell.exe',
-            'task manager': 'taskmgr.exe',
-            'control panel': 'control.exe',
-            'settings': 'ms-settings:',
-            'word': r'C:\Program Files\Microsoft Office\root\Office16\WINWORD.EXE',
-            'excel': r'C:\Program Files\Microsoft Office\root\Office16\EXCEL.EXE',
-            'powerpoint': r'C:\Program Files\Microsoft Office\root\Office16\POWERPNT.EXE',
-            'vscode': r'C:\Users\{}\AppData\Local\Programs\Microsoft VS Code\Code.exe'.format(os.getenv('USERNAME')),
-            'discord': r'C:\Users\{}\AppData\Local\Discord\Update.exe --processStart Discord.exe'.format(os.getenv('USERNAME')),
-            'spotify': r'C:\Users\{}\AppData\Roaming\Spotify\Spotify.exe'.format(os.getenv('USERNAME')),
-            'vlc': r'C:\Program Files\VideoLAN\VLC\vlc.exe',
-        }
+    def open_application(app_name, app_index=None):
+        """Launch applications by name: app index, then known install paths, then Windows' own lookup"""
+        app_name = app_name.lower().strip()
+        target = SystemController.APP_ALIASES.get(app_name, app_name)
+        entry = app_index.lookup(target) if app_index is not None and not target.endswith(':') else None
+        installed = SystemController.INSTALL_PATHS.get(app_name)
+        if installed:
+            installed = [os.path.expandvars(installed[0])] + installed[1:]
         
-        app_name = app_name.lower()
-        if app_name in app_paths:
-            try:
-                subprocess.Popen(app_paths[app_name], shell=True)
+        try:
+            if entry:
+                SystemController.launch(entry.path)
+                return f"✅ Opened {entry.name}"
+            if installed and os.path.exists(installed[0]):
+                subprocess.Popen(installed, start_new_session=True)
                 return f"✅ Opened {app_name.title()}"
-            except Exception as e:
-                return f"❌ Failed to open {app_name}: {str(e)}"
+            # Not indexed (yet): let Windows resolve the name, URI or file association
+            SystemController.launch(target)
+            return f"✅ Attempted to open {app_name}"
+        except Exception as e:
+            return f"❌ Failed to open {app_name}: {str(e)}"
+    
+    @staticmethod
+    def launch(target):
+        """Start a program, shortcut or URI without going through a shell"""
+        if hasattr(os, 'startfile'):
+            os.startfile(target)
         else:
-            # Try to find and launch by searching
-            try:
-                subprocess.Popen(f'start "" "{app_name}"', shell=True)
-                return f"✅ Attempted to open {app_name}"
-            except Exception as e:
-                return f"❌ Application '{app_name}' not found"
+            subprocess.Popen([target], start_new_session=True)
     
     @staticmethod
     def web_search(query):
@@ -351,28 +430,97 @@ class SystemController:
         return f"🌐 Opened: {url}"
     
     @staticmethod
-    def system_info():
-        """Get system information"""
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
+    def system_info(sampler=None, minutes=None):
+        """Get system information from the background sampler's latest reading"""
+        try:
+            if sampler is None:
+                sampler = MetricsSampler()
+                sampler.source.cpu_percent(interval=0.1)
+            sample = sampler.latest()
+        except Exception as e:
+            return f"❌ System info unavailable: {str(e)}"
+
         info = f"""💻 System Information:
-CPU Usage: {cpu_percent}%
-RAM: {memory.percent}% used ({memory.used // (1024**3)}GB / {memory.total // (1024**3)}GB)
-Disk: {disk.percent}% used ({disk.used // (1024**3)}GB / {disk.total // (1024**3)}GB)
-Platform: {sys.platform}"""
+CPU Usage: {sample.cpu:.1f}%
+RAM: {sample.ram}% used ({sample.ram_used // (1024**3)}GB / {sample.ram_total // (1024**3)}GB)
+Disk: {sample.disk}% used ({sample.disk_used // (1024**3)}GB / {sample.disk_total // (1024**3)}GB)
+Network: ↑ {SystemController._format_rate(sample.net_sent_rate)} ↓ {SystemController._format_rate(sample.net_recv_rate)}"""
+        if sample.battery is not None:
+            info += f"\nBattery: {sample.battery:.0f}% ({'plugged in' if sample.plugged else 'on battery'})"
+        info += f"\nPlatform: {sys.platform}"
+
+        minutes = minutes or config.METRICS_SUMMARY_MINUTES
+        if len(sampler.samples(minutes * 60)) > 1:
+            summary = sampler.summary(minutes * 60)
+            labels = {'cpu': ("CPU", "{:.0f}%"), 'ram': ("RAM", "{:.0f}%"), 'disk': ("Disk", "{:.0f}%"),
+                      'net_sent_rate': ("Upload", None), 'net_recv_rate': ("Download", None),
+                      'battery': ("Battery", "{:.0f}%")}
+            info += f"\n\n📈 Last {minutes} min (min / avg / max):"
+            for field, (low, average, high) in summary.items():
+                label, pattern = labels[field]
+                values = [pattern.format(value) if pattern else SystemController._format_rate(value)
+                          for value in (low, average, high)]
+                info += f"\n{label}: {' / '.join(values)}"
         return info
+
+    @staticmethod
+    def format_top_processes(snapshot):
+        """Text table of the heaviest processes by CPU and by memory"""
+        lines = [f"🔥 Top processes by CPU ({snapshot.count} running):"]
+        for usage in snapshot.by_cpu:
+            cpu = f"{usage.cpu:5.1f}%" if snapshot.interval else "    -"
+            lines.append(f"{cpu}  {usage.memory / 1024 ** 2:7.0f} MB  {usage.name} (PID {usage.pid})")
+        lines.append("")
+        lines.append("💾 Top processes by memory:")
+        for usage in snapshot.by_memory:
+            lines.append(f"{usage.memory / 1024 ** 2:7.0f} MB  {usage.name} (PID {usage.pid})")
+        lines.append(f"\nUpdated {datetime.fromtimestamp(snapshot.time).strftime('%H:%M:%S')}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _format_rate(bytes_per_second):
+        """Human readable network rate"""
+        for unit in ("B/s", "KB/s", "MB/s"):
+            if bytes_per_second < 1024:
+                return f"{bytes_per_second:.0f} {unit}"
+            bytes_per_second /= 1024
+        return f"{bytes_per_second:.1f} GB/s"
     
     @staticmethod
-    def kill_process(process_name):
-        """Kill a process by name"""
+    def kill_process(process_name, process_table=None, all_matches=False, tree=False, dry_run=False):
+        """Kill a process by name, or every match, optionally with its child processes"""
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                if process_name.lower() in proc.info['name'].lower():
-                    proc.kill()
-                    return f"✅ Killed process: {proc.info['name']}"
-            return f"❌ Process '{process_name}' not found"
+            if process_table is None:
+                process_table = ProcessTable()
+            result = process_table.kill(process_name, all_matches=all_matches, tree=tree, dry_run=dry_run)
+            if not result.targets:
+                return f"❌ Process '{process_name}' not found"
+            
+            if not result.exact:
+                # Targets list children before the matched process, so the last one is a match
+                closest = result.targets[-1].name
+                lines = [f"🤔 No process is named '{process_name}'. Closest match: {closest}"]
+                lines += [f"• {info.name} (PID {info.pid})" for info in result.targets[:20]]
+                lines.append(f"Nothing was killed. Repeat the command with the exact name to kill it: 'kill {closest}'")
+                return "\n".join(lines)
+            
+            if dry_run:
+                lines = [f"👀 Would kill {len(result.targets)} process(es):"]
+                lines += [f"• {info.name} (PID {info.pid})" for info in result.targets[:20]]
+                if len(result.targets) > 20:
+                    lines.append(f"... and {len(result.targets) - 20} more")
+                return "\n".join(lines)
+            
+            names = sorted({info.name for info in result.killed})
+            lines = []
+            if result.killed:
+                lines.append(f"✅ Killed {len(result.killed)} process(es): {', '.join(names)}" if len(result.killed) > 1
+                             else f"✅ Killed process: {result.killed[0].name}")
+            for info, error in result.failed[:5]:
+                lines.append(f"❌ Could not kill {info.name} (PID {info.pid}): {error}")
+            if len(result.failed) > 5:
+                lines.append(f"... and {len(result.failed) - 5} more failures")
+            return "\n".join(lines)
         except Exception as e:
             return f"❌ Error killing process: {str(e)}"
     
@@ -407,111 +555,282 @@ Platform: {sys.platform}"""
 class AIProcessor:
     """Advanced AI processing with multiple capabilities"""
     
+    # Intents that may take seconds and run on the slow worker lane
+    SLOW_INTENTS = {'speed_test', 'wifi_passwords', 'installed_programs', 'empty_recycle_bin',
+                    'speak', 'listen', 'voice_input', 'send_email', 'top_processes', 'qr_batch'}
+    
+    # Intents whose output keeps refreshing in the spotlight until dismissed
+    LIVE_INTENTS = {'top_processes'}
+    
+    TEXT_PROMPT = """
+You are an advanced AI assistant integrated into Windows. Process this text according to the user's command.
+
+Command: {command}
+Text to process: {text}
+
+Provide the transformed text only, no explanations unless specifically asked.
+"""
+    
+    SEGMENT_PROMPT = """
+You are an advanced AI assistant integrated into Windows. Process one part of a longer text according to the user's command.
+
+Command: {command}
+This is part {part} of {total}.
+
+Preceding text, for context only (do not include it in your answer):
+{context}
+
+Text to process:
+{text}
+
+Provide the result for this part only, no explanations unless specifically asked.
+"""
+    
+    REDUCE_PROMPT = """
+You are an advanced AI assistant integrated into Windows. A long text was processed in parts; below are the results for each part in order.
+Combine them into a single answer to the user's command.
+
+Command: {command}
+Results for each part:
+{text}
+
+Provide the combined result only, no explanations unless specifically asked.
+"""
+    
+    # Commands whose per-part results are combined by one more AI call instead of being stitched together
+    REDUCE_COMMANDS = ('summar', 'tl;dr', 'key points', 'bullet points', 'explain')
+    
     def __init__(self):
         self.setup_ai()
+        self.prompt_builder = PromptBuilder(self.TEXT_PROMPT, config.PROMPT_MAX_INPUT_TOKENS)
+        self.segment_prompt = PromptTemplate(self.SEGMENT_PROMPT)
+        self.reduce_builder = PromptBuilder(self.REDUCE_PROMPT, config.PROMPT_MAX_INPUT_TOKENS)
+        self.chunk_engine = ChunkedEngine(config.CHUNK_MAX_CONCURRENCY)
+        self.router = build_default_router()
         self.command_history = []
         self.setup_database()
-        self.voice_assistant = VoiceAssistant()
-        self.scheduler = SmartScheduler()
+        self.setup_response_cache()
+        self._semantic_cache = None
+        self._semantic_lock = threading.Lock()
+        self.setup_app_index()
+        self.setup_metrics_sampler()
+        self.setup_clipboard_watcher()
+        self.process_table = ProcessTable(config.PROCESS_TABLE_REFRESH_INTERVAL)
+        self.process_monitor = ProcessMonitor(config.PROCESS_MONITOR_TOP_N)
+        self.single_flight = SingleFlight()
+        self._completions = None
+        self._voice_assistant = None
+        self._screen_capture = None
+        # Per worker thread: the image made by the command running on it, until process_command_stream takes it
+        self._output = threading.local()
+        self.qr_generator = QRGenerator(config.QR_CACHE_SIZE, config.QR_BOX_SIZE, config.QR_BORDER,
+                                        config.QR_ERROR_CORRECTION, workers=config.QR_BATCH_WORKERS)
+        self._screen_watch = None
+        self._screen_watch_stop = threading.Event()
+        # Set by the UI: returns True while the assistant's window is on screen, which pauses screen watching
+        self.screen_watch_paused = None
+        self.scheduler = SmartScheduler(self.db_path)
+    
+    @property
+    def voice_assistant(self):
+        """Voice engine, initialized on first voice command"""
+        if self._voice_assistant is None:
+            self._voice_assistant = VoiceAssistant()
+        return self._voice_assistant
+    
+    @property
+    def screen_capture(self):
+        """Screenshot pipeline, created on the first screenshot (it loads NumPy and starts encoder threads)"""
+        if self._screen_capture is None:
+            self._screen_capture = ScreenCapture(
+                config.SCREENSHOT_DIR,
+                config.SCREENSHOT_FORMAT,
+                compress_level=config.SCREENSHOT_COMPRESS_LEVEL,
+                quality=config.SCREENSHOT_QUALITY,
+                workers=config.SCREENSHOT_ENCODE_WORKERS
+            )
+        return self._screen_capture
     
     def setup_database(self):
         """Setup local database for learning user preferences"""
+        self.db_path = os.path.join(os.path.expanduser("~"), ".magic_wand_db.sqlite")
         try:
-            self.db_path = os.path.join(os.path.expanduser("~"), ".magic_wand_db.sqlite")
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.execute('''
-                CREATE TABLE IF NOT EXISTS command_history (
-                    id INTEGER PRIMARY KEY,
-                    command TEXT,
-                    response TEXT,
-                    timestamp DATETIME,
-                    success BOOLEAN
-                )
-            ''')
-            self.conn.commit()
+            self.history = HistoryWriter(
+                self.db_path,
+                max_response_chars=config.HISTORY_MAX_RESPONSE_CHARS,
+                retention_days=config.HISTORY_RETENTION_DAYS,
+                max_rows=config.HISTORY_MAX_ROWS
+            )
         except Exception as e:
             print(f"Database setup error: {e}")
-            self.conn = None
+            self.history = None
+    
+    def setup_response_cache(self):
+        """Setup persistent cache for AI responses"""
+        self.response_cache = None
+        if not config.RESPONSE_CACHE_ENABLED or not self.model:
+            return
+        try:
+            self.response_cache = ResponseCache(
+                self.db_path,
+                self.model_name,
+                max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl_seconds=config.RESPONSE_CACHE_TTL
+            )
+        except Exception as e:
+            print(f"Response cache setup error: {e}")
+    
+    @property
+    def semantic_cache(self):
+        """Cache of responses keyed by command meaning, opened on the first AI request (it loads NumPy)"""
+        if self._semantic_cache is None and config.SEMANTIC_CACHE_ENABLED and self.model:
+            with self._semantic_lock:
+                if self._semantic_cache is None:
+                    try:
+                        self._semantic_cache = SemanticCache(
+                            self.db_path,
+                            os.path.join(os.path.expanduser("~"), ".magic_wand_semantic_cache"),
+                            self.model_name,
+                            embed=load_embedder(config.SEMANTIC_CACHE_EMBEDDER),
+                            max_entries=config.SEMANTIC_CACHE_MAX_ENTRIES,
+                            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+                            ttl_seconds=config.RESPONSE_CACHE_TTL
+                        )
+                    except Exception as e:
+                        print(f"Semantic cache setup error: {e}")
+                        self._semantic_cache = False
+        return self._semantic_cache or None
+    
+    def setup_app_index(self):
+        """Load the saved application index and keep it fresh in the background"""
+        try:
+            self.app_index = AppIndex(os.path.join(os.path.expanduser("~"), ".magic_wand_app_index.json"))
+            self.app_index.start_background_refresh(config.APP_INDEX_REFRESH_INTERVAL)
+        except Exception as e:
+            print(f"App index setup error: {e}")
+            self.app_index = None
+    
+    def setup_metrics_sampler(self):
+        """Keep recent system metrics in the background so "system info" answers instantly"""
+        self.metrics_sampler = MetricsSampler(config.METRICS_SAMPLE_INTERVAL, config.METRICS_HISTORY_MINUTES * 60)
+        self.metrics_sampler.start()
+    
+    def setup_clipboard_watcher(self):
+        """Track the clipboard in the background so the spotlight never waits on it"""
+        self.clipboard_watcher = ClipboardWatcher(
+            config.CLIPBOARD_POLL_INTERVAL,
+            max_entries=config.CLIPBOARD_HISTORY_SIZE,
+            compress_over=config.CLIPBOARD_COMPRESS_OVER
+        )
+        self.clipboard_watcher.start()
     
     def setup_ai(self):
         """Setup AI model"""
         try:
-            import google.generativeai as genai
             api_key = os.getenv('GEMINI_API_KEY')
             
             if api_key:
-                genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel("gemini-pro")
+                self.model_name = "gemini-pro"
+                self.model = LLMClient(api_key, self.model_name, base_url=config.API_BASE_URL,
+                                       timeout=config.API_TIMEOUT, max_connections=config.API_MAX_CONNECTIONS)
                 print("✅ Google AI configured")
             else:
                 self.model = None
                 print("⚠️  No API key found - using advanced demo mode")
-        except ImportError:
-            self.model = None
-            print("⚠️  Google AI not available - using advanced demo mode")
         except Exception as e:
             self.model = None
             print(f"❌ AI setup failed: {e}")
     
     def process_command(self, command, selected_text=""):
         """Process commands with AI and system integration"""
-        command_lower = command.lower()
+        intent = self.router.route(command)
+        
+        if intent is None:
+            # Text processing commands
+            if selected_text:
+                return self.handle_text_processing(command, selected_text)
+            # General AI commands
+            return self.handle_general_ai(command)
         
         # System control commands
-        if any(word in command_lower for word in ['open', 'launch', 'start', 'run']):
-            return self.handle_app_launch(command)
+        if intent.name == 'app_launch':
+            return self.handle_app_launch(intent)
+        
+        elif intent.name == 'search':
+            return self.handle_search(intent)
+        
+        elif intent.name == 'website':
+            return self.handle_website(intent)
+        
+        elif intent.name == 'system_info':
+            return self.handle_system_info(intent)
+        
+        elif intent.name == 'top_processes':
+            return self.handle_top_processes()
         
-        elif any(word in command_lower for word in ['search', 'google', 'find']):
-            return self.handle_search(command)
+        elif intent.name == 'kill_process':
+            return self.handle_kill_process(intent)
         
-        elif any(word in command_lower for word in ['website', 'browse', 'go to']):
-            return self.handle_website(command)
+        elif intent.name == 'power':
+            return self.handle_power_command(intent)
         
-        elif 'system info' in command_lower or 'system status' in command_lower:
-            return SystemController.system_info()
+        elif intent.name == 'create_file':
+            return self.handle_create_file(intent)
         
-        elif any(word in command_lower for word in ['kill', 'close', 'stop']):
-            return self.handle_kill_process(command)
+        elif intent.name == 'history_search':
+            return self.handle_history_search(intent)
         
-        elif any(word in command_lower for word in ['shutdown', 'restart', 'sleep', 'hibernate']):
-            return self.handle_power_command(command)
+        elif intent.name == 'clipboard_history':
+            return self.handle_clipboard_history(intent)
         
-        elif any(word in command_lower for word in ['create file', 'new file', 'make file']):
-            return self.handle_create_file(command)
+        elif intent.name == 'startup_report':
+            return startup_report()
+        
+        elif intent.name == 'stats':
+            return self.handle_stats()
         
         # Advanced system commands
-        elif 'wifi password' in command_lower or 'wifi info' in command_lower:
+        elif intent.name == 'wifi_passwords':
             return AdvancedSystemController.get_wifi_passwords()
         
-        elif 'speed test' in command_lower or 'network speed' in command_lower:
+        elif intent.name == 'speed_test':
             return AdvancedSystemController.network_speed_test()
         
-        elif 'screenshot' in command_lower:
-            return AdvancedSystemController.take_screenshot()
+        elif intent.name == 'watch_screen':
+            return self.handle_watch_screen(intent)
+        
+        elif intent.name == 'stop_watch_screen':
+            return self.handle_stop_watch_screen()
         
-        elif 'qr code' in command_lower:
-            text_to_encode = command.replace('qr code', '').replace('generate', '').strip()
+        elif intent.name == 'screenshot':
+            return AdvancedSystemController.take_screenshot(self.screen_capture)
+        
+        elif intent.name == 'qr_code':
+            text_to_encode = intent.argument.replace('generate', '').strip()
             if not text_to_encode and selected_text:
                 text_to_encode = selected_text
-            return AdvancedSystemController.generate_qr_code(text_to_encode or "Hello World")
+            return self.handle_qr_code(text_to_encode or "Hello World")
+        
+        elif intent.name == 'qr_batch':
+            return self.handle_qr_batch(intent, selected_text)
         
-        elif 'installed programs' in command_lower or 'list programs' in command_lower:
-            return AdvancedSystemController.get_installed_programs()
+        elif intent.name == 'installed_programs':
+            return AdvancedSystemController.get_installed_programs(self.app_index)
         
-        elif 'empty recycle bin' in command_lower or 'clear trash' in command_lower:
+        elif intent.name == 'empty_recycle_bin':
             return AdvancedSystemController.empty_recycle_bin()
         
-        elif 'battery' in command_lower or 'power status' in command_lower:
+        elif intent.name == 'battery':
             return AdvancedSystemController.get_battery_info()
         
         # Voice commands
-        elif 'speak' in command_lower or 'say' in command_lower:
-            text_to_speak = command.replace('speak', '').replace('say', '').strip()
+        elif intent.name == 'speak':
+            text_to_speak = intent.argument
             if not text_to_speak and selected_text:
                 text_to_speak = selected_text
             return self.voice_assistant.speak(text_to_speak or "Hello, I am your AI assistant")
         
-        elif 'listen' in command_lower or 'voice input' in command_lower:
+        elif intent.name in ('listen', 'voice_input'):
             result, text = self.voice_assistant.listen()
             if text:
                 # Process the voice command
@@ -519,111 +838,275 @@ class AIProcessor:
             return result
         
         # Email commands
-        elif 'send email' in command_lower:
+        elif intent.name == 'send_email':
             return self.handle_email_command(command)
         
         # Reminder commands
-        elif 'remind me' in command_lower or 'set reminder' in command_lower:
+        elif intent.name == 'reminder':
             return self.handle_reminder_command(command)
         
-        elif 'notification' in command_lower:
+        elif intent.name == 'notification':
             return self.handle_notification_command(command)
         
-        # Text processing commands
-        elif selected_text:
-            return self.handle_text_processing(command, selected_text)
-        
-        # General AI commands
-        else:
-            return self.handle_general_ai(command)
+        return self.handle_general_ai(command)
     
-    def handle_app_launch(self, command):
+    def handle_app_launch(self, intent):
         """Handle application launching"""
-        # Extract app name from command
-        patterns = [
-            r'(?:open|launch|start|run)\s+(.+)',
-            r'(.+)\s+(?:open|launch|start|run)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, command, re.IGNORECASE)
-            if match:
-                app_name = match.group(1).strip()
-                return SystemController.open_application(app_name)
+        if intent.argument:
+            return SystemController.open_application(intent.argument, self.app_index)
         
         return "❌ Please specify which application to open"
     
-    def handle_search(self, command):
+    def handle_search(self, intent):
         """Handle web searches"""
-        patterns = [
-            r'(?:search|google|find)\s+(?:for\s+)?(.+)',
-            r'(.+)\s+(?:search|google)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, command, re.IGNORECASE)
-            if match:
-                query = match.group(1).strip()
-                return SystemController.web_search(query)
+        if intent.argument:
+            return SystemController.web_search(intent.argument)
         
         return "❌ Please specify what to search for"
     
-    def handle_website(self, command):
+    def handle_website(self, intent):
         """Handle website opening"""
-        patterns = [
-            r'(?:website|browse|go to)\s+(.+)',
-            r'open\s+(.+\.(?:com|org|net|edu|gov))',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, command, re.IGNORECASE)
-            if match:
-                url = match.group(1).strip()
-                return SystemController.open_website(url)
+        if intent.argument:
+            return SystemController.open_website(intent.argument)
         
         return "❌ Please specify which website to open"
     
-    def handle_kill_process(self, command):
-        """Handle process killing"""
-        patterns = [
-            r'(?:kill|close|stop)\s+(.+)',
-        ]
+    def handle_system_info(self, intent):
+        """Handle system info, optionally over a window such as 'system info last 15 minutes'"""
+        minutes = None
+        minutes_match = re.search(r'(\d+)\s*(?:m|min|mins|minutes?)\b', intent.argument, re.IGNORECASE)
+        if minutes_match:
+            minutes = min(int(minutes_match.group(1)), config.METRICS_HISTORY_MINUTES)
+        return SystemController.system_info(self.metrics_sampler, minutes)
+    
+    def handle_top_processes(self):
+        """Report the heaviest processes once (the spotlight shows them live instead)"""
+        try:
+            # An Event that is never set just sleeps for the warm-up interval
+            return next(self.watch_top_processes(threading.Event().wait))
+        except Exception as e:
+            return f"❌ Process monitor unavailable: {str(e)}"
+    
+    def watch_top_processes(self, stopped):
+        """Yield a refreshed top-processes table each interval until stopped(timeout) returns True"""
+        for snapshot in self.process_monitor.watch(stopped, config.PROCESS_MONITOR_INTERVAL):
+            yield SystemController.format_top_processes(snapshot)
+    
+    def handle_watch_screen(self, intent):
+        """Watch the screen in the background: 'watch screen', 'watch region 0 0 800 600', 'record screen changes'"""
+        if self._screen_watch is not None and not self._screen_watch_stop.is_set():
+            return "👀 Already watching the screen - say 'stop watching' first"
+        
+        command = intent.command.lower()
+        region = parse_region(command)
+        record = 'record' in command
+        # Notifying stops after the first change unless asked to keep going
+        once = not record and not re.search(r'\b(every|each|keep)\b', command)
+        
+        differ = FrameDiffer(config.SCREEN_WATCH_SCALE, config.SCREEN_WATCH_PIXEL_THRESHOLD,
+                             config.SCREEN_WATCH_CHANGE_THRESHOLD, config.SCREEN_WATCH_MIN_BLOCKS)
+        watcher = ScreenWatcher(region, config.SCREEN_WATCH_FPS, differ, paused=self.screen_watch_paused)
+        stop = threading.Event()
+        self._screen_watch, self._screen_watch_stop = watcher, stop
+        threading.Thread(target=self._run_screen_watch, args=(watcher, stop, record, once),
+                         name="screen-watch", daemon=True).start()
+        
+        area = f"region {region[2]}x{region[3]} at ({region[0]}, {region[1]})" if region else "the whole screen"
+        if record:
+            action = f"saving changed frames to {config.SCREENSHOT_DIR}"
+        else:
+            action = "notifying on the first change" if once else "notifying on every change"
+        return (f"👀 Watching {area} at {config.SCREEN_WATCH_FPS} fps, {action}\n"
+                f"💡 Starts when this window closes; say 'stop watching' to end")
+    
+    def _run_screen_watch(self, watcher, stop, record, once):
+        """Report or save changed frames until stopped, the first change (once) or the time limit"""
+        deadline = time.monotonic() + config.SCREEN_WATCH_MAX_MINUTES * 60
+        
+        def stopped(timeout):
+            return stop.wait(timeout) or time.monotonic() > deadline
+        
+        try:
+            for change in watcher.watch(stopped):
+                if record:
+                    self.screen_capture.save(change.frame, watcher.source.raw_mode, prefix="screen_change")
+                    continue
+                x, y, width, height = change.box
+                if watcher.region:
+                    x, y = x + watcher.region[0], y + watcher.region[1]
+                AdvancedSystemController.send_notification(
+                    "Screen changed", f"{change.fraction:.0%} of the watched area changed ({width}x{height} at {x}, {y})"
+                )
+                if once:
+                    break
+        except Exception as e:
+            print(f"❌ Screen watch failed: {str(e)}")
+        finally:
+            stop.set()
+    
+    def handle_stop_watch_screen(self):
+        """Stop watching the screen and report what was seen"""
+        watcher = self._screen_watch
+        if watcher is None:
+            return "👀 Not watching the screen"
+        self._screen_watch_stop.set()
+        self._screen_watch = None
+        stats = watcher.stats()
+        return (f"👀 Stopped watching: {stats['frames']} frames at {stats['fps']:.1f} fps "
+                f"({stats['diff_ms']:.1f} ms per diff), {stats['changes']} changes")
+    
+    def handle_qr_code(self, text):
+        """Generate a QR code in memory; the spotlight shows it and copies it to the clipboard"""
+        try:
+            image = self.qr_generator.generate(text)
+        except Exception as e:
+            return f"❌ QR generation failed: {str(e)}"
+        self._output.image = image
+        preview = text if len(text) <= 60 else text[:57] + "..."
+        return f"📱 QR code ({image.size[0]}x{image.size[1]}) for: {preview}"
+    
+    def handle_qr_batch(self, intent, selected_text=""):
+        """One QR code per line of the selected text (or 'a; b; c'), written to a zip or a sprite sheet"""
+        command = intent.command.lower()
+        layout = "sheet" if re.search(r'\b(sheet|sprite)\b', command) else "zip"
+        argument = re.sub(r'\b(sheet|sprite|zip)\b', '', intent.argument, flags=re.IGNORECASE).strip()
+        lines = argument.split(';') if ';' in argument else selected_text.splitlines()
+        lines = [line.strip() for line in lines if line.strip()]
+        if not lines:
+            return "❌ Copy some lines first, or use 'qr batch first; second; third'"
         
-        for pattern in patterns:
-            match = re.search(pattern, command, re.IGNORECASE)
-            if match:
-                process_name = match.group(1).strip()
-                return SystemController.kill_process(process_name)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = ".png" if layout == "sheet" else ".zip"
+        path = os.path.join(config.QR_OUTPUT_DIR, f"qr_codes_{timestamp}{extension}")
+        try:
+            start = time.perf_counter()
+            batch = self.qr_generator.batch(lines, path, layout)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            return f"❌ QR batch failed: {str(e)}"
+        kind = "sprite sheet" if layout == "sheet" else "zip"
+        return (f"📱 {batch.count} QR codes written to {kind}: {batch.path}\n"
+                f"⚡ {batch.rendered} rendered, {batch.cached} reused from memory in {elapsed:.2f}s")
+    
+    def pop_output_image(self):
+        """Image produced by the last command on this thread (e.g. a QR code), once"""
+        image, self._output.image = getattr(self._output, "image", None), None
+        return image
+    
+    def handle_kill_process(self, intent):
+        """Handle process killing: 'kill all chrome', 'kill python tree', 'kill node dry run'"""
+        command = intent.command.lower()
+        dry_run = bool(re.search(r'\b(dry run|preview|what would)\b', command))
+        tree = bool(re.search(r'\b(tree|(and|with) (its )?children)\b', command))
+        name = " ".join(re.sub(r'\b(dry run|preview|tree|(and|with) (its )?children|all|every|instances?)\b', ' ',
+                               intent.argument, flags=re.IGNORECASE).split())
+        all_matches = bool(re.search(r'\b(all|every)\b', command))
+        if name:
+            return SystemController.kill_process(name, self.process_table, all_matches, tree, dry_run)
         
         return "❌ Please specify which process to kill"
     
-    def handle_power_command(self, command):
+    def handle_power_command(self, intent):
         """Handle power management"""
-        if 'shutdown' in command.lower():
-            return SystemController.shutdown_system('shutdown')
-        elif 'restart' in command.lower():
-            return SystemController.shutdown_system('restart')
-        elif 'sleep' in command.lower():
-            return SystemController.shutdown_system('sleep')
-        elif 'hibernate' in command.lower():
-            return SystemController.shutdown_system('hibernate')
+        actions = {
+            'shutdown': 'shutdown',
+            'restart': 'restart',
+            'reboot': 'restart',
+            'sleep': 'sleep',
+            'hibernate': 'hibernate',
+        }
+        
+        if intent.keyword in actions:
+            return SystemController.shutdown_system(actions[intent.keyword])
         
         return "❌ Unknown power command"
     
-    def handle_create_file(self, command):
+    def handle_create_file(self, intent):
         """Handle file creation"""
-        patterns = [
-            r'(?:create|new|make)\s+file\s+(.+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, command, re.IGNORECASE)
-            if match:
-                filename = match.group(1).strip()
-                return SystemController.create_file(filename)
+        if intent.argument:
+            return SystemController.create_file(intent.argument)
         
         return "❌ Please specify filename"
     
+    def handle_history_search(self, intent):
+        """Handle full-text search over command history"""
+        if not self.history:
+            return "❌ Command history is not available"
+        
+        query = intent.argument
+        page = 1
+        page_match = re.search(r'\s+page\s+(\d+)$', query, re.IGNORECASE)
+        if page_match:
+            page = int(page_match.group(1))
+            query = query[:page_match.start()]
+        if not query.strip():
+            return "❌ History search format: 'history search python page 2'"
+        
+        self.history.flush()
+        results = self.history.search(query, page, config.HISTORY_PAGE_SIZE)
+        if not results:
+            return f"🔍 No history matches for '{query}'" + (f" on page {page}" if page > 1 else "")
+        
+        lines = [f"🕘 History matches for '{query}' (page {page}):"]
+        for _, command, response, timestamp, success in results:
+            status = "✅" if success else "❌"
+            preview = " ".join(response.split())[:80]
+            lines.append(f"{status} [{timestamp[:16]}] {command}\n    → {preview}")
+        if len(results) == config.HISTORY_PAGE_SIZE:
+            lines.append(f"\nMore: 'history search {query} page {page + 1}'")
+        return "\n".join(lines)
+    
+    def handle_clipboard_history(self, intent):
+        """List recent clipboard contents, or fuzzy-search them"""
+        query = intent.argument
+        if query:
+            clips = self.clipboard_watcher.search(query, limit=config.HISTORY_PAGE_SIZE)
+            if not clips:
+                return f"📋 No clipboard history matches for '{query}'"
+            lines = [f"📋 Clipboard matches for '{query}':"]
+        else:
+            clips = self.clipboard_watcher.history(config.HISTORY_PAGE_SIZE)
+            if not clips:
+                return "📋 Clipboard history is empty"
+            lines = [f"📋 Clipboard history ({len(self.clipboard_watcher)} clips, newest first):"]
+        
+        for number, clip in enumerate(clips, 1):
+            preview = " ".join(clip.text.split())
+            if len(preview) > 80:
+                preview = preview[:77] + "..."
+            copied = time.strftime('%H:%M', time.localtime(clip.copied_at))
+            lines.append(f"{number}. [{copied}] {preview} ({clip.size:,} chars)")
+        return "\n".join(lines)
+    
+    def handle_stats(self):
+        """Report AI request deduplication, cache and connection counters"""
+        flights = self.single_flight.stats()
+        lines = ["📊 Assistant Stats:",
+                 f"🔁 Shared in-flight requests: {flights['shared']} of {flights['requests']} "
+                 f"({flights['share_rate']:.0%}), {flights['executions']} executed, {flights['in_flight']} running"]
+        
+        if self.response_cache:
+            cache = self.response_cache.stats()
+            lines.append(f"🗃️  Response cache: {cache['hits']} hits, {cache['misses']} misses "
+                         f"({cache['hit_rate']:.0%}), {cache['entries']} entries, {cache['evictions']} evicted")
+        else:
+            lines.append("🗃️  Response cache: disabled")
+        
+        if self._semantic_cache:
+            semantic = self._semantic_cache.stats()
+            lines.append(f"🧠 Semantic cache: {semantic['hits']} hits, {semantic['misses']} misses "
+                         f"({semantic['hit_rate']:.0%}), {semantic['entries']} entries")
+        
+        qr = self.qr_generator.stats()
+        lines.append(f"📱 QR memo: {qr['hits']} hits, {qr['misses']} misses, {qr['entries']} codes in memory")
+        
+        if self.model:
+            lines.append(f"🌐 AI client: {self.model.requests} requests over {self.model.connections_opened} "
+                         f"connections, {self.model.timeouts} timeouts, {self.model.cancelled} cancelled")
+        else:
+            lines.append("🌐 AI client: demo mode")
+        return "\n".join(lines)
+    
     def handle_email_command(self, command):
         """Handle email sending"""
         # Simple email parsing - extend as needed
@@ -634,12 +1117,16 @@ class AIProcessor:
     
     def handle_reminder_command(self, command):
         """Handle reminder setting"""
-        # Extract reminder details
-        message_match = re.search(r'remind me (?:to )?(.+?) in (\d+ \w+)', command, re.IGNORECASE)
+        # Extract reminder details; the first time phrase that parses ends the message,
+        # so "remind me to check in on Sam in 2 hours" keeps "check in on Sam"
+        message_match = re.search(r'(?:remind me|set reminder)(?: to)? (.+)', command, re.IGNORECASE)
         if message_match:
-            message, when = message_match.groups()
-            return self.scheduler.add_reminder(message, when)
-        return "❌ Reminder format: 'remind me to call John in 30 minutes'"
+            text = message_match.group(1)
+            for split in re.finditer(r'\s(?=(?:in|at|today|tomorrow)\b)', text, re.IGNORECASE):
+                message, when = text[:split.start()].strip(), text[split.end():]
+                if message and parse_due(when) is not None:
+                    return self.scheduler.add_reminder(message, when)
+        return "❌ Reminder format: 'remind me to call John in 30 minutes' or 'remind me to stretch at 5pm'"
     
     def handle_notification_command(self, command):
         """Handle notification sending"""
@@ -656,16 +1143,9 @@ class AIProcessor:
         """Handle text processing with AI"""
         if self.model:
             try:
-                prompt = f"""
-You are an advanced AI assistant integrated into Windows. Process this text according to the user's command.
-
-Command: {command}
-Text to process: {text}
-
-Provide the transformed text only, no explanations unless specifically asked.
-"""
-                response = self.model.generate_content(prompt)
-                return response.text.strip()
+                if self.needs_chunking(text):
+                    return "".join(self.process_chunked(command, text)).strip()
+                return self.generate_cached(self.build_text_prompt(command, text), (command, text))
             except Exception as e:
                 return f"❌ AI Error: {str(e)}"
         else:
@@ -688,17 +1168,145 @@ Provide the transformed text only, no explanations unless specifically asked.
             
             return f"Demo: Processed '{command}' on {len(text)} characters of text"
     
+    def build_text_prompt(self, command, text):
+        """Build the prompt for a text processing command"""
+        return self.prompt_builder.build(command, text)
+    
+    def needs_chunking(self, text):
+        """True when selected text is too long to send as a single request"""
+        return len(text) > config.CHUNK_SIZE_TOKENS * CHARS_PER_TOKEN
+    
+    def process_chunked(self, command, text, progress=None):
+        """Process long text as overlapping parts concurrently, yielding the result in order"""
+        chunk_chars = config.CHUNK_SIZE_TOKENS * CHARS_PER_TOKEN
+        text = compact_text(text, chunk_chars * config.CHUNK_MAX_SEGMENTS)
+        segments = split_text(text, chunk_chars, config.CHUNK_OVERLAP_TOKENS * CHARS_PER_TOKEN)
+        
+        def transform(segment):
+            return self.generate_cached(self.segment_prompt.render(
+                command=command,
+                part=segment.index + 1,
+                total=len(segments),
+                context=segment.context or "(start of text)",
+                text=segment.text
+            ))
+        
+        results = self.chunk_engine.map_ordered(transform, segments, progress)
+        if any(word in command.lower() for word in self.REDUCE_COMMANDS):
+            parts = "\n\n".join(f"Part {number}:\n{result}" for number, result in enumerate(results, 1))
+            yield from self.generate_stream(self.reduce_builder.build(command, parts))
+            return
+        
+        # Stitch transformed parts back together, streaming each as soon as its predecessors are done
+        for segment, result in zip(segments, results):
+            yield result if segment.index == len(segments) - 1 else result + joiner(segment)
+    
     def handle_general_ai(self, command):
         """Handle general AI queries"""
         if self.model:
             try:
-                response = self.model.generate_content(command)
-                return response.text.strip()
+                return self.generate_cached(command, (command, ""))
             except Exception as e:
                 return f"❌ AI Error: {str(e)}"
         else:
             return self.generate_smart_demo_response(command)
     
+    def generate_cached(self, prompt, semantic_key=None):
+        """Generate an AI response, reusing a cached answer for a repeated or reworded prompt
+        
+        semantic_key is (command, text): a cached response for a command with the same
+        meaning on the same text is reused even when the wording differs.
+        """
+        cached = self._cached_response(prompt, semantic_key)
+        if cached is not None:
+            return cached
+        
+        # Identical prompts already in flight share that request's result
+        return self.single_flight.do(prompt_key(self.model_name, prompt), self._generate_and_cache, prompt, semantic_key)
+    
+    def _cached_response(self, prompt, semantic_key=None):
+        """Exact cache hit for the prompt, else a semantic hit for the command, else None"""
+        if self.response_cache:
+            cached = self.response_cache.get(prompt)
+            if cached is not None:
+                return cached
+        if semantic_key and self.semantic_cache:
+            try:
+                return self.semantic_cache.get(*semantic_key)
+            except Exception as e:
+                print(f"Semantic cache lookup error: {e}")
+        return None
+    
+    def _store_response(self, prompt, result, semantic_key=None):
+        """Remember a complete response in the exact and semantic caches"""
+        if self.response_cache:
+            self.response_cache.put(prompt, result)
+        if semantic_key and self.semantic_cache:
+            try:
+                self.semantic_cache.put(*semantic_key, result)
+            except Exception as e:
+                print(f"Semantic cache store error: {e}")
+    
+    def _generate_and_cache(self, prompt, semantic_key=None):
+        """Call the AI model and store the response"""
+        response = self.model.generate_content(prompt)
+        result = response.text.strip()
+        self._store_response(prompt, result, semantic_key)
+        return result
+    
+    def is_slow_command(self, command):
+        """True for commands that call the AI model or block on the network/devices"""
+        intent = self.router.route(command)
+        if intent is None:
+            return bool(self.model)
+        return intent.name in self.SLOW_INTENTS
+    
+    def is_live_command(self, command):
+        """True for commands whose output refreshes until the window is dismissed"""
+        intent = self.router.route(command)
+        return intent is not None and intent.name in self.LIVE_INTENTS
+    
+    def process_command_stream(self, command, selected_text="", progress=None):
+        """Process a command, yielding the response in chunks as they arrive, then any QRImage it made"""
+        if self.model and self.router.route(command) is None:
+            if selected_text and self.needs_chunking(selected_text):
+                yield from self.process_chunked(command, selected_text, progress)
+                return
+            prompt = self.build_text_prompt(command, selected_text) if selected_text else command
+            yield from self.generate_stream(prompt, (command, selected_text))
+        else:
+            # Any image is taken before yielding, so a consumer that stops early leaves nothing behind
+            self._output.image = None
+            response = self.process_command(command, selected_text)
+            image = self.pop_output_image()
+            yield response
+            if image is not None:
+                yield image
+    
+    def generate_stream(self, prompt, semantic_key=None):
+        """Stream an AI response chunk by chunk, serving repeated or reworded prompts from the cache
+        
+        AI errors are raised, not yielded as text, so the stream closes with the error
+        and history records the command as failed.
+        """
+        cached = self._cached_response(prompt, semantic_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        key = prompt_key(self.model_name, prompt)
+        yield from self.single_flight.stream(key, lambda: self._stream_and_cache(prompt, semantic_key))
+    
+    def _stream_and_cache(self, prompt, semantic_key=None):
+        """Stream chunks from the AI model and store the full response"""
+        parts = []
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = chunk.text
+            parts.append(text)
+            yield text
+        
+        self._store_response(prompt, "".join(parts).strip(), semantic_key)
+    
     def fix_grammar_demo(self, text):
         """Demo grammar fixing"""
         # Simple demo - fix common issues
@@ -775,18 +1383,100 @@ Provide the transformed text only, no explanations unless specifically asked.
         return f"🤖 AI Demo Response: I understand you want to '{command}'. In the full version, I would provide a comprehensive AI-generated response with real system integration."
     
     def save_to_history(self, command, response, success=True):
-        """Save command to history database"""
-        if self.conn:
+        """Queue command for the history database writer"""
+        if self.history:
+            self.history.write(command, response, success)
+        if self._completions is not None and success:
+            self._add_completion(command)
+    
+    def complete_command(self, text, limit=5):
+        """Previous commands closest to partially typed text, best first"""
+        if self._completions is None:
+            self._completions = (FuzzyIndex(), set())
+            if self.history:
+                for _, command, _, _, success in self.history.recent(datetime.min, 2000):
+                    if success:
+                        self._add_completion(command)
+        return [match.value for match in self._completions[0].search(text, limit)]
+    
+    def _add_completion(self, command):
+        """Index a command for completion once"""
+        index, seen = self._completions
+        key = command.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            index.add(command.strip())
+    
+    def cancel_ai_requests(self):
+        """Abort in-flight AI requests that a newer command has superseded"""
+        if self.model:
+            self.model.cancel_all()
+    
+    def shutdown(self):
+        """Stop background work, flush pending history rows and close database and AI connections"""
+        if self.app_index:
+            self.app_index.stop()
+        self.metrics_sampler.stop()
+        self.clipboard_watcher.stop()
+        self._screen_watch_stop.set()
+        self.scheduler.shutdown()
+        
+        if self._screen_capture:
+            # Screenshots still being encoded are written before exit
+            self._screen_capture.close()
+        
+        if self.model:
             try:
-                self.conn.execute(
-                    "INSERT INTO command_history (command, response, timestamp, success) VALUES (?, ?, ?, ?)",
-                    (command, response, datetime.now(), success)
-                )
-                self.conn.commit()
+                self.model.close()
+            except Exception as e:
+                print(f"AI client shutdown error: {e}")
+        
+        if self.history:
+            try:
+                self.history.shutdown()
+            except Exception as e:
+                print(f"History shutdown error: {e}")
+        
+        if self.response_cache:
+            try:
+                self.response_cache.close()
+            except Exception as e:
+                print(f"Response cache shutdown error: {e}")
+        
+        if self._semantic_cache:
+            try:
+                self._semantic_cache.close()
             except Exception as e:
-                print(f"History save error: {e}")
+                print(f"Semantic cache shutdown error: {e}")
 
 class UltimateAIAssistant:
+    # Budget for hotkey-to-visible latency (one frame at 60 Hz)
+    FRAME_MS = 1000 / 60
+    
+    WELCOME_MESSAGE = (
+        "🎉 Welcome to your Ultimate AI Assistant! 🚀\n\n"
+        "🆕 NEW ADVANCED FEATURES:\n"
+        "• 🎤 Voice Control: 'listen' or 'speak hello world'\n"
+        "• 📸 Screenshots: 'screenshot' or 'take screenshot'\n"
+        "• 👀 Screen watch: 'watch screen', 'record screen changes', 'stop watching'\n"
+        "• 📶 WiFi Info: 'wifi passwords' to see saved networks\n"
+        "• 🌐 Speed Test: 'speed test' for internet speed\n"
+        "• 📱 QR Codes: 'qr code your text here', 'qr batch' (one per copied line), 'qr sheet'\n"
+        "• 🔋 Battery: 'battery info' for power status\n"
+        "• 🗑️ Cleanup: 'empty recycle bin'\n"
+        "• 💻 Programs: 'list installed programs'\n"
+        "• 🔔 Notifications: 'notification title: message'\n"
+        "• ⏰ Reminders: 'remind me to call John in 30 minutes'\n"
+        "• 📋 Clipboard: 'clipboard history', 'clipboard search invoice'\n\n"
+        "CLASSIC FEATURES:\n"
+        "• 🚀 Launch apps: 'open chrome', 'start notepad'\n"
+        "• 🌐 Web control: 'search Python tutorials', 'go to github.com'\n"
+        "• 💻 System info: 'system info', 'top processes', 'kill chrome', 'shutdown'\n"
+        "• ✍️ Text processing: Select text + 'fix grammar', 'translate'\n"
+        "• 🤖 AI chat: Ask me anything!\n\n"
+        "Try: 'screenshot' or 'speed test' to see advanced features!"
+    )
+    
     def __init__(self):
         print("🚀 Initializing Ultimate AI Windows Assistant...")
         
@@ -794,6 +1484,12 @@ class UltimateAIAssistant:
         self.hidden_root = ctk.CTk()
         self.hidden_root.withdraw()
         
+        # All widget updates from worker threads go through the UI bus
+        self.ui_bus = UIBus(self.hidden_root, config.UI_BUS_INTERVAL_MS)
+        self.ui_bus.register("status", self._apply_status, COALESCE)
+        self.ui_bus.register("live_output", self._show_live_output, COALESCE)
+        self.ui_bus.start()
+        
         self.spotlight_window = None
         self.input_entry = None
         self.status_label = None
@@ -801,28 +1497,24 @@ class UltimateAIAssistant:
         self.is_visible = False
         self.original_text = ""
         self.listener = None
+        self._hotkey_pressed_at = None
+        self._live_ticket = None
+        self._running = (None, None)
+        self.spotlight_latencies = deque(maxlen=100)
         
         # Initialize components
         self.ai_processor = AIProcessor()
+        self.ai_processor.screen_watch_paused = lambda: self.is_visible
+        mark_startup("AI processor ready")
+        self.request_scheduler = RequestScheduler(config.MAX_WORKER_THREADS)
+        self._build_spotlight()
+        mark_startup("spotlight window built")
         self._setup_hotkey()
         
-        # Start background scheduler
-        self._start_scheduler_thread()
-        
         print("✅ Ultimate AI Assistant initialized!")
         print("🎯 Press Ctrl+Alt+A to activate AI Assistant")
         print("💡 NEW Features: Voice control, screenshots, QR codes, WiFi passwords, speed tests!")
         
-    def _start_scheduler_thread(self):
-        """Start background thread for scheduled tasks"""
-        def scheduler_loop():
-            while True:
-                self.ai_processor.scheduler.run_pending()
-                time.sleep(1)
-        
-        scheduler_thread = threading.Thread(target=scheduler_loop, daemon=True)
-        scheduler_thread.start()
-        
     def _setup_hotkey(self):
         """Setup global hotkey listener"""
         try:
@@ -831,6 +1523,7 @@ class UltimateAIAssistant:
                 '<ctrl>+<alt>+a': self.show_spotlight
             })
             self.listener.start()
+            mark_startup("hotkey active")
             print("✅ Hotkey active: Ctrl+Alt+A")
         except ImportError:
             print("❌ pynput not available")
@@ -840,22 +1533,42 @@ class UltimateAIAssistant:
             self.listener = None
     
     def show_spotlight(self):
-        """Show the AI Assistant interface"""
+        """Show the AI Assistant interface (called from the hotkey thread)"""
+        self._hotkey_pressed_at = time.perf_counter()
+        self.ui_bus.call(self._show_spotlight)
+    
+    def _show_spotlight(self):
+        """Reveal the pre-built window with fresh state"""
         if self.is_visible:
+            self._hotkey_pressed_at = None
             if self.spotlight_window:
                 self.spotlight_window.lift()
                 self.spotlight_window.focus_force()
             return
-            
+        
+        if not self.spotlight_window:
+            self._build_spotlight()
+            if not self.spotlight_window:
+                return
+        
         self.is_visible = True
         
-        # Get clipboard content
-        try:
-            self.original_text = pyperclip.paste()
-        except:
-            self.original_text = ""
+        # Clipboard content as last seen by the watcher; read directly only if it has not run yet
+        self.original_text = self.ai_processor.clipboard_watcher.current()
+        if self.original_text is None:
+            try:
+                self.original_text = pyperclip.paste()
+            except:
+                self.original_text = ""
         
-        # Create enhanced UI
+        self._reset_spotlight()
+        self.spotlight_window.deiconify()
+        self.spotlight_window.lift()
+        self.spotlight_window.focus_force()
+        self._focus_input()
+    
+    def _build_spotlight(self):
+        """Build the spotlight window once, hidden until the hotkey is pressed"""
         try:
             self.spotlight_window = ctk.CTkToplevel(self.hidden_root)
             self.spotlight_window.title("Ultimate AI Assistant")
@@ -871,8 +1584,6 @@ class UltimateAIAssistant:
             self.spotlight_window.geometry(f"800x500+{x}+{y}")
             
             self.spotlight_window.attributes('-topmost', True)
-            self.spotlight_window.lift()
-            self.spotlight_window.focus_force()
             
             # Create main container
             main_frame = ctk.CTkFrame(self.spotlight_window, fg_color="transparent")
@@ -979,41 +1690,39 @@ class UltimateAIAssistant:
             # Bind events
             self.input_entry.bind('<Return>', self.process_command)
             self.input_entry.bind('<Escape>', self.hide_spotlight)
+            self.input_entry.bind('<Tab>', self._complete_input)
             self.spotlight_window.protocol("WM_DELETE_WINDOW", self.hide_spotlight)
             
-            # Focus input
-            self.spotlight_window.after(100, self._focus_input)
-            
-            # Show welcome message
-            self.output_text.insert("1.0", 
-                "🎉 Welcome to your Ultimate AI Assistant! 🚀\n\n"
-                "🆕 NEW ADVANCED FEATURES:\n"
-                "• 🎤 Voice Control: 'listen' or 'speak hello world'\n"
-                "• 📸 Screenshots: 'screenshot' or 'take screenshot'\n"
-                "• 📶 WiFi Info: 'wifi passwords' to see saved networks\n"
-                "• 🌐 Speed Test: 'speed test' for internet speed\n"
-                "• 📱 QR Codes: 'qr code your text here'\n"
-                "• 🔋 Battery: 'battery info' for power status\n"
-                "• 🗑️ Cleanup: 'empty recycle bin'\n"
-                "• 💻 Programs: 'list installed programs'\n"
-                "• 🔔 Notifications: 'notification title: message'\n"
-                "• ⏰ Reminders: 'remind me to call John in 30 minutes'\n\n"
-                "CLASSIC FEATURES:\n"
-                "• 🚀 Launch apps: 'open chrome', 'start notepad'\n"
-                "• 🌐 Web control: 'search Python tutorials', 'go to github.com'\n"
-                "• 💻 System info: 'system info', 'kill chrome', 'shutdown'\n"
-                "• ✍️ Text processing: Select text + 'fix grammar', 'translate'\n"
-                "• 🤖 AI chat: Ask me anything!\n\n"
-                "Try: 'screenshot' or 'speed test' to see advanced features!"
-            )
+            self.spotlight_window.bind('<Map>', self._on_spotlight_mapped)
             
+            self.spotlight_window.withdraw()
             print("✅ AI Assistant interface ready")
             
         except Exception as e:
             print(f"❌ Error creating interface: {e}")
             import traceback
             traceback.print_exc()
-            self.is_visible = False
+            self.spotlight_window = None
+    
+    def _reset_spotlight(self):
+        """Return the pre-built window to its initial state"""
+        self.input_entry.delete(0, tk.END)
+        self.output_text.delete("1.0", tk.END)
+        self.output_text.insert("1.0", self.WELCOME_MESSAGE)
+        self._update_status("🟢 Ready • Press Enter to execute • Esc to close", "#888888")
+    
+    def _on_spotlight_mapped(self, event=None):
+        """Record hotkey-to-visible latency when the window is mapped"""
+        if event is not None and event.widget is not self.spotlight_window:
+            return
+        if self._hotkey_pressed_at is None:
+            return
+        
+        latency_ms = (time.perf_counter() - self._hotkey_pressed_at) * 1000
+        self._hotkey_pressed_at = None
+        self.spotlight_latencies.append(latency_ms)
+        frame_note = "within one frame" if latency_ms <= self.FRAME_MS else f"over one frame ({self.FRAME_MS:.1f} ms)"
+        print(f"🪟 Spotlight visible {latency_ms:.1f} ms after hotkey ({frame_note})")
     
     def _focus_input(self):
         """Focus the input field"""
@@ -1031,82 +1740,186 @@ class UltimateAIAssistant:
         command = self.input_entry.get().strip()
         if not command:
             return
+        
+        running, ticket = self._running
+        if command == running and not ticket.is_cancelled() and not ticket.future.done():
+            # Enter pressed again on the same command: keep the request already in flight
+            self.input_entry.delete(0, tk.END)
+            return
 
         # Update status
-        self.status_label.configure(text="🔄 Processing...", text_color="#FFA500")
-        self.input_entry.configure(state="disabled")
+        self._update_status("🔄 Processing...", "#FFA500")
+        self.input_entry.delete(0, tk.END)
         
         # Clear previous output
         self.output_text.delete("1.0", tk.END)
         self.output_text.insert("1.0", "Processing your request...\n")
         
-        # Process in background
-        threading.Thread(target=self._process_async, args=(command,), daemon=True).start()
+        # Process in background, superseding any command still in flight
+        self.request_scheduler.new_command()
+        self.ai_processor.cancel_ai_requests()
+        lane = SLOW if self.ai_processor.is_slow_command(command) else FAST
+        self._running = (command, self.request_scheduler.submit(lane, self._process_async, command))
+    
+    def _complete_input(self, event=None):
+        """Replace the typed text with the closest previous command"""
+        text = self.input_entry.get().strip()
+        if text:
+            matches = self.ai_processor.complete_command(text, limit=1)
+            if matches:
+                self.input_entry.delete(0, tk.END)
+                self.input_entry.insert(0, matches[0])
+        return "break"
+    
+    def _process_async(self, ticket, command):
+        """Process command asynchronously, streaming the response into the output box"""
+        print(f"🎯 Processing: {command}")
+        if self.ai_processor.is_live_command(command):
+            self._run_live(ticket, command)
+            return
+        
+        # The command's image travels with its own result, never through shared state
+        image = []
+        
+        def text_chunks(chunks):
+            for chunk in chunks:
+                if isinstance(chunk, QRImage):
+                    image.append(chunk)
+                else:
+                    yield chunk
+        
+        def on_text(text):
+            if not ticket.is_cancelled():
+                self._append_output(text)
+        
+        def on_done(response, error):
+            if not ticket.is_cancelled():
+                self._finish_output(response, command, error, image[0] if image else None)
+        
+        stream = ResponseStream(self.hidden_root.after, on_text, on_done)
+        self.ui_bus.call(lambda: None if ticket.is_cancelled() else self._begin_output(command))
+        self.ui_bus.call(stream.start)
+        
+        def on_progress(done, total):
+            if not ticket.is_cancelled():
+                self._update_status(f"🧩 Processed part {done} of {total}...", "#FFA500")
+        
+        stream.run(text_chunks(self.ai_processor.process_command_stream(command, self.original_text, on_progress)),
+                   ticket.is_cancelled)
+        
+        if stream.time_to_first_chunk is not None:
+            print(f"⚡ First chunk after {stream.time_to_first_chunk * 1000:.0f} ms")
     
-    def _process_async(self, command):
-        """Process command asynchronously"""
+    def _run_live(self, ticket, command):
+        """Refresh a live view in the output box until a new command or Esc cancels the ticket"""
+        self._live_ticket = ticket
+        last = ""
         try:
-            print(f"🎯 Processing: {command}")
-            
-            # Process with AI
-            response = self.ai_processor.process_command(command, self.original_text)
-            
-            # Save to history
-            self.ai_processor.save_to_history(command, response, True)
-            
-            # Update UI on main thread
-            self.hidden_root.after(0, lambda: self._update_output(response, command))
-            
+            for text in self.ai_processor.watch_top_processes(ticket.wait):
+                if ticket.is_cancelled() or not self.is_visible:
+                    break
+                last = text
+                self.ui_bus.post("live_output", ticket, command, text)
         except Exception as e:
-            error_msg = f"❌ Error: {str(e)}"
-            print(f"❌ Processing error: {e}")
-            self.hidden_root.after(0, lambda: self._update_output(error_msg, command))
+            last = f"❌ Process monitor unavailable: {str(e)}"
+            self.ui_bus.post("live_output", ticket, command, last)
+        finally:
+            if self._live_ticket is ticket:
+                self._live_ticket = None
+        if last:
+            self.ai_processor.save_to_history(command, last, not last.startswith("❌"))
+    
+    def _show_live_output(self, ticket, command, text):
+        """Replace the output with the latest live view"""
+        if ticket.is_cancelled():
+            return
+        if self.output_text:
+            self.output_text.delete("1.0", tk.END)
+            self.output_text.insert("1.0", f"Command: {command}\n" + "=" * 50 + "\n\n" + text)
+        self._apply_status(f"🔴 Live • refreshing every {config.PROCESS_MONITOR_INTERVAL:g}s • Esc to stop", "#FFA500")
+    
+    def _begin_output(self, command):
+        """Replace the placeholder with the response header"""
+        if self.output_text:
+            self.output_text.delete("1.0", tk.END)
+            self.output_text.insert("1.0", f"Command: {command}\n" + "=" * 50 + "\n\n")
+    
+    def _append_output(self, text):
+        """Append a streamed chunk to the output display"""
+        try:
+            if self.output_text:
+                self.output_text.insert(tk.END, text)
+                self.output_text.see(tk.END)
+        except Exception as e:
+            print(f"❌ Error updating output: {e}")
     
-    def _update_output(self, response, command):
-        """Update output display"""
+    def _finish_output(self, response, command, error=None, image=None):
+        """Save the completed response and restore the input"""
+        response = response.strip()
+        if error:
+            print(f"❌ Processing error: {error}")
+            response = f"{response}\n❌ Error: {str(error)}".strip()
+            self._append_output(f"\n❌ Error: {str(error)}")
+        
+        # Save to history
+        self.ai_processor.save_to_history(command, response, error is None)
+        
+        self._update_output(response, command, image)
+    
+    def _update_status(self, message, color):
+        """Queue a status update (safe from any thread; only the latest per frame is shown)"""
+        self.ui_bus.post("status", message, color)
+    
+    def _apply_status(self, message, color):
+        """Update the status label on the main thread"""
+        if self.status_label:
+            self.status_label.configure(text=message, text_color=color)
+    
+    def _update_output(self, response, command, image=None):
+        """Update status and clipboard once the response is complete"""
         try:
             if self.output_text:
-                self.output_text.delete("1.0", tk.END)
-                
-                # Format output nicely
-                output = f"Command: {command}\n"
-                output += "=" * 50 + "\n\n"
-                output += response
-                
-                self.output_text.insert("1.0", output)
-                
+                if image is not None:
+                    self._show_image(image)
+                    copied = copy_image(image.png)
+                    self._update_status("✅ QR code copied to clipboard" if copied else "✅ QR code ready", "#4CAF50")
                 # Copy to clipboard if it's text processing
-                if self.original_text and any(word in command.lower() for word in ['fix', 'translate', 'rewrite', 'grammar']):
+                elif self.original_text and any(word in command.lower() for word in ['fix', 'translate', 'rewrite', 'grammar']):
                     pyperclip.copy(response)
-                    self.status_label.configure(text="✅ Done! Result copied to clipboard", text_color="#4CAF50")
+                    self._update_status("✅ Done! Result copied to clipboard", "#4CAF50")
                 else:
-                    self.status_label.configure(text="✅ Command executed successfully", text_color="#4CAF50")
+                    self._update_status("✅ Command executed successfully", "#4CAF50")
             
-            # Re-enable input
+            # Return focus to the input
             if self.input_entry:
-                self.input_entry.configure(state="normal")
-                self.input_entry.delete(0, tk.END)
                 self.input_entry.focus_set()
             
         except Exception as e:
             print(f"❌ Error updating output: {e}")
     
+    def _show_image(self, image):
+        """Append an in-memory PNG to the output box"""
+        photo = tk.PhotoImage(data=base64.b64encode(image.png))
+        if photo.width() > 300:
+            photo = photo.subsample(2)
+        # CTkTextbox wraps a tk.Text, which can embed images
+        textbox = getattr(self.output_text, "_textbox", self.output_text)
+        textbox.insert(tk.END, "\n\n")
+        textbox.image_create(tk.END, image=photo)
+        # Tk does not keep a reference; the image disappears if the PhotoImage is collected
+        self._output_photo = photo
+    
     def hide_spotlight(self, event=None):
-        """Hide the assistant window"""
+        """Hide the assistant window, keeping it built for the next hotkey"""
+        if self._live_ticket is not None:
+            self._live_ticket.cancel()
         if self.spotlight_window:
             try:
-                self.spotlight_window.destroy()
-            except:
-                pass
-        
-        if self.hidden_root:
-            try:
-                self.hidden_root.quit()
-                self.hidden_root.destroy()
-            except:
-                pass
+                self.spotlight_window.withdraw()
+            except Exception as e:
+                print(f"❌ Error hiding window: {e}")
         
-        sys.exit(0)
+        self.is_visible = False
     
     def run(self):
         """Run the application"""
@@ -1128,11 +1941,8 @@ class UltimateAIAssistant:
             except:
                 pass
         
-        if self.ai_processor.conn:
-            try:
-                self.ai_processor.conn.close()
-            except:
-                pass
+        self.request_scheduler.shutdown()
+        self.ai_processor.shutdown()
         
         if self.spotlight_window:
             try:
@@ -1163,67 +1973,8 @@ def main():
     print("   • 📁 File operations")
     print("=" * 60)
     
-    # Check for required dependencies
-    missing_deps = []
-    try:
-        import customtkinter
-    except ImportError:
-        missing_deps.append("customtkinter")
-    
-    try:
-        import pyperclip
-    except ImportError:
-        missing_deps.append("pyperclip")
-    
-    try:
-        import psutil
-    except ImportError:
-        missing_deps.append("psutil")
-    
-    try:
-        import win32gui
-    except ImportError:
-        missing_deps.append("pywin32")
-    
-    try:
-        from pynput import keyboard
-    except ImportError:
-        missing_deps.append("pynput")
-    
-    try:
-        import pyttsx3
-    except ImportError:
-        missing_deps.append("pyttsx3")
-    
-    try:
-        import speech_recognition
-    except ImportError:
-        missing_deps.append("SpeechRecognition")
-    
-    try:
-        import speedtest
-    except ImportError:
-        missing_deps.append("speedtest-cli")
-    
-    try:
-        import pyautogui
-    except ImportError:
-        missing_deps.append("pyautogui")
-    
-    try:
-        import qrcode
-    except ImportError:
-        missing_deps.append("qrcode[pil]")
-    
-    try:
-        import plyer
-    except ImportError:
-        missing_deps.append("plyer")
-    
-    try:
-        import schedule
-    except ImportError:
-        missing_deps.append("schedule")
+    # Check for required dependencies (without importing them)
+    missing_deps = find_missing_dependencies(REQUIRED_DEPENDENCIES)
     
     if missing_deps:
         print("❌ Missing required dependencies:")
@@ -1243,6 +1994,8 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Needed by the QR batch process pool in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
     
 def main():
@@ -1263,67 +2016,8 @@ def main():
     print("   • 🔔 Smart notifications and reminders")
     print("=" * 60)
     
-    # Check for required dependencies
-    missing_deps = []
-    try:
-        import customtkinter
-    except ImportError:
-        missing_deps.append("customtkinter")
-    
-    try:
-        import pyperclip
-    except ImportError:
-        missing_deps.append("pyperclip")
-    
-    try:
-        import psutil
-    except ImportError:
-        missing_deps.append("psutil")
-    
-    try:
-        import win32gui
-    except ImportError:
-        missing_deps.append("pywin32")
-    
-    try:
-        from pynput import keyboard
-    except ImportError:
-        missing_deps.append("pynput")
-    
-    try:
-        import pyttsx3
-    except ImportError:
-        missing_deps.append("pyttsx3")
-    
-    try:
-        import speech_recognition
-    except ImportError:
-        missing_deps.append("SpeechRecognition")
-    
-    try:
-        import speedtest
-    except ImportError:
-        missing_deps.append("speedtest-cli")
-    
-    try:
-        import pyautogui
-    except ImportError:
-        missing_deps.append("pyautogui")
-    
-    try:
-        import qrcode
-    except ImportError:
-        missing_deps.append("qrcode[pil]")
-    
-    try:
-        import plyer
-    except ImportError:
-        missing_deps.append("plyer")
-    
-    try:
-        import schedule
-    except ImportError:
-        missing_deps.append("schedule")
+    # Check for required dependencies (without importing them)
+    missing_deps = find_missing_dependencies(REQUIRED_DEPENDENCIES)
     
     if missing_deps:
         print("❌ Missing required dependencies:")
@@ -1343,4 +2037,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Needed by the QR batch process pool in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
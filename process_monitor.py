@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Process Monitor for the Ultimate AI Assistant
+Per-process CPU and memory usage from one process_iter pass per tick, keeping only the top consumers.
+"""
+
+import heapq
+import threading
+import time
+from collections import namedtuple
+from operator import attrgetter
+
+from lazy_imports import lazy_import
+
+psutil = lazy_import("psutil")
+
+# cpu is a share of the whole machine (0-100) since the previous tick; memory is resident bytes
+ProcessUsage = namedtuple("ProcessUsage", ["pid", "name", "cpu", "memory"])
+
+# interval is the seconds the CPU figures cover, or None on the first tick
+TopSnapshot = namedtuple("TopSnapshot", ["time", "interval", "count", "by_cpu", "by_memory"])
+
+
+class ProcessMonitor:
+    """Samples every process once per tick and reports the top_n by CPU and by memory"""
+
+    def __init__(self, top_n=10, source=None):
+        self.top_n = top_n
+        self.source = psutil if source is None else source
+        self._lock = threading.Lock()
+        self._cpu_count = None
+        self._previous = {}
+        self._previous_time = None
+        self.ticks = 0
+
+    def sample(self):
+        """Read all processes once and return the top consumers since the previous sample"""
+        with self._lock:
+            if self._cpu_count is None:
+                self._cpu_count = self.source.cpu_count() or 1
+            now = time.monotonic()
+            elapsed = now - self._previous_time if self._previous_time is not None else None
+            previous = self._previous
+            current = {}
+            usages = []
+            for process in self.source.process_iter():
+                try:
+                    # One system call batch per process instead of one per attribute
+                    with process.oneshot():
+                        name = process.name()
+                        times = process.cpu_times()
+                        memory = process.memory_info().rss
+                except Exception:
+                    # Exited or inaccessible since the listing
+                    continue
+
+                cpu_seconds = times.user + times.system
+                pid = process.pid
+                current[pid] = (name, cpu_seconds)
+                cpu = 0.0
+                last = previous.get(pid)
+                # A different name means the PID was reused since the last tick
+                if elapsed and last is not None and last[0] == name and cpu_seconds >= last[1]:
+                    cpu = (cpu_seconds - last[1]) / elapsed / self._cpu_count * 100
+                usages.append(ProcessUsage(pid, name, cpu, memory))
+
+            self._previous, self._previous_time = current, now
+            self.ticks += 1
+            return TopSnapshot(time.time(), elapsed, len(usages),
+                               heapq.nlargest(self.top_n, usages, key=attrgetter("cpu")),
+                               heapq.nlargest(self.top_n, usages, key=attrgetter("memory")))
+
+    def watch(self, stopped, interval=1.0, warmup=0.5):
+        """Yield a snapshot every interval seconds until stopped(timeout) returns True
+
+        stopped waits up to timeout seconds and returns True once watching should end
+        (e.g. a cancellation event's wait), so a dismissed monitor stops immediately.
+        """
+        if self._previous_time is None or time.monotonic() - self._previous_time > interval:
+            # CPU usage needs two readings; the first only sets the baseline
+            self.sample()
+            if stopped(warmup):
+                return
+        while True:
+            yield self.sample()
+            if stopped(interval):
+                return
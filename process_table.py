@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Process Table for the Ultimate AI Assistant
+Cached process snapshot indexed by name and executable, refreshed incrementally by diffing PIDs.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+from fuzzy_match import FuzzyIndex
+from lazy_imports import lazy_import
+
+psutil = lazy_import("psutil")
+
+ProcessInfo = namedtuple("ProcessInfo", ["pid", "name", "exe", "ppid", "create_time"])
+
+# targets: processes selected (children before parents for tree kills); failed holds (ProcessInfo, error) pairs;
+# exact is False when the query only fuzzily matched a name, in which case nothing is killed
+KillResult = namedtuple("KillResult", ["targets", "killed", "failed", "exact"])
+
+
+def process_key(name):
+    """Index key for a process or executable name: lowercase, without directory or .exe"""
+    base = os.path.basename(name or "").lower()
+    return base[:-4] if base.endswith(".exe") else base
+
+
+class ProcessTable:
+    """PID snapshot with name/executable indexes; refresh() only fully inspects PIDs that appeared or were reused"""
+
+    def __init__(self, min_refresh_interval=1.0, source=None):
+        self.min_refresh_interval = min_refresh_interval
+        self.source = psutil if source is None else source
+        self._lock = threading.RLock()
+        self._processes = {}
+        self._by_key = {}
+        self._children = {}
+        self._fuzzy = None
+        self._last_refresh = None
+        self.refreshes = 0
+        self.inspected = 0
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def refresh(self, force=False):
+        """Bring the snapshot up to date, at most once per min_refresh_interval unless forced"""
+        with self._lock:
+            now = time.monotonic()
+            if (not force and self._last_refresh is not None
+                    and now - self._last_refresh < self.min_refresh_interval):
+                return False
+
+            pids = set(self.source.pids())
+            known = set(self._processes)
+            for pid in known - pids:
+                self._remove(pid)
+            for pid in pids & known:
+                # Windows reuses PIDs; a different start time means a different process now
+                if self._create_time(pid) != self._processes[pid].create_time:
+                    self._remove(pid)
+                    known.discard(pid)
+            for pid in pids - known:
+                info = self._inspect(pid)
+                if info is not None:
+                    self._add(info)
+
+            self._last_refresh = now
+            self.refreshes += 1
+            return True
+
+    def _create_time(self, pid):
+        """Start time of the process now holding pid, or None if it exited or is inaccessible"""
+        try:
+            return self.source.Process(pid).create_time()
+        except Exception:
+            return None
+
+    def _inspect(self, pid):
+        """Read one new process, or None if it already exited or is inaccessible"""
+        self.inspected += 1
+        try:
+            process = self.source.Process(pid)
+            with process.oneshot():
+                name = process.name()
+                ppid = process.ppid()
+                create_time = process.create_time()
+                try:
+                    exe = process.exe()
+                except Exception:
+                    # System processes do not expose their executable path to normal users
+                    exe = ""
+        except Exception:
+            return None
+        return ProcessInfo(pid, name, exe, ppid, create_time)
+
+    def _add(self, info):
+        self._processes[info.pid] = info
+        for key in {process_key(info.name), process_key(info.exe), info.exe.lower()} - {""}:
+            pids = self._by_key.setdefault(key, set())
+            if not pids:
+                self._fuzzy = None
+            pids.add(info.pid)
+        self._children.setdefault(info.ppid, set()).add(info.pid)
+
+    def _remove(self, pid):
+        info = self._processes.pop(pid)
+        for key in {process_key(info.name), process_key(info.exe), info.exe.lower()} - {""}:
+            pids = self._by_key.get(key)
+            if pids is not None:
+                pids.discard(pid)
+                if not pids:
+                    del self._by_key[key]
+                    self._fuzzy = None
+        siblings = self._children.get(info.ppid)
+        if siblings is not None:
+            siblings.discard(pid)
+            if not siblings:
+                del self._children[info.ppid]
+
+    def __len__(self):
+        return len(self._processes)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def find(self, query, fuzzy=True):
+        """Processes whose name, executable name or path is query; falls back to the closest fuzzy name"""
+        self.refresh()
+        with self._lock:
+            pids = self._by_key.get(process_key(query.strip())) or self._by_key.get(query.strip().lower())
+            if not pids and fuzzy:
+                if self._fuzzy is None:
+                    # Rebuilt only after the set of names changed
+                    self._fuzzy = FuzzyIndex((key, key) for key in self._by_key if "\\" not in key and "/" not in key)
+                match = self._fuzzy.best(query, min_score=0.45)
+                pids = self._by_key.get(match.value) if match else None
+            return sorted((self._processes[pid] for pid in pids or ()), key=lambda info: (info.create_time, info.pid))
+
+    def descendants(self, pid):
+        """Every process started by pid, directly or indirectly, deepest first"""
+        with self._lock:
+            ordered = []
+            stack = [(pid, False)]
+            seen = {pid}
+            while stack:
+                current, expanded = stack.pop()
+                if expanded:
+                    if current != pid:
+                        ordered.append(self._processes[current])
+                    continue
+                stack.append((current, True))
+                for child in sorted(self._children.get(current, ()), reverse=True):
+                    if child not in seen and child in self._processes:
+                        seen.add(child)
+                        stack.append((child, False))
+            return ordered
+
+    # ------------------------------------------------------------------
+    # Kill
+    # ------------------------------------------------------------------
+
+    def kill(self, query, all_matches=False, tree=False, dry_run=False):
+        """Kill the oldest matching process (or all matches), optionally with its children
+
+        Only an exact name, executable or path match is killed; a fuzzy match
+        ("logon" for winlogon.exe) is returned as a preview with exact=False.
+        """
+        matches = self.find(query, fuzzy=False)
+        exact = bool(matches)
+        if not exact:
+            matches = self.find(query)
+            dry_run = True
+        if not all_matches:
+            matches = matches[:1]
+
+        targets = []
+        selected = set()
+        for info in matches:
+            for target in (self.descendants(info.pid) if tree else []) + [info]:
+                if target.pid not in selected:
+                    selected.add(target.pid)
+                    targets.append(target)
+        if dry_run:
+            return KillResult(targets, [], [], exact)
+
+        killed, failed = [], []
+        for info in targets:
+            try:
+                process = self.source.Process(info.pid)
+                # A recycled PID belongs to a different process now
+                if process.create_time() != info.create_time:
+                    failed.append((info, "process already exited"))
+                    continue
+                process.kill()
+                killed.append(info)
+            except Exception as e:
+                failed.append((info, str(e) or type(e).__name__))
+        with self._lock:
+            for info in killed:
+                if info.pid in self._processes:
+                    self._remove(info.pid)
+        return KillResult(targets, killed, failed, exact)
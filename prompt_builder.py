@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Prompt Builder for the AI Assistants
+Precompiled prompt templates with cheap token estimates and a size budget for pasted text.
+"""
+
+import string
+
+# Rough average for English text and code; good enough to keep requests under budget
+CHARS_PER_TOKEN = 4
+
+# Compaction never looks further into the input than this multiple of the budget,
+# so build time stays bounded however large the clipboard is
+SCAN_FACTOR = 4
+
+TRUNCATION_MARKER = "\n\n[... truncated: {total:,} characters of input shortened to {shown:,} ...]"
+
+
+
+def estimate_tokens(text):
+    """Estimate the token count of text without tokenizing it"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_text(text, max_chars):
+    """Shrink text to at most max_chars: collapse whitespace, drop duplicate lines, then truncate"""
+    if len(text) <= max_chars:
+        return text
+
+    lines = []
+    seen_raw = set()
+    seen = set()
+    previous_blank = False
+    for line in text[:max_chars * SCAN_FACTOR].splitlines():
+        body = line.strip()
+        if not body:
+            if not previous_blank and lines:
+                lines.append("")
+            previous_blank = True
+            continue
+        # Exact repeats are skipped before paying for whitespace collapsing
+        if body in seen_raw:
+            continue
+        seen_raw.add(body)
+        body = " ".join(body.split())
+        if body in seen:
+            continue
+        seen.add(body)
+        lines.append(line[:len(line) - len(line.lstrip())] + body)
+        previous_blank = False
+
+    compacted = "\n".join(lines).rstrip()
+    if len(compacted) <= max_chars and max_chars * SCAN_FACTOR >= len(text):
+        return compacted
+
+    marker_room = len(TRUNCATION_MARKER.format(shown=max_chars, total=len(text)))
+    cut = max(0, max_chars - marker_room)
+    # Prefer to end on a line boundary when one is close by
+    newline = compacted.rfind("\n", 0, cut)
+    if newline > cut * 0.9:
+        cut = newline
+    kept = compacted[:cut]
+    return kept + TRUNCATION_MARKER.format(shown=len(kept), total=len(text))
+
+
+class PromptTemplate:
+    """str.format-style template parsed once and rendered by joining its pieces"""
+
+    def __init__(self, template):
+        self.template = template
+        self._pieces = []
+        self.fields = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if literal:
+                self._pieces.append((True, literal))
+            if field is not None:
+                if spec or conversion or not field.isidentifier():
+                    raise ValueError(f"Unsupported template field: {{{field}}}")
+                self._pieces.append((False, field))
+                self.fields.append(field)
+        self.static_tokens = estimate_tokens("".join(value for is_literal, value in self._pieces if is_literal))
+
+    def render(self, **values):
+        """Fill in the fields"""
+        try:
+            return "".join(value if is_literal else str(values[value]) for is_literal, value in self._pieces)
+        except KeyError as e:
+            raise ValueError(f"Missing prompt field: {e.args[0]}") from None
+
+
+class PromptBuilder:
+    """Builds text-processing prompts, compacting the pasted text to fit the token budget"""
+
+    def __init__(self, template, max_input_tokens=8000):
+        self.template = template if isinstance(template, PromptTemplate) else PromptTemplate(template)
+        self.max_input_tokens = max_input_tokens
+        self.compacted = 0
+
+    def build(self, command, text):
+        """Render the prompt for a command and its selected text"""
+        max_chars = self.max_input_tokens * CHARS_PER_TOKEN
+        if len(text) > max_chars:
+            text = compact_text(text, max_chars)
+            self.compacted += 1
+        return self.template.render(command=command, text=text)
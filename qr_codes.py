@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+QR Codes for the Ultimate AI Assistant
+In-memory QR code PNGs with an LRU memo, and batches rendered on a process pool into a zip or sprite sheet.
+"""
+
+import io
+import math
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from lazy_imports import lazy_import
+
+qrcode = lazy_import("qrcode", "qrcode[pil]")
+Image = lazy_import("PIL.Image", "Pillow")
+ImageDraw = lazy_import("PIL.ImageDraw", "Pillow")
+
+# png holds the encoded image; size is (width, height) in pixels
+QRImage = namedtuple("QRImage", ["text", "png", "size"])
+
+# path of the written zip or sheet; count: codes in it; rendered: codes drawn for this batch;
+# cached: distinct codes reused from the memo
+QRBatch = namedtuple("QRBatch", ["path", "count", "rendered", "cached"])
+
+ERROR_CORRECTION = {"L": 1, "M": 0, "Q": 3, "H": 2}
+
+# Height of the caption strip under each code on a sprite sheet (pixels)
+_CAPTION_HEIGHT = 24
+_CAPTION_CHARS = 40
+
+
+def render_qr(text, box_size=10, border=4, error_correction="M"):
+    """QRImage for text (a module-level function so pool workers can run it)"""
+    qr = qrcode.QRCode(version=None, error_correction=ERROR_CORRECTION[error_correction],
+                       box_size=box_size, border=border)
+    qr.add_data(text)
+    qr.make(fit=True)
+    image = qr.make_image(fill_color="black", back_color="white").get_image()
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=False)
+    return QRImage(text, buffer.getvalue(), image.size)
+
+
+def _render_args(args):
+    return render_qr(*args)
+
+
+def _slug(text, limit=40):
+    """Filesystem-safe short name for a code's text"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")[:limit]
+    return slug or "code"
+
+
+class QRGenerator:
+    """Renders QR codes, memoizing the last cache_size distinct (text, parameters) results"""
+
+    def __init__(self, cache_size=128, box_size=10, border=4, error_correction="M",
+                 workers=None, min_parallel=8):
+        self.cache_size = cache_size
+        self.box_size = box_size
+        self.border = border
+        self.error_correction = error_correction
+        self.workers = workers or os.cpu_count() or 1
+        # Smaller batches render inline; starting worker processes would cost more than it saves
+        self.min_parallel = min_parallel
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Single codes
+    # ------------------------------------------------------------------
+
+    def _key(self, text, box_size, border, error_correction):
+        return (text, box_size or self.box_size, border if border is not None else self.border,
+                (error_correction or self.error_correction).upper())
+
+    def _cached(self, key):
+        with self._lock:
+            image = self._cache.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def _store(self, key, image):
+        with self._lock:
+            self._cache[key] = image
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def generate(self, text, box_size=None, border=None, error_correction=None):
+        """QRImage for text, from the memo when the same text and parameters were rendered recently"""
+        key = self._key(text, box_size, border, error_correction)
+        if key[3] not in ERROR_CORRECTION:
+            raise ValueError(f"Error correction must be one of {', '.join(ERROR_CORRECTION)}")
+        image = self._cached(key)
+        if image is None:
+            image = render_qr(*key)
+            self._store(key, image)
+        return image
+
+    # ------------------------------------------------------------------
+    # Batches
+    # ------------------------------------------------------------------
+
+    def render_many(self, texts):
+        """QRImages for texts in order; uncached ones are rendered in parallel worker processes"""
+        keys = [self._key(text, None, None, None) for text in texts]
+        images = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            image = self._cached(key)
+            if image is None:
+                missing.append(key)
+            else:
+                images[key] = image
+
+        if len(missing) >= self.min_parallel and self.workers > 1:
+            with ProcessPoolExecutor(min(self.workers, len(missing))) as pool:
+                chunk = max(1, len(missing) // (self.workers * 4))
+                rendered = list(pool.map(_render_args, missing, chunksize=chunk))
+        else:
+            rendered = [render_qr(*key) for key in missing]
+        for key, image in zip(missing, rendered):
+            images[key] = image
+            self._store(key, image)
+        return [images[key] for key in keys], len(missing)
+
+    def batch(self, texts, path, layout="zip", columns=None):
+        """Render every text and write them to one zip of PNGs or one sprite-sheet PNG"""
+        texts = [text.strip() for text in texts if text.strip()]
+        if not texts:
+            raise ValueError("No lines to encode")
+        images, rendered = self.render_many(texts)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if layout == "zip":
+            self._write_zip(images, path)
+        elif layout == "sheet":
+            self._write_sheet(images, path, columns)
+        else:
+            raise ValueError(f"Unknown batch layout: {layout}")
+        return QRBatch(path, len(images), rendered, len(set(texts)) - rendered)
+
+    @staticmethod
+    def _write_zip(images, path):
+        width = len(str(len(images)))
+        index = []
+        # PNGs are already compressed; storing them avoids a second deflate pass
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+            for number, image in enumerate(images, 1):
+                name = f"{number:0{width}d}_{_slug(image.text)}.png"
+                archive.writestr(name, image.png)
+                index.append(f"{name}\t{image.text}")
+            archive.writestr("index.txt", "\n".join(index) + "\n", compress_type=zipfile.ZIP_DEFLATED)
+
+    @staticmethod
+    def _write_sheet(images, path, columns=None):
+        columns = columns or math.ceil(math.sqrt(len(images)))
+        rows = math.ceil(len(images) / columns)
+        cell_width = max(image.size[0] for image in images)
+        cell_height = max(image.size[1] for image in images) + _CAPTION_HEIGHT
+        sheet = Image.new("L", (cell_width * columns, cell_height * rows), 255)
+        draw = ImageDraw.Draw(sheet)
+        for number, image in enumerate(images):
+            x, y = (number % columns) * cell_width, (number // columns) * cell_height
+            code = Image.open(io.BytesIO(image.png))
+            sheet.paste(code, (x + (cell_width - code.size[0]) // 2, y))
+            caption = image.text if len(image.text) <= _CAPTION_CHARS else image.text[:_CAPTION_CHARS - 3] + "..."
+            draw.text((x + 8, y + cell_height - _CAPTION_HEIGHT + 4), caption, fill=0)
+        sheet.save(path, format="PNG")
+
+    def stats(self):
+        """Memo hit/miss counters and size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._cache),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Reminder Store for the Ultimate AI Assistant
+Reminders persisted in the assistant's sqlite database with absolute due times, plus due-time parsing.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+Reminder = namedtuple("Reminder", ["id", "message", "due_at", "created_at"])
+
+# Hour used when a day is named without a time ("tomorrow")
+DEFAULT_HOUR = 9
+
+_UNIT_SECONDS = {
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "d": 86400, "day": 86400, "days": 86400,
+    "w": 604800, "week": 604800, "weeks": 604800,
+}
+_DURATION_PART_RE = re.compile(r"\b(\d+\s*|(?:an?|one|half an?)\s+)([a-z]+)\b")
+_CLOCK_RE = re.compile(r"(?:(\d{1,2})(?::(\d{2}))?\s*(am|pm)?|noon|midnight)")
+
+
+def _parse_duration(text):
+    """Seconds in '1 hour 30 minutes', '2h', 'an hour and a half' style text, or None"""
+    text = text.replace(" and a half", " 30 minutes" if "hour" in text else "").replace(",", " ")
+    total = 0
+    position = 0
+    for match in _DURATION_PART_RE.finditer(text):
+        if text[position:match.start()].strip() not in ("", "and"):
+            return None
+        count, unit = match.group(1).strip(), match.group(2)
+        if unit not in _UNIT_SECONDS:
+            return None
+        total += (0.5 if count.startswith("half") else 1 if not count.isdigit() else int(count)) * _UNIT_SECONDS[unit]
+        position = match.end()
+    if position == 0 or text[position:].strip():
+        return None
+    return total
+
+
+def _parse_clock(text):
+    """(hour, minute) for '5pm', '17:30', 'noon', or None"""
+    match = _CLOCK_RE.fullmatch(text.strip())
+    if not match:
+        return None
+    if text.strip() == "noon":
+        return 12, 0
+    if text.strip() == "midnight":
+        return 0, 0
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    elif match.group(2) is None:
+        # A bare number is ambiguous ("at 5"); require a minute or am/pm
+        return None
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def parse_due(when, now=None):
+    """Absolute due timestamp for 'in 30 minutes', 'at 5pm', 'tomorrow at 9:15' and similar, or None"""
+    now = time.time() if now is None else now
+    text = " ".join(when.lower().split())
+
+    if text.startswith("in "):
+        seconds = _parse_duration(text[3:])
+        return now + seconds if seconds else None
+
+    day_offset = None
+    for word, offset in (("today", 0), ("tomorrow", 1)):
+        if text.startswith(word):
+            day_offset, text = offset, text[len(word):].strip()
+        elif text.endswith(word):
+            day_offset, text = offset, text[:-len(word)].strip()
+
+    current = datetime.fromtimestamp(now)
+    if not text:
+        if not day_offset:
+            return None
+        clock = (DEFAULT_HOUR, 0)
+    else:
+        if not text.startswith("at "):
+            return None
+        clock = _parse_clock(text[3:])
+        if clock is None:
+            return None
+
+    due = current.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0) + timedelta(days=day_offset or 0)
+    if due.timestamp() <= now:
+        if day_offset is not None:
+            return None
+        # "at 8am" after 8am means tomorrow morning
+        due += timedelta(days=1)
+    return due.timestamp()
+
+
+class ReminderStore:
+    """Pending and fired reminders, with an index over the due times of pending ones"""
+
+    def __init__(self, db_path):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY,
+                message TEXT,
+                due_at REAL,
+                created_at REAL,
+                fired_at REAL
+            )
+        ''')
+        # Partial index: lookups only ever touch reminders that have not fired
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_pending_due ON reminders (due_at) "
+                          "WHERE fired_at IS NULL")
+        self.conn.commit()
+
+    def add(self, message, due_at):
+        """Store a reminder and return it"""
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO reminders (message, due_at, created_at) VALUES (?, ?, ?)", (message, due_at, now)
+            )
+            self.conn.commit()
+        return Reminder(cursor.lastrowid, message, due_at, now)
+
+    def mark_fired(self, reminder_ids, fired_at=None):
+        """Record that reminders were shown"""
+        fired_at = time.time() if fired_at is None else fired_at
+        with self._lock:
+            self.conn.executemany("UPDATE reminders SET fired_at = ? WHERE id = ?",
+                                  [(fired_at, reminder_id) for reminder_id in reminder_ids])
+            self.conn.commit()
+
+    def cancel(self, reminder_id):
+        """Delete a pending reminder"""
+        with self._lock:
+            deleted = self.conn.execute(
+                "DELETE FROM reminders WHERE id = ? AND fired_at IS NULL", (reminder_id,)
+            ).rowcount
+            self.conn.commit()
+        return bool(deleted)
+
+    def pending(self, before=None, limit=-1):
+        """Unfired reminders ordered by due time, optionally only those due before a timestamp"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, message, due_at, created_at FROM reminders "
+                "WHERE fired_at IS NULL AND due_at < ? ORDER BY due_at LIMIT ?",
+                (float("inf") if before is None else before, limit)
+            ).fetchall()
+        return [Reminder(*row) for row in rows]
+
+    def pending_count(self):
+        """Number of unfired reminders"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM reminders WHERE fired_at IS NULL").fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Request Scheduler for the AI Assistants
+Fixed-size worker pool with separate lanes for fast local commands and slow AI/network work.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+FAST = "fast"
+SLOW = "slow"
+
+
+class RequestTicket:
+    """Handle for a submitted command; lets running work notice it was superseded"""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self._cancelled = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        """Mark the request as cancelled and drop it if it has not started yet"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def is_cancelled(self):
+        """True once a newer command has replaced this one"""
+        return self._cancelled.is_set()
+
+    def wait(self, timeout=None):
+        """Sleep up to timeout seconds, returning True as soon as the request is cancelled"""
+        return self._cancelled.wait(timeout)
+
+
+class RequestScheduler:
+    """Runs commands on a bounded pool split into fast and slow lanes"""
+
+    def __init__(self, max_workers=2):
+        fast_workers = max(1, max_workers // 2)
+        slow_workers = max(1, max_workers - fast_workers)
+        self._lanes = {
+            FAST: ThreadPoolExecutor(max_workers=fast_workers, thread_name_prefix="assistant-fast"),
+            SLOW: ThreadPoolExecutor(max_workers=slow_workers, thread_name_prefix="assistant-slow"),
+        }
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._active = []
+        self._stats = {lane: {"submitted": 0, "completed": 0, "cancelled": 0, "depth": 0, "max_depth": 0}
+                       for lane in self._lanes}
+
+    def new_command(self):
+        """Start a new command generation, cancelling everything from the previous one"""
+        with self._lock:
+            self._generation += 1
+            stale, self._active = self._active, []
+        for ticket in stale:
+            ticket.cancel()
+        return self._generation
+
+    def submit(self, lane, func, *args, generation=None):
+        """Queue func(ticket, *args) on a lane; returns the RequestTicket"""
+        with self._lock:
+            ticket = RequestTicket(self._generation if generation is None else generation)
+            if ticket.generation != self._generation:
+                ticket.cancel()
+                return ticket
+            stats = self._stats[lane]
+            stats["submitted"] += 1
+            stats["depth"] += 1
+            stats["max_depth"] = max(stats["max_depth"], stats["depth"])
+            self._active.append(ticket)
+
+        ticket.future = self._lanes[lane].submit(self._run, lane, ticket, func, args)
+        ticket.future.add_done_callback(lambda future: self._done(lane, ticket))
+        return ticket
+
+    def _run(self, lane, ticket, func, args):
+        """Worker wrapper that records lane metrics"""
+        with self._lock:
+            self._stats[lane]["depth"] -= 1
+        if ticket.is_cancelled():
+            return None
+        return func(ticket, *args)
+
+    def _done(self, lane, ticket):
+        """Bookkeeping once a ticket finishes or is cancelled"""
+        with self._lock:
+            stats = self._stats[lane]
+            if ticket.future.cancelled():
+                # Never reached a worker, so it is still counted as queued
+                stats["depth"] -= 1
+            stats["cancelled" if ticket.is_cancelled() else "completed"] += 1
+            if ticket in self._active:
+                self._active.remove(ticket)
+
+    def stats(self):
+        """Per-lane counters including current queue depth"""
+        with self._lock:
+            return {lane: dict(stats) for lane, stats in self._stats.items()}
+
+    def shutdown(self, wait=False):
+        """Cancel queued work and stop the worker threads"""
+        self.new_command()
+        for executor in self._lanes.values():
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Response Cache for the Ultimate AI Assistant
+Persistent, content-addressed cache of AI responses stored in the assistant's sqlite database.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so trivially different prompts share a cache entry"""
+    return _WHITESPACE_RE.sub(" ", prompt).strip()
+
+
+def prompt_key(model_name, prompt):
+    """Content address for a model + normalized prompt pair"""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL cache of AI responses with a size cap and hit/miss counters"""
+
+    def __init__(self, db_path, model_name, max_entries=500, ttl_seconds=24 * 3600):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT,
+                created_at REAL,
+                last_used REAL
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_last_used ON response_cache (last_used)")
+        self.conn.commit()
+
+    def get(self, prompt):
+        """Return the cached response for a prompt, or None on a miss"""
+        key = prompt_key(self.model_name, prompt)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self.conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                    self.conn.commit()
+                    self.evictions += 1
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, prompt, response):
+        """Store a response and evict the least recently used entries past the size cap"""
+        key = prompt_key(self.model_name, prompt)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, self.model_name, response, now, now)
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        """Drop expired entries, then the oldest entries beyond max_entries"""
+        expired = self.conn.execute(
+            "DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self.conn.execute(
+            "DELETE FROM response_cache WHERE key IN ("
+            "SELECT key FROM response_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        self.evictions += expired + overflow
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self.conn.execute("DELETE FROM response_cache")
+            self.conn.commit()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": size,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the cache connection"""
+        with self._lock:
+            self.conn.close()
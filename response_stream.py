@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Response Stream for the Ultimate AI Assistant
+Hands AI output chunks from a worker thread to the Tk thread through a bounded queue.
+"""
+
+import queue
+import time
+
+_END = object()
+
+
+class ResponseStream:
+    """Bounded chunk queue drained on the UI thread with one coalesced update per flush"""
+
+    def __init__(self, schedule, on_text, on_done, max_chunks=256, flush_interval_ms=30):
+        # schedule(delay_ms, callback) must run callback on the UI thread (e.g. root.after)
+        self.schedule = schedule
+        self.on_text = on_text
+        self.on_done = on_done
+        self.flush_interval_ms = flush_interval_ms
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._parts = []
+        self._error = None
+        self.started_at = time.perf_counter()
+        self.first_chunk_at = None
+        self.finished_at = None
+        self.flushes = 0
+
+    @property
+    def time_to_first_chunk(self):
+        """Seconds from stream creation until the first chunk arrived, or None"""
+        if self.first_chunk_at is None:
+            return None
+        return self.first_chunk_at - self.started_at
+
+    @property
+    def text(self):
+        """Everything received so far"""
+        return "".join(self._parts)
+
+    # ------------------------------------------------------------------
+    # Producer side (worker thread)
+    # ------------------------------------------------------------------
+
+    def feed(self, chunk):
+        """Queue a chunk, blocking while the UI thread catches up"""
+        if not chunk:
+            return
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.perf_counter()
+        self._queue.put(chunk)
+
+    def close(self, error=None):
+        """Mark the stream as complete"""
+        self._error = error
+        self._queue.put(_END)
+
+    def run(self, chunks, cancelled=None):
+        """Feed every chunk from an iterable, closing the stream when it ends, fails or is cancelled"""
+        try:
+            for chunk in chunks:
+                if cancelled is not None and cancelled():
+                    break
+                self.feed(chunk)
+        except Exception as e:
+            self.close(e)
+        else:
+            self.close()
+
+    # ------------------------------------------------------------------
+    # Consumer side (UI thread)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Begin draining the queue on the UI thread"""
+        self.schedule(0, self.flush)
+
+    def flush(self):
+        """Apply all queued chunks in a single UI update, then reschedule"""
+        pending = []
+        finished = False
+        while True:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is _END:
+                finished = True
+                break
+            pending.append(chunk)
+
+        if pending:
+            self.flushes += 1
+            self._parts.extend(pending)
+            self.on_text("".join(pending))
+
+        if finished:
+            self.finished_at = time.perf_counter()
+            self.on_done(self.text, self._error)
+        else:
+            self.schedule(self.flush_interval_ms, self.flush)
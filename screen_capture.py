@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Screen Capture for the Ultimate AI Assistant
+Grabs raw frames into reusable buffers, skips unchanged frames and encodes screenshots on a background pool.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+mss = lazy_import("mss")
+Image = lazy_import("PIL.Image", "Pillow")
+ImageGrab = lazy_import("PIL.ImageGrab", "Pillow")
+
+# path is where the frame is (being) written; for a duplicate it is the earlier identical screenshot.
+# saved is a Future resolving to the path once encoding finished (None for duplicates)
+Screenshot = namedtuple("Screenshot", ["path", "duplicate", "width", "height", "saved"])
+
+# Extension -> (Pillow format name, extension used for new files)
+FORMATS = {
+    "png": ("PNG", ".png"),
+    "jpg": ("JPEG", ".jpg"),
+    "jpeg": ("JPEG", ".jpg"),
+    "webp": ("WEBP", ".webp"),
+    "bmp": ("BMP", ".bmp"),
+}
+
+# Width in 64-bit words of the grid the fingerprint sums over
+_DIGEST_ROW_WORDS = 1024
+
+
+# ============================================================================
+# FRAME SOURCES
+# ============================================================================
+
+# A source has a raw_mode (Pillow raw mode of its pixels, e.g. "BGRX" or "RGB") and
+# grab(region=None), returning the primary screen, or the (x, y, width, height) part
+# of it, as a (height, width, channels) uint8 array.
+
+class MssSource:
+    """Primary monitor through mss: raw BGRA straight from the OS, no image object in between"""
+
+    raw_mode = "BGRX"
+
+    def __init__(self):
+        # mss handles are per thread; captures are serialized by ScreenCapture
+        self._sct = mss.mss()
+
+    def grab(self, region=None):
+        monitor = self._sct.monitors[1]
+        if region is not None:
+            x, y, width, height = region
+            monitor = {"left": monitor["left"] + x, "top": monitor["top"] + y, "width": width, "height": height}
+        shot = self._sct.grab(monitor)
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+
+class PillowSource:
+    """Primary screen through Pillow's ImageGrab, for systems without mss"""
+
+    raw_mode = "RGB"
+
+    def grab(self, region=None):
+        bbox = None if region is None else (region[0], region[1], region[0] + region[2], region[1] + region[3])
+        return np.asarray(ImageGrab.grab(bbox=bbox).convert("RGB"))
+
+
+def default_source():
+    """Fastest available frame source"""
+    try:
+        return MssSource()
+    except ImportError:
+        return PillowSource()
+
+
+def frame_digest(frame):
+    """NumPy fingerprint of a frame: wrapping sums of every row and column of its 64-bit words, hashed
+
+    Position-sensitive like a byte hash (moved or swapped content changes the row or
+    column sums) but runs at memory speed instead of hashing every byte.
+    """
+    flat = frame.reshape(-1)
+    whole = len(flat) // (8 * _DIGEST_ROW_WORDS) * 8 * _DIGEST_ROW_WORDS
+    words = flat[:whole].view(np.uint64).reshape(-1, _DIGEST_ROW_WORDS)
+    digest = hashlib.blake2b(repr(frame.shape).encode("ascii"), digest_size=16)
+    digest.update(words.sum(axis=1, dtype=np.uint64).tobytes())
+    digest.update(words.sum(axis=0, dtype=np.uint64).tobytes())
+    digest.update(flat[whole:].tobytes())
+    return digest.digest()
+
+
+def encode_frame(frame, raw_mode, path, image_format, **options):
+    """Write a frame with Pillow, decoding the source's raw pixel layout without an extra copy"""
+    height, width = frame.shape[:2]
+    image = Image.frombuffer("RGB", (width, height), frame, "raw", raw_mode, 0, 1)
+    image.save(path, format=image_format, **options)
+
+
+# ============================================================================
+# CAPTURE PIPELINE
+# ============================================================================
+
+class ScreenCapture:
+    """Captures on the calling thread, encodes on a pool; at most workers + 1 frames are held in memory"""
+
+    def __init__(self, directory, image_format="png", compress_level=1, quality=90, workers=2,
+                 source=None, encoder=None):
+        self.directory = directory
+        self.image_format = image_format.lower().lstrip(".")
+        if self.image_format not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        self.compress_level = compress_level
+        self.quality = quality
+        self.source = source
+        self.encoder = encode_frame if encoder is None else encoder
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="screenshot-encode")
+        # Frames waiting to be encoded hold a buffer each; capture blocks once all are in use
+        self._slots = threading.Semaphore(workers + 1)
+        self._free = []
+        self._free_lock = threading.Lock()
+        self._capture_lock = threading.RLock()
+        self._last_digest = None
+        self._last_path = None
+        self._last_stem = None
+        self._stem_repeats = 0
+        self.captured = 0
+        self.duplicates = 0
+        self.saved = 0
+        self.failed = 0
+        self.capture_seconds = 0.0
+        self.encode_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Buffers
+    # ------------------------------------------------------------------
+
+    def _acquire_buffer(self, shape):
+        self._slots.acquire()
+        with self._free_lock:
+            while self._free:
+                buffer = self._free.pop()
+                if buffer.shape == shape:
+                    return buffer
+                # Resolution changed; let old-sized buffers go
+        return np.empty(shape, dtype=np.uint8)
+
+    def _release_buffer(self, buffer):
+        with self._free_lock:
+            self._free.append(buffer)
+        self._slots.release()
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+
+    def next_path(self, image_format=None, prefix="screenshot"):
+        """Timestamped file in a per-day folder under the screenshots directory"""
+        now = datetime.now()
+        folder = os.path.join(self.directory, now.strftime("%Y-%m-%d"))
+        os.makedirs(folder, exist_ok=True)
+        extension = FORMATS[image_format or self.image_format][1]
+        stem = os.path.join(folder, f"{prefix}_{now.strftime('%H%M%S_%f')[:-3]}")
+        # Files are written asynchronously, so a clash within the same millisecond is not visible on disk yet
+        self._stem_repeats = self._stem_repeats + 1 if stem == self._last_stem else 1
+        self._last_stem = stem
+        suffix = f"_{self._stem_repeats}" if self._stem_repeats > 1 else ""
+        return f"{stem}{suffix}{extension}"
+
+    def capture(self, path=None, skip_duplicates=True):
+        """Grab the screen and queue it for encoding; returns without waiting for the file"""
+        with self._capture_lock:
+            start = time.perf_counter()
+            if self.source is None:
+                self.source = default_source()
+            frame = self.source.grab()
+            return self.save(frame, self.source.raw_mode, path, skip_duplicates, started=start)
+
+    def save(self, frame, raw_mode, path=None, skip_duplicates=False, prefix="screenshot", started=None):
+        """Queue an already grabbed frame for encoding (the frame is copied, so the caller may reuse it)"""
+        with self._capture_lock:
+            start = time.perf_counter() if started is None else started
+            buffer = self._acquire_buffer(frame.shape)
+            try:
+                np.copyto(buffer, frame)
+                digest = frame_digest(buffer)
+            except Exception:
+                self._release_buffer(buffer)
+                raise
+            duplicate = skip_duplicates and path is None and digest == self._last_digest
+            self._last_digest = digest
+            self.captured += 1
+            self.capture_seconds += time.perf_counter() - start
+
+            height, width = buffer.shape[:2]
+            if duplicate:
+                self._release_buffer(buffer)
+                self.duplicates += 1
+                return Screenshot(self._last_path, True, width, height, None)
+
+            image_format = self.image_format
+            if path is None:
+                path = self.next_path(prefix=prefix)
+            else:
+                image_format = os.path.splitext(path)[1].lower().lstrip(".") or image_format
+                if image_format not in FORMATS:
+                    self._release_buffer(buffer)
+                    raise ValueError(f"Unsupported screenshot format: {image_format}")
+            self._last_path = path
+
+        saved = self._executor.submit(self._encode, buffer, raw_mode, path, image_format)
+        return Screenshot(path, False, width, height, saved)
+
+    def _encode(self, buffer, raw_mode, path, image_format):
+        start = time.perf_counter()
+        name, _ = FORMATS[image_format]
+        options = {"compress_level": self.compress_level} if name == "PNG" else {}
+        if name in ("JPEG", "WEBP"):
+            options["quality"] = self.quality
+        # Written next to the target and renamed, so a half-written file never appears
+        partial = f"{path}.part"
+        try:
+            self.encoder(buffer, raw_mode, partial, name, **options)
+            os.replace(partial, path)
+            with self._free_lock:
+                self.saved += 1
+            return path
+        except Exception as e:
+            with self._free_lock:
+                self.failed += 1
+            print(f"❌ Screenshot encoding failed: {e}")
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+            raise
+        finally:
+            with self._free_lock:
+                self.encode_seconds += time.perf_counter() - start
+            self._release_buffer(buffer)
+
+    def stats(self):
+        """Capture counters and average grab/encode times"""
+        return {
+            "captured": self.captured,
+            "duplicates": self.duplicates,
+            "saved": self.saved,
+            "failed": self.failed,
+            "capture_ms": self.capture_seconds / self.captured * 1000 if self.captured else 0.0,
+            "encode_ms": self.encode_seconds / (self.saved + self.failed) * 1000 if self.saved + self.failed else 0.0,
+        }
+
+    def close(self):
+        """Finish queued encodes and stop the pool"""
+        self._executor.shutdown(wait=True)
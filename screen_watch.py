@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Screen Watch for the Ultimate AI Assistant
+Captures the screen (or one region) at a fixed rate and reports frames whose downsampled diff passes a threshold.
+"""
+
+import re
+import time
+from collections import namedtuple
+
+from lazy_imports import lazy_import
+from screen_capture import default_source
+
+np = lazy_import("numpy")
+
+# fraction: share of blocks that changed; box: (x, y, width, height) of the changed
+# blocks in frame pixels; frame: the full-resolution frame that showed the change
+ScreenChange = namedtuple("ScreenChange", ["time", "frame_number", "fraction", "box", "frame"])
+
+_REGION_RE = re.compile(r"\b(\d+)\s*[, ]\s*(\d+)\s*[, ]\s*(\d+)\s*(?:[, x]\s*)(\d+)\b")
+
+
+def parse_region(text):
+    """(x, y, width, height) from 'region 100 200 640 480', '100,200,640,480' or '100 200 640x480', or None"""
+    match = _REGION_RE.search(text)
+    if not match:
+        return None
+    x, y, width, height = (int(value) for value in match.groups())
+    return (x, y, width, height) if width > 0 and height > 0 else None
+
+
+def block_means(frame, scale):
+    """Mean green level of every scale x scale block (green carries most of the luminance)
+
+    Rows are added as uint16 slices and columns summed once on the row totals, so a
+    1080p frame reduces in a few milliseconds without converting it to grayscale first.
+    """
+    scale = max(1, min(scale, 16, frame.shape[0], frame.shape[1]))
+    rows, columns = frame.shape[0] // scale, frame.shape[1] // scale
+    green = frame[:rows * scale, :columns * scale, 1] if frame.ndim == 3 else frame[:rows * scale, :columns * scale]
+    bands = green.reshape(rows, scale, columns * scale)
+    total = bands[:, 0].astype(np.uint16)
+    for i in range(1, scale):
+        total += bands[:, i]
+    blocks = total.reshape(rows, columns, scale).sum(axis=2, dtype=np.uint32)
+    return (blocks // (scale * scale)).astype(np.int16)
+
+
+class FrameDiffer:
+    """Compares downsampled frames with the last reported one
+
+    A block counts as changed when its mean moved by more than pixel_threshold levels; a
+    frame is reported when at least change_threshold of the blocks, or at least min_blocks
+    blocks, changed. The share alone would depend on the watched area: on a full 1080p
+    screen 0.5% is about 160 blocks, more than a small dialog covers. Comparing to the
+    last reported frame (not the previous one) also catches slow, gradual changes.
+    """
+
+    def __init__(self, scale=8, pixel_threshold=24, change_threshold=0.005, min_blocks=4):
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.change_threshold = change_threshold
+        self.min_blocks = min_blocks
+        self._reference = None
+
+    def reset(self):
+        """Forget the reference; the next frame becomes the new baseline"""
+        self._reference = None
+
+    def check(self, frame):
+        """(fraction, box) when the frame differs from the reference, else None"""
+        small = block_means(frame, self.scale)
+        reference = self._reference
+        if reference is None or reference.shape != small.shape:
+            self._reference = small
+            return None
+
+        changed = np.abs(small - reference) > self.pixel_threshold
+        count = np.count_nonzero(changed)
+        fraction = count / changed.size
+        if not count or (fraction < self.change_threshold and count < self.min_blocks):
+            return None
+
+        self._reference = small
+        scale = max(1, min(self.scale, 16, frame.shape[0], frame.shape[1]))
+        rows = np.flatnonzero(changed.any(axis=1))
+        columns = np.flatnonzero(changed.any(axis=0))
+        box = (int(columns[0]) * scale, int(rows[0]) * scale,
+               int(columns[-1] - columns[0] + 1) * scale, int(rows[-1] - rows[0] + 1) * scale)
+        return fraction, box
+
+
+class ScreenWatcher:
+    """Grabs frames at up to fps and yields the ones that changed"""
+
+    def __init__(self, region=None, fps=10, differ=None, source=None, paused=None, settle=0.3):
+        self.region = region
+        self.fps = fps
+        self.differ = differ or FrameDiffer()
+        self.source = source
+        # While paused() is true (e.g. the assistant's own window is on screen) frames are not
+        # compared; after it turns false the screen gets settle seconds before a new baseline
+        self.paused = paused
+        self.settle = settle
+        self.frames = 0
+        self.changes = 0
+        self.diff_seconds = 0.0
+        self._first_frame = None
+        self._last_frame = None
+
+    def watch(self, stopped):
+        """Yield a ScreenChange for every changed frame until stopped(timeout) returns True
+
+        stopped waits up to timeout seconds and returns True once watching should end,
+        like a cancellation event's wait.
+        """
+        if self.source is None:
+            # Created on the watching thread; screen grabbers hold per-thread OS handles
+            self.source = default_source()
+        interval = 1.0 / self.fps
+        was_paused = False
+        next_frame = time.monotonic()
+        while True:
+            if self.paused is not None and self.paused():
+                was_paused = True
+                if stopped(min(interval * 2, 0.5)):
+                    return
+                continue
+            if was_paused:
+                was_paused = False
+                self.differ.reset()
+                if stopped(self.settle):
+                    return
+                next_frame = time.monotonic()
+
+            frame = self.source.grab(self.region)
+            start = time.perf_counter()
+            result = self.differ.check(frame)
+            self.diff_seconds += time.perf_counter() - start
+            self.frames += 1
+            now = time.monotonic()
+            if self._first_frame is None:
+                self._first_frame = now
+            self._last_frame = now
+
+            if result is not None:
+                self.changes += 1
+                fraction, box = result
+                yield ScreenChange(time.time(), self.frames, fraction, box, frame)
+
+            next_frame += interval
+            delay = next_frame - time.monotonic()
+            if delay < 0:
+                # Fell behind (slow grab): continue at the achievable rate instead of bursting
+                next_frame, delay = time.monotonic(), 0
+            if stopped(delay):
+                return
+
+    def achieved_fps(self):
+        """Frames per second actually captured so far"""
+        if self.frames < 2:
+            return 0.0
+        return (self.frames - 1) / max(self._last_frame - self._first_frame, 1e-9)
+
+    def stats(self):
+        """Frame, change and timing counters"""
+        return {
+            "frames": self.frames,
+            "changes": self.changes,
+            "fps": self.achieved_fps(),
+            "diff_ms": self.diff_seconds / self.frames * 1000 if self.frames else 0.0,
+        }
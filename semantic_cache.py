@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Semantic Cache for the Ultimate AI Assistant
+Reuses AI responses for reworded commands on the same text, using int8 embeddings in memory-mapped NumPy arrays.
+"""
+
+import hashlib
+import importlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+# Bits in the SimHash signature used to shortlist candidates before exact cosine scoring
+SIGNATURE_BITS = 128
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that carry no meaning in a request to the assistant
+_STOP_WORDS = frozenset("""
+    a an the this that these those it its of for to in on at by with about from into as and or
+    me my i you your we our please can could would will should kindly just give make let do
+    want like need some any is are be more quick quickly briefly
+""".split())
+
+_SUFFIXES = ("isation", "ization", "ations", "ation", "ising", "izing", "ised", "ized", "ise", "ize",
+             "ies", "ing", "ed", "es", "ly", "s", "y", "e")
+
+
+def stem(word):
+    """Crude suffix stripping so 'summary', 'summarize' and 'summarise' share a stem"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+class HashingEmbedder:
+    """Offline embedding: hashed word stems and their character trigrams (the cache normalizes them)
+
+    Uses crc32 rather than hash() so vectors are stable across runs.
+    """
+
+    name = "hashing-v1"
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def features(self, text):
+        """(feature, weight) pairs for a piece of text"""
+        words = [word for word in _WORD_RE.findall(text.lower())
+                 if word not in _STOP_WORDS and (len(word) > 1 or word.isdigit())]
+        for word in words:
+            if word.isdigit():
+                # Numbers change the meaning of a request ("3 bullet points" vs "5")
+                yield f"#{word}", 3.0
+                continue
+            root = stem(word)
+            yield f"w:{root}", 1.0
+            padded = f"<{root}>"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3], 0.3
+
+    def __call__(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(text):
+            code = zlib.crc32(feature.encode("utf-8"))
+            # The top bit picks the sign so colliding features tend to cancel rather than add up
+            vector[code % self.dim] += weight if code & 0x80000000 else -weight
+        return vector
+
+
+def load_embedder(spec, dim=256):
+    """Embedding function from a 'module:function' spec, or the built-in hashing embedder when empty"""
+    if not spec:
+        return HashingEmbedder(dim)
+    module_name, _, attribute = spec.partition(":")
+    embed = getattr(importlib.import_module(module_name), attribute)
+    if not hasattr(embed, "name"):
+        embed.name = spec
+    return embed
+
+
+def context_hash(model_name, context):
+    """Non-zero 63-bit hash of the model and the text a command applies to"""
+    digest = hashlib.blake2b(f"{model_name}\0{context}".encode("utf-8"), digest_size=8).digest()
+    return (int.from_bytes(digest, "little") & 0x7FFF_FFFF_FFFF_FFFF) | 1
+
+
+class SemanticCache:
+    """Ring of max_entries embeddings; lookups shortlist by SimHash distance, then score cosine exactly"""
+
+    def __init__(self, db_path, index_dir, model_name, embed=None, max_entries=100_000, threshold=0.9,
+                 ttl_seconds=24 * 3600):
+        self.model_name = model_name
+        # Responses older than this are not reused, however close the command
+        self.ttl_seconds = ttl_seconds
+        self.embed = embed or HashingEmbedder()
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.dim = len(self.embed("probe"))
+        # Random hyperplanes for the signature; a fixed seed keeps stored signatures valid across runs
+        self._planes = np.random.default_rng(20240601).standard_normal((self.dim, SIGNATURE_BITS)).astype(np.float32)
+        # Near-duplicates at the threshold differ in about angle/pi of the bits; allow four standard deviations more
+        flip = math.acos(max(-1.0, min(1.0, threshold))) / math.pi
+        self.max_distance = int(SIGNATURE_BITS * flip + 4 * math.sqrt(SIGNATURE_BITS * flip * (1 - flip))) + 1
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                slot INTEGER PRIMARY KEY,
+                context_hash INTEGER,
+                command TEXT,
+                response TEXT,
+                created_at REAL
+            )
+        ''')
+        self.conn.commit()
+        self._open_index(index_dir)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _open_index(self, index_dir):
+        """Map the vector, signature and context arrays, recreating them if the layout changed"""
+        os.makedirs(index_dir, exist_ok=True)
+        meta_path = os.path.join(index_dir, "meta.json")
+        meta = {"embedder": getattr(self.embed, "name", type(self.embed).__name__), "dim": self.dim,
+                "max_entries": self.max_entries, "signature_bits": SIGNATURE_BITS}
+        paths = [os.path.join(index_dir, name) for name in ("vectors.npy", "signatures.npy", "contexts.npy")]
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                reuse = json.load(f) == meta and all(os.path.exists(path) for path in paths)
+        except (OSError, ValueError):
+            reuse = False
+
+        open_memmap = np.lib.format.open_memmap
+        if reuse:
+            self._vectors = open_memmap(paths[0], mode="r+")
+            self._signatures = open_memmap(paths[1], mode="r+")
+            self._contexts = open_memmap(paths[2], mode="r+")
+            row = self.conn.execute("SELECT slot FROM semantic_cache ORDER BY created_at DESC LIMIT 1").fetchone()
+            self._next = (row[0] + 1) % self.max_entries if row else 0
+        else:
+            self._vectors = open_memmap(paths[0], mode="w+", dtype=np.int8, shape=(self.max_entries, self.dim))
+            # One contiguous row per 64-bit word so each XOR/popcount pass streams through memory
+            self._signatures = open_memmap(paths[1], mode="w+", dtype=np.uint64,
+                                           shape=(SIGNATURE_BITS // 64, self.max_entries))
+            self._contexts = open_memmap(paths[2], mode="w+", dtype=np.uint64, shape=(self.max_entries,))
+            self.conn.execute("DELETE FROM semantic_cache")
+            self.conn.commit()
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            self._next = 0
+
+    def _encode(self, command):
+        """(int8 vector, signature words) for a command, or None when it has no meaningful words"""
+        vector = np.asarray(self.embed(command), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return None
+        vector /= norm
+        quantized = np.round(vector * 127).astype(np.int8)
+        signature = np.packbits(vector @ self._planes > 0).view(np.uint64)
+        return quantized, signature
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, command, context=""):
+        """Cached response for a command with the same meaning on the same context, or None"""
+        encoded = self._encode(command)
+        if encoded is None:
+            return None
+        quantized, signature = encoded
+        target = context_hash(self.model_name, context)
+
+        with self._lock:
+            distance = np.bitwise_count(self._signatures[0] ^ signature[0])
+            for word in range(1, len(signature)):
+                distance += np.bitwise_count(self._signatures[word] ^ signature[word])
+            candidates = np.flatnonzero(distance <= self.max_distance)
+            candidates = candidates[self._contexts[candidates] == target]
+
+            slot = None
+            if len(candidates):
+                vectors = self._vectors[candidates].astype(np.float32)
+                scores = vectors @ quantized.astype(np.float32)
+                scores /= np.linalg.norm(vectors, axis=1) * float(np.linalg.norm(quantized.astype(np.float32)))
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    slot = int(candidates[best])
+
+            row = None
+            if slot is not None:
+                row = self.conn.execute(
+                    "SELECT response FROM semantic_cache WHERE slot = ? AND context_hash = ? AND created_at >= ?",
+                    (slot, target, time.time() - self.ttl_seconds)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, command, context, response):
+        """Remember a response, overwriting the oldest entry once the ring is full"""
+        encoded = self._encode(command)
+        if encoded is None:
+            return
+        quantized, signature = encoded
+        target = context_hash(self.model_name, context)
+
+        with self._lock:
+            slot = self._next
+            self._next = (slot + 1) % self.max_entries
+            self._vectors[slot] = quantized
+            self._signatures[:, slot] = signature
+            self._contexts[slot] = target
+            self.conn.execute(
+                "INSERT OR REPLACE INTO semantic_cache (slot, context_hash, command, response, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (slot, target, command, response, time.time())
+            )
+            self.conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Flush the mapped arrays and close the database connection"""
+        with self._lock:
+            for array in (self._vectors, self._signatures, self._contexts):
+                array.flush()
+            self.conn.close()
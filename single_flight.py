@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Single Flight for the AI Assistants
+Concurrent calls with the same key share one in-flight execution and all receive its result.
+"""
+
+import threading
+
+from llm_client import LLMCancelled
+
+
+class _Call:
+    """One in-flight execution and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates identical concurrent work by key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.shared = 0
+
+    def _join(self, key):
+        """Return (call, is_leader) for a key"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            self.executions += 1
+            return call, True
+
+    def _finish(self, key, call):
+        with self._lock:
+            self._calls.pop(key, None)
+        call.done.set()
+
+    def do(self, key, func, *args):
+        """Run func(*args) once for all concurrent callers with the same key"""
+        while True:
+            call, leader = self._join(key)
+            if not leader:
+                call.done.wait()
+                if call.abandoned:
+                    # The leader was interrupted; the next caller in takes over
+                    continue
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+            try:
+                call.result = func(*args)
+                return call.result
+            except LLMCancelled:
+                # Cancelled for the leader's command only; a waiter still wants the answer
+                call.abandoned = True
+                raise
+            except Exception as e:
+                call.error = e
+                raise
+            except BaseException:
+                call.abandoned = True
+                raise
+            finally:
+                self._finish(key, call)
+
+    def stream(self, key, start):
+        """Yield chunks from start() once; concurrent callers with the same key get the leader's full text"""
+        while True:
+            call, leader = self._join(key)
+            if not leader:
+                call.done.wait()
+                if call.abandoned:
+                    continue
+                if call.error is not None:
+                    raise call.error
+                yield call.result
+                return
+
+            parts = []
+            try:
+                for chunk in start():
+                    parts.append(chunk)
+                    yield chunk
+                call.result = "".join(parts)
+                return
+            except LLMCancelled:
+                call.abandoned = True
+                raise
+            except Exception as e:
+                call.error = e
+                raise
+            except BaseException:
+                # Includes GeneratorExit when the consumer stops early
+                call.abandoned = True
+                raise
+            finally:
+                self._finish(key, call)
+
+    def in_flight(self):
+        """Number of keys currently executing"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Executions, shared results and the share rate"""
+        with self._lock:
+            requests = self.executions + self.shared
+            return {
+                "requests": requests,
+                "executions": self.executions,
+                "shared": self.shared,
+                "in_flight": len(self._calls),
+                "share_rate": self.shared / requests if requests else 0.0,
+            }
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+System Monitor for the Ultimate AI Assistant
+Background sampler that keeps recent CPU, RAM, disk, network and battery readings in a fixed-size ring buffer.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+from lazy_imports import lazy_import
+
+psutil = lazy_import("psutil")
+
+# Percentages are 0-100; network rates are bytes per second; battery is None on desktops
+MetricsSample = namedtuple("MetricsSample", [
+    "time", "cpu", "ram", "ram_used", "ram_total", "disk", "disk_used", "disk_total",
+    "net_sent_rate", "net_recv_rate", "battery", "plugged",
+])
+
+# Fields reported with min/avg/max over a window
+SUMMARY_FIELDS = ("cpu", "ram", "disk", "net_sent_rate", "net_recv_rate", "battery")
+
+# Root of the drive the assistant runs from ("C:\\" on Windows, "/" elsewhere)
+DISK_PATH = os.path.abspath(os.sep)
+
+
+class MetricsSampler:
+    """Samples system metrics on a daemon thread into a ring buffer of the last history_seconds"""
+
+    def __init__(self, interval=2.0, history_seconds=30 * 60, slow_every=15, source=None):
+        self.interval = interval
+        self.capacity = max(1, int(history_seconds / interval))
+        # Disk usage and battery change slowly and cost a system call each, so they are read less often
+        self.slow_every = max(1, slow_every)
+        self.source = psutil if source is None else source
+        self._samples = [None] * self.capacity
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        # Serializes whole samples (the sampler thread and latest() on a worker thread);
+        # _lock only guards the ring buffer so readers never wait on a system call
+        self._sampling = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_net = None
+        self._slow = None
+        self._taken = 0
+        self._started = None
+        self.sample_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def sample(self):
+        """Take one reading, append it to the ring buffer and return it"""
+        with self._sampling:
+            return self._sample()
+
+    def _sample(self):
+        cpu_start = time.thread_time()
+        source = self.source
+        now = time.time()
+
+        # Non-blocking: utilization since the previous call
+        cpu = source.cpu_percent(interval=None)
+        memory = source.virtual_memory()
+
+        if self._slow is None or self._taken % self.slow_every == 0:
+            disk = source.disk_usage(DISK_PATH)
+            try:
+                battery = source.sensors_battery()
+            except (AttributeError, NotImplementedError, OSError):
+                battery = None
+            self._slow = (disk.percent, disk.used, disk.total,
+                          battery.percent if battery else None, battery.power_plugged if battery else None)
+
+        sent_rate = recv_rate = 0.0
+        net = source.net_io_counters()
+        if net is not None:
+            if self._last_net is not None:
+                elapsed = now - self._last_net[0]
+                if elapsed > 0:
+                    sent_rate = max(0, net.bytes_sent - self._last_net[1]) / elapsed
+                    recv_rate = max(0, net.bytes_recv - self._last_net[2]) / elapsed
+            self._last_net = (now, net.bytes_sent, net.bytes_recv)
+
+        disk_percent, disk_used, disk_total, battery_percent, plugged = self._slow
+        sample = MetricsSample(now, cpu, memory.percent, memory.used, memory.total,
+                               disk_percent, disk_used, disk_total, sent_rate, recv_rate, battery_percent, plugged)
+        with self._lock:
+            self._samples[self._next] = sample
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        self._taken += 1
+        self.sample_seconds += time.thread_time() - cpu_start
+        return sample
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def latest(self):
+        """Most recent reading, taking one now if the sampler has not produced any yet"""
+        with self._lock:
+            if self._count:
+                return self._samples[self._next - 1]
+        with self._sampling:
+            with self._lock:
+                # The sampler thread may have stored one while this waited
+                if self._count:
+                    return self._samples[self._next - 1]
+            return self._sample()
+
+    def samples(self, seconds=None):
+        """Readings from the last seconds (all buffered readings by default), oldest first"""
+        with self._lock:
+            start = (self._next - self._count) % self.capacity
+            ordered = [self._samples[(start + i) % self.capacity] for i in range(self._count)]
+        if seconds is None:
+            return ordered
+        cutoff = time.time() - seconds
+        return [sample for sample in ordered if sample.time >= cutoff]
+
+    def summary(self, seconds=None):
+        """{field: (min, avg, max)} over the last seconds for each reported metric"""
+        window = self.samples(seconds)
+        result = {}
+        for field in SUMMARY_FIELDS:
+            values = [getattr(sample, field) for sample in window if getattr(sample, field) is not None]
+            if values:
+                result[field] = (min(values), sum(values) / len(values), max(values))
+        return result
+
+    def overhead(self):
+        """Share of one CPU spent taking samples since the sampler started"""
+        if self._started is None:
+            return 0.0
+        elapsed = time.monotonic() - self._started
+        return self.sample_seconds / elapsed if elapsed > 0 else 0.0
+
+    def __len__(self):
+        return self._count
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start sampling on a daemon thread"""
+        if self._thread is None:
+            self._started = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        # The first cpu_percent(None) call only primes the counter, so the first real reading comes one interval later
+        try:
+            self.source.cpu_percent(interval=None)
+        except Exception as e:
+            print(f"Metrics sampler error: {e}")
+            return
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Metrics sampler error: {e}")
+
+    def stop(self):
+        """Stop the sampling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,1235 @@
+#!/usr/bin/env python3
+"""
+Component tests for Magic Wand AI Tool
+Tests the standalone building blocks without starting the GUI or calling the AI API
+"""
+
+import contextlib
+import inspect
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from app_index import AppIndex, SHORTCUT, PATH
+from clipboard_watcher import ClipboardWatcher
+from chunked_engine import ChunkedEngine, split_text, joiner
+from fake_llm_server import FakeLLMServer
+from fuzzy_match import FuzzyIndex
+from history_store import HistoryWriter
+from intent_router import IntentRouter, build_default_router
+from lazy_imports import lazy_import, mark_startup, find_missing_dependencies, startup_report
+from llm_client import LLMClient, LLMError, LLMTimeout, LLMCancelled
+from process_monitor import ProcessMonitor
+from process_table import ProcessTable
+from qr_codes import QRGenerator
+from prompt_builder import PromptBuilder, PromptTemplate, compact_text, estimate_tokens
+from reminder_store import ReminderStore, parse_due
+from request_scheduler import RequestScheduler, RequestTicket, FAST, SLOW
+from response_cache import ResponseCache
+from response_stream import ResponseStream
+from screen_capture import ScreenCapture
+from screen_watch import FrameDiffer, ScreenWatcher, block_means, parse_region
+from semantic_cache import SemanticCache, HashingEmbedder
+from single_flight import SingleFlight
+from system_monitor import MetricsSampler
+from timer_scheduler import TimerScheduler
+from ui_bus import UIBus, BATCH, COALESCE
+
+
+def test_intent_router():
+    """Test intent routing priorities and argument extraction"""
+    router = build_default_router()
+
+    assert router.route("restart").name == "power"
+    assert router.route("restart the computer").keyword == "restart"
+    assert router.route("start speed test").name == "speed_test"
+    assert router.route("open chrome") == ("app_launch", "open", "chrome", "open chrome")
+    assert router.route("search for python tutorials").argument == "python tutorials"
+    assert router.route("chrome open").argument == "chrome"
+    assert router.route("write an essay about cats") is None
+    assert router.route("generate qr code hello world").argument == "hello world"
+    assert router.route("notification Title: body").name == "notification"
+    assert router.route("show stats").name == "stats"
+    assert router.route("what's eating my cpu").name == "top_processes"
+    assert router.route("stop watching the screen").name == "stop_watch_screen"
+    assert router.route("notify me when the screen changes").name == "watch_screen"
+    assert router.route("kill node dry run")[:3] == ("kill_process", "kill", "node dry run")
+    assert router.route("kill python tree")[:3] == ("kill_process", "kill", "python tree")
+    assert router.route("start watching the screen").name == "watch_screen"
+    assert router.route("qr sheet").name == "qr_batch" and router.route("qr code hi").name == "qr_code"
+
+    # Power, search and QR keywords inside another command's argument do not take over
+    assert router.route("search for how to restart windows")[:3] == ("search", "search", "how to restart windows")
+    assert router.route("google how to shutdown")[:3] == ("search", "google", "how to shutdown")
+    assert router.route("open sleep tracker")[:3] == ("app_launch", "open", "sleep tracker")
+    assert router.route("open google chrome")[:3] == ("app_launch", "open", "google chrome")
+    assert router.route("explain what a qr code is") is None
+    assert router.route("please restart").name == "power" and router.route("shutdown now").name == "power"
+    assert router.route("create a qr code for my wifi").argument == "for my wifi"
+
+
+def test_intent_router_custom_table():
+    """Test that later intents can be registered with their own priorities"""
+    router = IntentRouter()
+    router.add_intent("low", ["start"], priority=1)
+    router.add_intent("high", ["start engine"], priority=1)
+    assert router.route("please start engine now").name == "high"
+    assert router.route("please start engine now").argument == "now"
+    assert router.route("start") == ("low", "start", "", "start")
+
+    router.add_intent("anchored", ["stop"], priority=5, anchored=True)
+    assert router.route("stop engine").name == "anchored"
+    assert router.route("start and stop").name == "low"
+
+
+def test_response_cache(tmp_path):
+    """Test cache hits, whitespace normalization, LRU eviction and TTL expiry"""
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), "test-model", max_entries=2, ttl_seconds=60)
+
+    assert cache.get("fix grammar: hello") is None
+    cache.put("fix grammar: hello", "Hello.")
+    assert cache.get("fix   grammar:\nhello") == "Hello."
+
+    cache.put("second", "2")
+    cache.get("fix grammar: hello")
+    cache.put("third", "3")
+    assert cache.get("second") is None
+    assert cache.get("fix grammar: hello") == "Hello."
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("third") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 3
+    cache.close()
+
+
+class FakeChunk:
+    """Stand-in for a streamed generate_content chunk"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStreamingModel:
+    """Model that yields its reply in fixed chunks"""
+
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+
+    def generate_content(self, prompt, stream=False):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield FakeChunk(chunk)
+
+
+class FakeScheduler:
+    """Collects after() callbacks so a test can run them like a Tk event loop"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, delay_ms, callback):
+        self.pending.append(callback)
+
+    def run(self):
+        while self.pending:
+            self.pending.pop(0)()
+
+
+def test_response_stream_coalesces_chunks():
+    """Test that queued chunks are applied in one UI update per flush"""
+    scheduler = FakeScheduler()
+    updates, done = [], []
+    stream = ResponseStream(scheduler.after, updates.append, lambda text, error: done.append((text, error)))
+    model = FakeStreamingModel(["Hel", "lo ", "wor", "ld"])
+
+    stream.run(chunk.text for chunk in model.generate_content("hi", stream=True))
+    stream.start()
+    scheduler.run()
+
+    assert updates == ["Hello world"]
+    assert done == [("Hello world", None)]
+    assert stream.time_to_first_chunk is not None
+
+
+def test_response_stream_incremental_and_errors():
+    """Test incremental delivery from a worker thread and error propagation"""
+    scheduler = FakeScheduler()
+    updates, done = [], []
+    stream = ResponseStream(scheduler.after, updates.append, lambda text, error: done.append((text, error)), max_chunks=2)
+    model = FakeStreamingModel(["a", "b", "c", "d", "e"], fail_after=4)
+
+    chunks = (chunk.text for chunk in model.generate_content("hi", stream=True))
+    worker = threading.Thread(target=stream.run, args=(chunks,))
+    worker.start()
+    stream.start()
+    while not done:
+        if scheduler.pending:
+            scheduler.run()
+        else:
+            time.sleep(0.001)
+    worker.join()
+
+    assert "".join(updates) == "abcd"
+    assert done[0][0] == "abcd" and isinstance(done[0][1], RuntimeError)
+
+
+def test_history_writer_batches(tmp_path):
+    """Test that queued history rows are committed in batches and flushed on shutdown"""
+    db_path = str(tmp_path / "history.sqlite")
+    writer = HistoryWriter(db_path, batch_size=50, flush_interval=5)
+    for i in range(120):
+        writer.write(f"command {i}", f"response {i}", i % 2 == 0)
+    writer.shutdown()
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT command, success FROM command_history ORDER BY id").fetchall()
+    conn.close()
+    assert len(rows) == 120
+    assert rows[0] == ("command 0", 1) and rows[-1] == ("command 119", 0)
+    assert writer.batches_written == 3
+
+
+def test_history_search_and_retention(tmp_path):
+    """Test ranked, paginated history search and the row cap"""
+    db_path = str(tmp_path / "history.sqlite")
+    writer = HistoryWriter(db_path, max_response_chars=20)
+    writer.write("search python tutorials", "🔍 Searched for: python tutorials")
+    writer.write("open notepad", "✅ Opened Notepad")
+    for i in range(25):
+        writer.write(f"explain python decorators {i}", "Decorators wrap functions " * 5)
+    writer.flush()
+
+    first_page = writer.search("python", page=1, page_size=10)
+    assert len(first_page) == 10
+    assert len(writer.search("python", page=3, page_size=10)) == 6
+    assert writer.search("tutorial")[0][1] == "search python tutorials"
+    assert writer.search("decorators")[0][2].endswith("[truncated]")
+    assert writer.search("!!!") == []
+    writer.shutdown()
+
+    writer = HistoryWriter(db_path, max_rows=5)
+    assert writer.rows_compacted == 22
+    assert len(writer.search("python", page_size=50)) == 5
+    writer.shutdown()
+
+    # A database from before auto_vacuum is converted once on open
+    old_path = str(tmp_path / "old_history.sqlite")
+    conn = sqlite3.connect(old_path)
+    conn.execute("CREATE TABLE command_history (id INTEGER PRIMARY KEY, command TEXT, response TEXT, timestamp DATETIME, success BOOLEAN)")
+    conn.execute("INSERT INTO command_history (command, response) VALUES ('open notepad', '✅ Opened Notepad')")
+    conn.commit()
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    conn.close()
+    writer = HistoryWriter(old_path)
+    assert writer.search("notepad")[0][1] == "open notepad"
+    writer.shutdown()
+    conn = sqlite3.connect(old_path)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.close()
+
+
+def test_llm_client_reuses_connections_and_streams():
+    """Test keep-alive reuse, concurrent requests and streaming against a local fake API"""
+    with FakeLLMServer(delay=0.2, chunks=4) as server:
+        client = LLMClient("test-key", "fake-model", base_url=server.url, timeout=5, max_connections=4)
+        try:
+            assert client.generate_content("hello").text == "Echo: hello"
+            assert client.generate_content("again").text == "Echo: again"
+            assert client.connections_opened == 1 and server.connections == 1
+            assert server.api_keys == {"test-key"}
+
+            results = {}
+            started = time.perf_counter()
+            workers = [threading.Thread(target=lambda n=n: results.setdefault(n, client.generate_content(f"q{n}").text))
+                       for n in range(4)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            assert time.perf_counter() - started < 0.6
+            assert results == {n: f"Echo: q{n}" for n in range(4)}
+            assert server.max_active == 4 and client.connections_opened == 4
+
+            chunks = [chunk.text for chunk in client.generate_content("stream me please", stream=True)]
+            assert len(chunks) == 4 and "".join(chunks) == "Echo: stream me please"
+            assert client.connections_opened == 4
+
+            try:
+                client.generate_content("FAIL now")
+                assert False, "expected an API error"
+            except LLMError as e:
+                assert "500" in str(e)
+        finally:
+            client.close()
+
+
+def test_llm_client_replaces_closed_keep_alive_connections():
+    """Test that a pooled connection the server closed is replaced instead of failing the request"""
+    with FakeLLMServer(requests_per_connection=1) as server:
+        client = LLMClient("test-key", "fake-model", base_url=server.url, timeout=5)
+        try:
+            # The server hangs up on the second request of each connection
+            assert client.generate_content("first").text == "Echo: first"
+            assert client.generate_content("second").text == "Echo: second"
+            chunks = [chunk.text for chunk in client.generate_content("third", stream=True)]
+            assert "".join(chunks) == "Echo: third"
+            assert client.reconnects == 2 and client.connections_opened == 3 and server.requests == 3
+        finally:
+            client.close()
+
+    with FakeLLMServer(idle_timeout=0.1) as server:
+        client = LLMClient("test-key", "fake-model", base_url=server.url, timeout=5)
+        try:
+            assert client.generate_content("before").text == "Echo: before"
+            time.sleep(0.3)
+            assert client.generate_content("after idling").text == "Echo: after idling"
+            assert client.connections_opened == 2 and server.connections == 2
+        finally:
+            client.close()
+
+
+def test_llm_client_deadlines_and_cancellation():
+    """Test that slow requests time out and new commands cancel in-flight requests"""
+    with FakeLLMServer(delay=1.0) as server:
+        client = LLMClient("test-key", "fake-model", base_url=server.url, timeout=0.2)
+        try:
+            started = time.perf_counter()
+            try:
+                client.generate_content("too slow")
+                assert False, "expected a timeout"
+            except LLMTimeout:
+                pass
+            assert time.perf_counter() - started < 0.6 and client.timeouts == 1
+
+            client.timeout = 5
+            errors = []
+
+            def ask(prompt="superseded", stream=False):
+                try:
+                    list(client.generate_content(prompt, stream=True)) if stream else client.generate_content(prompt)
+                except LLMCancelled as e:
+                    errors.append(e)
+
+            worker = threading.Thread(target=ask)
+            worker.start()
+            while client.in_flight == 0:
+                time.sleep(0.01)
+            started = time.perf_counter()
+            client.cancel_all()
+            worker.join()
+            assert len(errors) == 1 and time.perf_counter() - started < 0.3
+            assert client.in_flight == 0 and client.cancelled == 1
+
+            # Cancelled while still queued behind a busy loop, before its coroutine starts
+            client._loop.call_soon_threadsafe(time.sleep, 0.5)
+            worker = threading.Thread(target=lambda: ask("queued", stream=True))
+            worker.start()
+            while client.in_flight == 0:
+                time.sleep(0.01)
+            started = time.perf_counter()
+            client.cancel_all()
+            worker.join()
+            assert len(errors) == 2 and time.perf_counter() - started < 0.3
+        finally:
+            client.close()
+
+
+def test_single_flight_shares_concurrent_calls():
+    """Test that identical concurrent requests share one execution, its result and its errors"""
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def generate(prompt):
+        calls.append(prompt)
+        release.wait(2)
+        if prompt == "bad":
+            raise ValueError("model failed")
+        return prompt.upper()
+
+    results, errors = [], []
+
+    def ask(prompt):
+        try:
+            results.append(flights.do(prompt, generate, prompt))
+        except ValueError as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=ask, args=(prompt,)) for prompt in ["fix grammar"] * 5 + ["bad"] * 3]
+    for worker in workers:
+        worker.start()
+    while flights.stats()["requests"] < 8:
+        time.sleep(0.01)
+    release.set()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(calls) == ["bad", "fix grammar"]
+    assert results == ["FIX GRAMMAR"] * 5 and len(errors) == 3
+    stats = flights.stats()
+    assert stats["executions"] == 2 and stats["shared"] == 6 and stats["in_flight"] == 0
+
+    # A follower of an abandoned stream takes over as the new leader
+    def chunks():
+        yield "Hel"
+        release.wait(2)
+        yield "lo"
+
+    release.clear()
+    leader = flights.stream("hello", chunks)
+    assert next(leader) == "Hel"
+    follower = []
+    worker = threading.Thread(target=lambda: follower.extend(flights.stream("hello", chunks)))
+    worker.start()
+    while flights.stats()["shared"] < 7:
+        time.sleep(0.01)
+    leader.close()
+    release.set()
+    worker.join()
+    assert follower == ["Hel", "lo"] and flights.stats()["executions"] == 4
+
+    # A cancelled leader hands over to its waiters instead of failing them
+    attempts = []
+
+    def cancellable(prompt):
+        attempts.append(prompt)
+        if len(attempts) == 1:
+            release.wait(2)
+            raise LLMCancelled("Request cancelled")
+        return prompt.upper()
+
+    release.clear()
+    outcome = {}
+
+    def first():
+        try:
+            flights.do("retry", cancellable, "retry")
+        except LLMCancelled:
+            outcome["first"] = "cancelled"
+
+    workers = [threading.Thread(target=first),
+               threading.Thread(target=lambda: outcome.update(second=flights.do("retry", cancellable, "retry")))]
+    workers[0].start()
+    while not attempts:
+        time.sleep(0.01)
+    workers[1].start()
+    while flights.stats()["shared"] < 8:
+        time.sleep(0.01)
+    release.set()
+    for worker in workers:
+        worker.join()
+    assert outcome == {"first": "cancelled", "second": "RETRY"} and attempts == ["retry", "retry"]
+
+
+def test_prompt_builder_budget():
+    """Test template rendering and compaction of oversized pasted text"""
+    template = PromptTemplate("Command: {command}\nText:\n{text}\n")
+    assert template.fields == ["command", "text"]
+    assert template.render(command="fix", text="a  b") == "Command: fix\nText:\na  b\n"
+    assert estimate_tokens("abcdefgh") == 2 and estimate_tokens("abcdefghi") == 3
+
+    builder = PromptBuilder(template, max_input_tokens=50)
+    small = "keep   this\n\n\nexactly"
+    assert builder.build("fix", small).endswith(small + "\n") and builder.compacted == 0
+
+    # Duplicates and whitespace are removed before anything is truncated
+    noisy = "\n".join(["    indented   line  one", "line two", "line two", "", "", "", "line   three"] * 20)
+    assert compact_text(noisy, 300) == "    indented line one\nline two\n\nline three"
+
+    huge = "".join(f"row {i} with\tsome   padding\n" for i in range(200_000))
+    started = time.perf_counter()
+    prompt = builder.build("summarize", huge)
+    assert time.perf_counter() - started < 0.05
+    assert builder.compacted == 1 and "truncated:" in prompt
+    assert estimate_tokens(prompt) <= 50 + template.static_tokens + 1
+    assert prompt.startswith("Command: summarize\nText:\nrow 0 with some padding\nrow 1")
+
+
+def test_chunked_engine_splits_and_maps_in_order():
+    """Test overlapping segmentation and ordered, capped concurrent mapping"""
+    text = "".join(f"Paragraph {i} has a few words in it.\n\n" for i in range(200))
+    segments = split_text(text, 500, 80)
+    assert "".join(segment.text for segment in segments) == text
+    assert all(len(segment.text) <= 500 and segment.text.endswith("\n\n") for segment in segments)
+    assert segments[0].context == "" and all(0 < len(segment.context) <= 80 for segment in segments[1:])
+    assert all(text[:segment.start].endswith(segment.context) for segment in segments)
+    assert joiner(segments[0]) == "\n\n" and len(split_text("x" * 1000, 300)) == 4
+
+    active, peak, updates = [0], [0], []
+    lock = threading.Lock()
+
+    def transform(segment):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        # Later segments finish first, so ordering must be restored
+        time.sleep(0.02 * (len(segments) - segment.index) / len(segments))
+        with lock:
+            active[0] -= 1
+        return segment.text.upper()
+
+    engine = ChunkedEngine(max_concurrency=3)
+    results = engine.run(transform, segments, reduce="".join, progress=lambda done, total: updates.append((done, total)))
+    assert results == text.upper()
+    assert peak[0] == 3 and updates[-1] == (len(segments), len(segments)) and len(updates) == len(segments)
+
+    # Closing the stream early drops segments that have not started
+    calls = []
+    mapped = ChunkedEngine(max_concurrency=1).map_ordered(lambda item: calls.append(item) or time.sleep(0.01), range(50))
+    next(mapped)
+    mapped.close()
+    time.sleep(0.05)
+    assert len(calls) < 5
+
+
+def test_app_index_incremental_refresh(tmp_path):
+    """Test indexing a fake Start Menu and PATH, fuzzy lookup and mtime-based refresh"""
+    start_menu = tmp_path / "Start Menu" / "Programs"
+    (start_menu / "Visual Studio Code").mkdir(parents=True)
+    (start_menu / "Visual Studio Code" / "Visual Studio Code.lnk").write_text("")
+    (start_menu / "Visual Studio Code" / "Uninstall Visual Studio Code.lnk").write_text("")
+    (start_menu / "Spotify.lnk").write_text("")
+    (start_menu / "Google Chrome - Shortcut.lnk").write_text("")
+    (start_menu / "readme.txt").write_text("")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, mode in [("code", 0o755), ("calc", 0o755), ("notes.txt", 0o644)]:
+        (bin_dir / name).write_text("")
+        (bin_dir / name).chmod(mode)
+
+    index_path = tmp_path / "apps.json"
+    sources = [(str(start_menu), True, SHORTCUT), (str(bin_dir), False, PATH)]
+    index = AppIndex(str(index_path), sources, use_registry=False)
+    assert index.refresh() == 3 and len(index) == 5
+
+    assert index.lookup("vs code").name == "Visual Studio Code"
+    assert index.lookup("the visual studio code app").name == "Visual Studio Code"
+    assert index.lookup("visualstudiocode").source == SHORTCUT
+    assert index.lookup("chrome").name == "Google Chrome"
+    assert index.lookup("calc").path == str(bin_dir / "calc")
+    assert index.lookup("spot").name == "Spotify"
+    assert index.lookup("photoshop") is None and index.lookup("notes") is None
+    assert index.lookup("spotfy").name == "Spotify" and index.lookup("chrome browser").name == "Google Chrome"
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.lookup("vs code")
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+    # Unchanged directories are not rescanned; new apps appear after the next refresh
+    assert index.refresh() == 0
+    os.utime(bin_dir, (time.time() + 5, time.time() + 5))
+    (bin_dir / "spotify-cli").write_text("")
+    (bin_dir / "spotify-cli").chmod(0o755)
+    os.utime(bin_dir, (time.time() + 10, time.time() + 10))
+    assert index.refresh() == 1 and index.lookup("spotify cli").name == "spotify-cli"
+
+    # A new process starts from the saved index before its first refresh
+    reloaded = AppIndex(str(index_path), sources, use_registry=False)
+    assert reloaded.load() and len(reloaded) == 6 and reloaded.lookup("vs code").name == "Visual Studio Code"
+    assert reloaded.refresh() == 0
+
+    # Lookups during a rebuild see either the old tables or the new ones, never a mix
+    failures = []
+    done = threading.Event()
+
+    def look_up():
+        while not done.is_set():
+            try:
+                assert reloaded.lookup("vs code").name == "Visual Studio Code"
+            except Exception as e:
+                failures.append(e)
+                return
+
+    worker = threading.Thread(target=look_up)
+    worker.start()
+    for _ in range(200):
+        reloaded._rebuild()
+    done.set()
+    worker.join()
+    assert not failures
+
+
+def test_fuzzy_index_ranks_misspellings():
+    """Test trigram matching of partial, misspelled and wordy queries"""
+    apps = FuzzyIndex((name, f"{name}.exe") for name in
+                      ["notepad", "calculator", "paint", "wordpad", "explorer", "cmd", "powershell", "chrome", "firefox"])
+    assert apps.best("calc").value == "calculator.exe"
+    assert apps.best("calculater").key == "calculator"
+    assert apps.best("the calculator please").key == "calculator"
+    assert apps.best("chrome browser").key == "chrome"
+    assert apps.best("fire fox").key == "firefox"
+    assert apps.best("source projects", min_score=0.5) is None
+    assert [match.key for match in apps.search("pad", limit=2)] == ["notepad", "wordpad"]
+
+    # Thousands of entries still answer in microseconds
+    names = FuzzyIndex(f"{vendor} {product} {i}" for i in range(5000)
+                       for vendor, product in [(("svc", "host", "chrome", "code")[i % 4], ("helper", "worker")[i % 2])])
+    names.add("spotify")
+    started = time.perf_counter()
+    for _ in range(200):
+        best = names.best("spotfy")
+    assert best.key == "spotify" and (time.perf_counter() - started) / 200 < 0.001
+
+    # Queries made only of common trigrams score the names sharing the most of them
+    assert names.best("code worker 7").key == "code worker 7"
+    assert names.best("helper").key == "svc helper 0"
+    started = time.perf_counter()
+    for _ in range(200):
+        names.search("chrome worker", limit=5)
+    assert (time.perf_counter() - started) / 200 < 0.001
+    # A large limit still returns every match
+    assert len(names.search("helper", limit=5000)) == 2500
+
+
+class FakePsutil:
+    """Scripted psutil readings for the metrics sampler"""
+
+    def __init__(self):
+        self.cpu = [0.0, 10.0, 30.0, 20.0]
+        self.sent = 0
+        self.calls = {"cpu_percent": 0, "disk_usage": 0}
+
+    def cpu_percent(self, interval=None):
+        assert interval is None
+        self.calls["cpu_percent"] += 1
+        return self.cpu.pop(0)
+
+    def virtual_memory(self):
+        return SimpleNamespace(percent=50.0, used=8 * 1024 ** 3, total=16 * 1024 ** 3)
+
+    def disk_usage(self, path):
+        self.calls["disk_usage"] += 1
+        return SimpleNamespace(percent=70.0, used=350 * 1024 ** 3, total=500 * 1024 ** 3)
+
+    def sensors_battery(self):
+        return None
+
+    def net_io_counters(self):
+        self.sent += 1000
+        return SimpleNamespace(bytes_sent=self.sent, bytes_recv=0)
+
+
+def test_metrics_sampler_ring_buffer():
+    """Test that system metrics are kept in a bounded window without blocking callers"""
+    source = FakePsutil()
+    sampler = MetricsSampler(interval=1, history_seconds=3, slow_every=2, source=source)
+    assert sampler.latest().cpu == 0.0 and len(sampler) == 1
+    for _ in range(3):
+        sampler.sample()
+
+    # Only the last three readings fit; disk usage is read every second sample
+    assert len(sampler) == 3 and [sample.cpu for sample in sampler.samples()] == [10.0, 30.0, 20.0]
+    assert sampler.latest().cpu == 20.0 and sampler.latest().battery is None
+    assert source.calls == {"cpu_percent": 4, "disk_usage": 2}
+
+    summary = sampler.summary()
+    assert summary["cpu"] == (10.0, 20.0, 30.0) and summary["disk"] == (70.0, 70.0, 70.0)
+    assert "battery" not in summary and summary["net_sent_rate"][2] > 0
+    assert sampler.samples(seconds=-1) == []
+
+    # The background thread primes the CPU counter and stops promptly
+    source.cpu = [0.0]
+    started = time.perf_counter()
+    sampler.start()
+    sampler.stop()
+    assert time.perf_counter() - started < 1 and source.calls["cpu_percent"] == 5
+    assert 0 <= sampler.overhead() < 1
+
+    # Samples taken from several threads at once do not interleave their bookkeeping
+    source.cpu = [5.0] * 200
+    workers = [threading.Thread(target=lambda: [sampler.sample() for _ in range(50)]) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sampler._taken == 204 and source.calls["disk_usage"] == 102
+    assert all(sample.net_sent_rate >= 0 for sample in sampler.samples())
+
+
+class FakeProcessSource:
+    """Scripted psutil process API: pid -> (name, exe, ppid)"""
+
+    def __init__(self, processes):
+        self.processes = dict(processes)
+        # pid -> start time; defaults to the pid itself
+        self.started = {}
+        self.killed = []
+
+    def pids(self):
+        return list(self.processes)
+
+    def Process(self, pid):
+        if pid not in self.processes:
+            raise ProcessLookupError(pid)
+        source = self
+        name, exe, ppid = self.processes[pid]
+
+        class FakeProcess:
+            def oneshot(self):
+                return contextlib.nullcontext()
+
+            def name(self):
+                return name
+
+            def exe(self):
+                if not exe:
+                    raise PermissionError("access denied")
+                return exe
+
+            def ppid(self):
+                return ppid
+
+            def create_time(self):
+                return source.started.get(pid, float(pid))
+
+            def kill(self):
+                source.killed.append(pid)
+                del source.processes[pid]
+
+        return FakeProcess()
+
+
+def test_process_table_index_and_kill():
+    """Test incremental process snapshots, indexed lookups and kill options"""
+    source = FakeProcessSource({
+        1: ("System", "", 0),
+        10: ("chrome.exe", r"C:\Apps\Chrome\chrome.exe", 1),
+        11: ("chrome.exe", r"C:\Apps\Chrome\chrome.exe", 10),
+        12: ("chrome.exe", r"C:\Apps\Chrome\chrome.exe", 10),
+        13: ("crashpad.exe", r"C:\Apps\Chrome\crashpad.exe", 11),
+        20: ("python.exe", r"C:\Python\python.exe", 1),
+    })
+    table = ProcessTable(min_refresh_interval=60, source=source)
+    assert table.refresh() and len(table) == 6 and table.inspected == 6
+
+    assert [info.pid for info in table.find("Chrome")] == [10, 11, 12]
+    assert [info.pid for info in table.find(r"c:\apps\chrome\chrome.exe")] == [10, 11, 12]
+    assert [info.pid for info in table.find("pythn")] == [20]
+    assert table.find("system")[0].exe == "" and table.find("notepad") == []
+
+    # Dry runs select children before parents and kill nothing
+    preview = table.kill("chrome", tree=True, dry_run=True)
+    assert [info.pid for info in preview.targets] == [13, 11, 12, 10]
+    assert source.killed == []
+
+    result = table.kill("chrome", all_matches=True)
+    assert sorted(info.pid for info in result.killed) == [10, 11, 12] and result.failed == [] and result.exact
+    assert table.find("chrome") == [] and [info.pid for info in table.find("crashpad")] == [13]
+
+    # Refreshes are rate limited and only inspect new PIDs
+    source.processes[30] = ("notepad.exe", r"C:\Windows\notepad.exe", 1)
+    del source.processes[20]
+    assert not table.refresh() and table.find("notepad") == []
+    assert table.refresh(force=True) and table.inspected == 7
+    assert [info.pid for info in table.find("notepad")] == [30] and table.find("python") == []
+
+    # A PID that exited after the snapshot is reported, not killed
+    del source.processes[30]
+    assert table.kill("notepad").failed[0][0].pid == 30
+
+    # A reused PID is re-inspected instead of keeping the old process's name
+    source.processes[5] = ("notepad.exe", r"C:\Windows\notepad.exe", 1)
+    table.refresh(force=True)
+    assert [info.pid for info in table.find("notepad")] == [5]
+    source.processes[5] = ("chrome.exe", r"C:\Apps\Chrome\chrome.exe", 1)
+    source.started[5] = 99.0
+    table.refresh(force=True)
+    assert table.find("notepad", fuzzy=False) == [] and [info.pid for info in table.find("chrome")] == [5]
+
+    # Fuzzy matches are only previewed, even without a dry run
+    source.processes[40] = ("winlogon.exe", r"C:\Windows\winlogon.exe", 1)
+    table.refresh(force=True)
+    result = table.kill("logon", all_matches=True)
+    assert not result.exact and [info.pid for info in result.targets] == [40] and result.killed == []
+    assert 40 not in source.killed and table.kill("winlogon").exact
+
+
+class FakeMonitorSource:
+    """Scripted psutil.process_iter(): pid -> [name, cpu seconds, resident bytes]"""
+
+    def __init__(self, processes):
+        self.processes = processes
+
+    def cpu_count(self):
+        return 2
+
+    def process_iter(self):
+        for pid, (name, cpu_seconds, memory) in list(self.processes.items()):
+            if name is None:
+                yield SimpleNamespace(pid=pid, oneshot=contextlib.nullcontext, name=self._denied)
+                continue
+            yield SimpleNamespace(
+                pid=pid, oneshot=contextlib.nullcontext, name=lambda name=name: name,
+                cpu_times=lambda cpu_seconds=cpu_seconds: SimpleNamespace(user=cpu_seconds, system=0.0),
+                memory_info=lambda memory=memory: SimpleNamespace(rss=memory))
+
+    @staticmethod
+    def _denied():
+        raise PermissionError("access denied")
+
+
+def test_process_monitor_top_consumers():
+    """Test per-process CPU deltas, top-N selection and a cancellable live view"""
+    mb = 1024 ** 2
+    source = FakeMonitorSource({1: ["idle", 0.0, 10 * mb], 2: ["chrome", 5.0, 900 * mb],
+                                3: ["python", 1.0, 50 * mb], 4: [None, 0, 0]})
+    monitor = ProcessMonitor(top_n=2, source=source)
+    first = monitor.sample()
+    assert first.interval is None and first.count == 3
+    assert [usage.name for usage in first.by_memory] == ["chrome", "python"]
+
+    time.sleep(0.05)
+    source.processes[3][1] += 0.025
+    source.processes[2][1] += 0.01
+    source.processes[5] = ["node", 100.0, 20 * mb]
+    second = monitor.sample()
+    assert [usage.name for usage in second.by_cpu] == ["python", "chrome"]
+    # Half a core for about the whole interval on a two-core machine
+    assert 10 < second.by_cpu[0].cpu <= 25 and len(second.by_cpu) == 2
+
+    # A PID reused by another program does not inherit the old CPU time
+    source.processes[3] = ["ssh", 500.0, mb]
+    assert all(usage.cpu == 0 for usage in monitor.sample().by_cpu if usage.name == "ssh")
+
+    ticket = RequestTicket(0)
+    snapshots = []
+    for snapshot in monitor.watch(ticket.wait, interval=0.01):
+        snapshots.append(snapshot)
+        if len(snapshots) == 3:
+            ticket.cancel()
+    assert len(snapshots) == 3 and monitor.ticks == 6
+
+
+class FakeClipboard:
+    """pyperclip stand-in with a Windows-style change counter"""
+
+    def __init__(self):
+        self.text = ""
+        self.sequence = 0
+        self.pastes = 0
+
+    def copy(self, text):
+        self.text = text
+        self.sequence += 1
+
+    def paste(self):
+        self.pastes += 1
+        return self.text
+
+
+def test_clipboard_watcher_dedups_and_searches():
+    """Test change-counter polling, distinct-clip ring buffer, compression and fuzzy search"""
+    clipboard = FakeClipboard()
+    watcher = ClipboardWatcher(max_entries=3, compress_over=100, source=clipboard,
+                               change_counter=lambda: clipboard.sequence)
+    clipboard.copy("invoice number 4471 for acme")
+    assert watcher.poll() and watcher.current() == "invoice number 4471 for acme"
+    # Unchanged counter: the clipboard itself is not read again
+    assert not watcher.poll() and clipboard.pastes == 1
+
+    for text in ["def main():\n    print('hello')\n" * 20, "meeting notes tuesday"]:
+        clipboard.copy(text)
+        assert watcher.poll()
+    # Copying a clip again moves it to the front instead of adding a duplicate
+    clipboard.copy("def main():\n    print('hello')\n" * 20)
+    assert watcher.poll() and len(watcher) == 3
+    clipboard.copy("invoice number 4471 for acme")
+    watcher.poll()
+    clipboard.copy("https://github.com/example/repo")
+    watcher.poll()
+    history = watcher.history()
+    assert [clip.text[:8] for clip in history] == ["https://", "invoice ", "def main"]
+    stats = watcher.stats()
+    assert stats["clips"] == 3 and stats["stored_bytes"] < stats["raw_chars"]
+
+    assert watcher.search("invoice")[0].text.startswith("invoice")
+    assert watcher.search("invocie acme")[0].text.startswith("invoice")
+    assert watcher.search("prnt hello")[0].text.startswith("def main")
+    assert watcher.search("spreadsheet") == []
+
+    # Without a change counter the clip digest detects changes
+    hashed = ClipboardWatcher(source=clipboard)
+    hashed.change_counter = None
+    assert hashed.poll() and not hashed.poll() and hashed.changes == 1
+
+
+class SyntheticScreen:
+    """Frame source returning a fixed BGRX frame until changed"""
+
+    raw_mode = "BGRX"
+
+    def __init__(self, np, height=90, width=160):
+        self.frame = np.zeros((height, width, 4), dtype=np.uint8)
+        self.grabs = 0
+
+    def grab(self):
+        self.grabs += 1
+        return self.frame.copy()
+
+
+def test_screen_capture_dedups_and_encodes_in_background(tmp_path):
+    """Test buffer reuse, duplicate-frame skipping and background encoding into dated folders"""
+    if find_missing_dependencies({"numpy": "numpy"}):
+        return
+    import numpy as np
+
+    release = threading.Event()
+    encoded = []
+
+    def encoder(frame, raw_mode, path, image_format, **options):
+        release.wait(5)
+        encoded.append((raw_mode, image_format, options))
+        Path(path).write_bytes(frame.tobytes())
+
+    screen = SyntheticScreen(np)
+    capture = ScreenCapture(str(tmp_path), "png", compress_level=3, workers=1, source=screen, encoder=encoder)
+    first = capture.capture()
+    # capture() returns before the encoder has written anything
+    assert not first.duplicate and not os.path.exists(first.path) and (first.width, first.height) == (160, 90)
+    assert os.path.basename(os.path.dirname(first.path)) == datetime.now().strftime("%Y-%m-%d")
+    release.set()
+    assert first.saved.result(5) == first.path and os.path.getsize(first.path) == 90 * 160 * 4
+
+    again = capture.capture()
+    assert again.duplicate and again.path == first.path and again.saved is None
+
+    # Moving content around changes the fingerprint even though the pixel totals stay the same
+    screen.frame[10:20, 10:20] = 255
+    moved = capture.capture()
+    screen.frame[10:20, 10:20] = 0
+    screen.frame[30:40, 50:60] = 255
+    shifted = capture.capture()
+    assert not moved.duplicate and not shifted.duplicate and moved.path != shifted.path
+
+    jpeg = capture.capture(str(tmp_path / "explicit.jpg"))
+    jpeg.saved.result(5)
+    capture.close()
+    assert encoded[0] == ("BGRX", "PNG", {"compress_level": 3}) and encoded[-1][1:] == ("JPEG", {"quality": 90})
+    stats = capture.stats()
+    assert stats["captured"] == 5 and stats["duplicates"] == 1 and stats["saved"] == 4
+    # One worker plus the frame being captured: never more than two buffers allocated
+    assert len(capture._free) <= 2 and not list(tmp_path.rglob("*.part"))
+
+
+def test_screen_watch_reports_region_changes():
+    """Test block downsampling, change thresholds, changed-area boxes and the paced watch loop"""
+    if find_missing_dependencies({"numpy": "numpy"}):
+        return
+    import numpy as np
+
+    assert parse_region("watch region 100, 200, 640, 480") == (100, 200, 640, 480)
+    assert parse_region("record screen 0 0 800x600") == (0, 0, 800, 600)
+    assert parse_region("watch screen every 5 seconds") is None
+
+    frame = np.random.default_rng(1).integers(0, 256, (90, 160, 4), dtype=np.uint8)
+    expected = frame[:, :, 1].reshape(9, 10, 16, 10).mean(axis=(1, 3)).astype(np.int16)
+    assert np.array_equal(block_means(frame, 10), expected)
+
+    differ = FrameDiffer(scale=8, pixel_threshold=24, change_threshold=0.01, min_blocks=10 ** 6)
+    screen = np.full((1080, 1920, 4), 40, dtype=np.uint8)
+    assert differ.check(screen) is None
+    # A blinking cursor (one block) stays under the threshold; a dialog update does not
+    screen[500:516, 900:902] = 255
+    assert differ.check(screen) is None
+    screen[500:516, 900:902] = 40
+    screen[200:360, 400:720] = 200
+    fraction, box = differ.check(screen)
+    assert box == (400, 200, 320, 160) and 0.02 < fraction < 0.03
+    # Compared with the last reported frame, so the same state is not reported twice
+    assert differ.check(screen) is None
+
+    # With the default minimum block count a dialog-sized change on a full screen is reported
+    differ = FrameDiffer()
+    screen = np.full((1080, 1920, 4), 255, dtype=np.uint8)
+    assert differ.check(screen) is None
+    screen[500:516, 900:902] = 0
+    assert differ.check(screen) is None
+    screen[500:516, 900:902] = 255
+    screen[600:620, 1000:1100] = 0
+    assert differ.check(screen)[1] == (1000, 600, 104, 24)
+    # As is a changed word inside a watched region
+    region = np.full((200, 400, 4), 255, dtype=np.uint8)
+    assert differ.check(region) is None
+    region[100:112, 200:260] = 0
+    assert differ.check(region) is not None
+
+    class Source:
+        raw_mode = "BGRX"
+        regions = []
+
+        def grab(self, region=None):
+            self.regions.append(region)
+            frame = np.zeros((120, 160, 4), dtype=np.uint8)
+            if len(self.regions) >= 5:
+                frame[40:80, :] = 255
+            return frame
+
+    paused = [True, True]
+    watcher = ScreenWatcher((10, 20, 160, 120), fps=200, differ=FrameDiffer(change_threshold=0.1),
+                            source=Source(), paused=lambda: bool(paused and paused.pop()), settle=0)
+    sleep = threading.Event().wait
+    changes = list(watcher.watch(lambda timeout: watcher.frames >= 8 or sleep(timeout)))
+    assert len(changes) == 1 and changes[0].frame_number == 5 and changes[0].box == (0, 40, 160, 40)
+    assert set(Source.regions) == {(10, 20, 160, 120)} and watcher.stats()["fps"] > 10
+
+
+def test_qr_generator_memoizes_and_batches(tmp_path):
+    """Test in-memory QR codes, the LRU memo and zip/sprite-sheet batches rendered on a process pool"""
+    if find_missing_dependencies({"qrcode": "qrcode[pil]", "PIL": "Pillow"}):
+        return
+    import zipfile
+    from PIL import Image
+
+    generator = QRGenerator(cache_size=3, box_size=4, border=2, workers=2, min_parallel=3)
+    image = generator.generate("https://example.com")
+    assert image.png.startswith(b"\x89PNG") and Image.open(io.BytesIO(image.png)).size == image.size
+    assert generator.generate("https://example.com") is image
+    assert generator.generate("https://example.com", error_correction="H") is not image
+    assert generator.stats()["hits"] == 1 and generator.stats()["misses"] == 2
+
+    lines = ["alpha", "beta", "https://example.com", "gamma", "alpha"]
+    batch = generator.batch(lines, str(tmp_path / "codes.zip"))
+    assert (batch.count, batch.rendered, batch.cached) == (5, 3, 1)
+    with zipfile.ZipFile(batch.path) as archive:
+        names = archive.namelist()
+        assert names[0] == "1_alpha.png" and names[-1] == "index.txt" and len(names) == 6
+        assert archive.read("1_alpha.png") == archive.read("5_alpha.png")
+        assert "3_https_example_com.png\thttps://example.com" in archive.read("index.txt").decode()
+    # Only the last cache_size codes stay in memory
+    assert generator.stats()["entries"] == 3
+
+    sheet = generator.batch(["one", "two", "three"], str(tmp_path / "sheet.png"), layout="sheet", columns=2)
+    width, height = Image.open(sheet.path).size
+    code = generator.generate("one").size
+    assert width == 2 * code[0] and height > 2 * code[1]
+
+
+def test_semantic_cache_reuses_reworded_commands(tmp_path):
+    """Test that reworded commands on the same text share a cached response"""
+    if find_missing_dependencies({"numpy": "numpy"}):
+        return
+    db_path, index_dir = str(tmp_path / "cache.sqlite"), str(tmp_path / "semantic")
+    cache = SemanticCache(db_path, index_dir, "model-a", max_entries=4)
+    article = "Quarterly revenue grew 12% while costs fell."
+    cache.put("summarize this", article, "Revenue up, costs down.")
+    cache.put("translate to spanish", article, "Los ingresos crecieron...")
+    cache.put("what is the capital of france", "", "Paris")
+
+    assert cache.get("Give me a summary", article) == "Revenue up, costs down."
+    assert cache.get("summarize this", "A different article") is None
+    assert cache.get("translate to french", article) is None
+    assert cache.get("what's the capital of France?") == "Paris"
+    assert cache.get("summarize in 3 bullet points", article) is None
+    assert cache.get("please", article) is None
+
+    # Reopening maps the same arrays; the ring then overwrites the oldest entry
+    cache.close()
+    cache = SemanticCache(db_path, index_dir, "model-a", max_entries=4)
+    assert cache.get("summary please", article) == "Revenue up, costs down." and len(cache) == 3
+    cache.put("fix grammar", article, "fixed")
+    cache.put("make it formal", article, "formal")
+    assert cache.get("summarize this", article) is None and len(cache) == 4
+    assert cache.stats()["hits"] == 1
+
+    # Entries past the TTL are not served, even for the identical command
+    assert cache.get("fix grammar", article) == "fixed"
+    cache.conn.execute("UPDATE semantic_cache SET created_at = created_at - ?", (cache.ttl_seconds + 1,))
+    assert cache.get("fix grammar", article) is None
+    cache.close()
+
+    # A different embedder (or size) starts a fresh index instead of misreading old vectors
+    cache = SemanticCache(db_path, index_dir, "model-a", embed=HashingEmbedder(dim=64), max_entries=4)
+    assert len(cache) == 0 and cache.get("fix the grammar", article) is None
+    cache.close()
+
+
+def test_request_scheduler_lanes_and_cancellation():
+    """Test that slow work cannot block the fast lane and new commands cancel old ones"""
+    scheduler = RequestScheduler(max_workers=2)
+    release = threading.Event()
+    results = []
+
+    def slow(ticket, name):
+        release.wait(5)
+        results.append((name, ticket.is_cancelled()))
+
+    def fast(ticket, name):
+        results.append((name, ticket.is_cancelled()))
+
+    scheduler.new_command()
+    running = scheduler.submit(SLOW, slow, "speed test")
+    queued = scheduler.submit(SLOW, slow, "llm")
+    scheduler.submit(FAST, fast, "open notepad").future.result(timeout=5)
+    assert results == [("open notepad", False)]
+    assert scheduler.stats()[SLOW]["depth"] == 1
+
+    scheduler.new_command()
+    assert queued.future.cancelled() and running.is_cancelled()
+    release.set()
+    running.future.result(timeout=5)
+
+    stale = scheduler.submit(FAST, fast, "stale", generation=running.generation)
+    assert stale.is_cancelled() and stale.future is None
+
+    stats = scheduler.stats()
+    assert stats[SLOW]["depth"] == 0 and stats[SLOW]["max_depth"] >= 1
+    assert stats[SLOW]["cancelled"] == 2 and stats[FAST]["completed"] == 1
+    assert results[-1] == ("speed test", True)
+    scheduler.shutdown()
+
+
+def test_timer_scheduler_sleeps_until_due():
+    """Test that timed jobs fire on time, in order, without polling"""
+    timer = TimerScheduler()
+    fired = []
+    done = threading.Event()
+    timer.start()
+
+    time.sleep(0.05)
+    assert timer.wakeups == 0
+
+    later = timer.schedule_in(0.3, fired.append, "later")
+    cancelled = timer.schedule_in(0.05, fired.append, "cancelled")
+    timer.schedule_in(0.1, lambda: (fired.append("sooner"), done.set()))
+    cancelled.cancel()
+    assert [job.id for job in timer.pending()] == [3, later.id]
+
+    assert done.wait(2) and fired == ["sooner"]
+    assert timer.last_lateness < 0.05
+    # One wake for each new earlier job, one for the cancelled head, one when "sooner" is due
+    assert timer.wakeups <= 4
+    timer.stop()
+    assert fired == ["sooner"] and timer.fired == 1
+
+    # Repeating jobs skip periods missed while asleep; run_due works without the thread
+    manual = TimerScheduler()
+    ticks = []
+    job = manual.every(10, ticks.append, "tick")
+    assert manual.run_due(job.due - 1) == 0
+    assert manual.run_due(job.due + 25) == 1 and ticks == ["tick"]
+    assert manual.next_due() == job.due and job.due > time.time() + 30
+    manual.cancel(job)
+    assert manual.next_due() is None and manual.pending() == []
+
+
+def test_reminder_store_persists_and_parses(tmp_path):
+    """Test due-time parsing and that pending reminders survive a restart"""
+    now = datetime(2026, 3, 2, 14, 0).timestamp()
+    assert parse_due("in 30 minutes", now) == now + 1800
+    assert parse_due("in an hour and a half", now) == now + 5400
+    assert parse_due("in 10 minutes and 5 seconds", now) == now + 605
+    assert parse_due("at 5pm", now) == datetime(2026, 3, 2, 17, 0).timestamp()
+    assert parse_due("at 9:15", now) == datetime(2026, 3, 3, 9, 15).timestamp()
+    assert parse_due("tomorrow", now) == datetime(2026, 3, 3, 9, 0).timestamp()
+    assert parse_due("at noon tomorrow", now) == datetime(2026, 3, 3, 12, 0).timestamp()
+    for vague in ("at 5", "today at 8am", "in a while", "next week", "in andy"):
+        assert parse_due(vague, now) is None, vague
+
+    db_path = str(tmp_path / "reminders.sqlite")
+    store = ReminderStore(db_path)
+    start = time.time()
+    for i in range(2000):
+        store.add(f"reminder {i}", start + 3600 + i)
+    missed = store.add("missed while closed", start - 60)
+    store.mark_fired([store.add("already shown", start - 120).id])
+    store.close()
+
+    # A new process finds missed reminders first, then upcoming ones, without the fired one
+    store = ReminderStore(db_path)
+    assert store.pending(before=start) == [missed]
+    assert store.pending_count() == 2001
+    upcoming = store.pending(limit=3)
+    assert [reminder.message for reminder in upcoming] == ["missed while closed", "reminder 0", "reminder 1"]
+    assert store.cancel(upcoming[1].id) and not store.cancel(upcoming[1].id)
+    plan = store.conn.execute("EXPLAIN QUERY PLAN SELECT id FROM reminders WHERE fired_at IS NULL "
+                              "AND due_at < ? ORDER BY due_at", (start,)).fetchall()
+    assert "idx_reminders_pending_due" in str(plan)
+    store.close()
+
+
+def test_lazy_imports():
+    """Test that lazy modules load on first use and report their cost"""
+    import sys
+
+    sys.modules.pop("colorsys", None)
+    colorsys = lazy_import("colorsys")
+    assert not colorsys.is_loaded and "colorsys" not in sys.modules
+    assert colorsys.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert colorsys.is_loaded
+
+    missing = lazy_import("magic_wand_missing_dependency", "magic-wand-missing")
+    try:
+        missing.anything
+        assert False, "expected ImportError"
+    except ImportError as e:
+        assert "pip install magic-wand-missing" in str(e)
+
+    assert find_missing_dependencies({"json": "json", "magic_wand_missing_dependency": "pkg"}) == ["pkg"]
+    mark_startup("tests ready")
+    report = startup_report()
+    assert "tests ready" in report and "colorsys" in report and "missing" in report
+
+
+def test_ui_bus_coalesces_and_batches():
+    """Test that worker-thread events reach the UI thread once per frame"""
+    scheduler = FakeScheduler()
+    bus = UIBus(scheduler, interval_ms=16)
+    statuses, batches, calls = [], [], []
+    bus.register("status", lambda text, color: statuses.append(text), COALESCE)
+    bus.register("message", batches.append, BATCH)
+
+    workers = [threading.Thread(target=lambda n=n: [bus.post("message", n, i) for i in range(100)]) for n in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    bus.post("status", "Processing...", "#FFA500")
+    bus.post("status", "Ready", "#4CAF50")
+    bus.call(calls.append, "shown")
+
+    assert bus.pump() == 403
+    assert statuses == ["Ready"] and calls == ["shown"]
+    assert len(batches) == 1 and len(batches[0]) == 400
+    assert bus.frames == 1 and bus.events_coalesced == 1
+    assert bus.pump() == 0
+
+    bus.start()
+    bus.post("status", "Later", "#888888")
+    scheduler.pending.pop(0)()
+    assert statuses == ["Ready", "Later"] and len(scheduler.pending) == 1
+
+
+def main():
+    """Run all component tests"""
+    print("🧪 Magic Wand AI Tool - Component Tests")
+    print("=" * 40)
+
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    passed = 0
+    for test in tests:
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                args = [Path(tmp_dir)] if "tmp_path" in inspect.signature(test).parameters else []
+                test(*args)
+            print(f"✅ {test.__name__} - OK")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__} - FAILED: {e!r}")
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Timer Scheduler for the Ultimate AI Assistant
+Heap of timed jobs run by one thread that sleeps until the next job is due.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class TimerJob:
+    """A scheduled call; due is a time.time() timestamp"""
+
+    def __init__(self, job_id, due, func, args, interval=None):
+        self.id = job_id
+        self.due = due
+        self.func = func
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the job from running (again)"""
+        self.cancelled = True
+
+    def __repr__(self):
+        return f"<TimerJob {self.id} due {time.strftime('%H:%M:%S', time.localtime(self.due))}>"
+
+
+class TimerScheduler:
+    """Runs jobs at their due time; the thread waits on a condition until the earliest job or a new one"""
+
+    def __init__(self, max_sleep=300):
+        # Upper bound on one wait while jobs are pending, so a suspended or adjusted
+        # wall clock is noticed; with no jobs the thread waits indefinitely
+        self.max_sleep = max_sleep
+        self._condition = threading.Condition()
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._stopped = False
+        self._thread = None
+        self.wakeups = 0
+        self.fired = 0
+        self.last_lateness = None
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def schedule_at(self, due, func, *args, interval=None):
+        """Run func(*args) at timestamp due (then every interval seconds if given)"""
+        with self._condition:
+            job = TimerJob(next(self._ids), due, func, args, interval)
+            heapq.heappush(self._heap, (due, job.id, job))
+            # Only an earlier head changes how long the thread should sleep
+            if self._heap[0][2] is job:
+                self._condition.notify()
+            return job
+
+    def schedule_in(self, delay, func, *args):
+        """Run func(*args) once after delay seconds"""
+        return self.schedule_at(time.time() + delay, func, *args)
+
+    def every(self, interval, func, *args):
+        """Run func(*args) every interval seconds, starting one interval from now"""
+        return self.schedule_at(time.time() + interval, func, *args, interval=interval)
+
+    def cancel(self, job):
+        """Cancel a job; it is dropped when it reaches the head of the heap"""
+        job.cancel()
+
+    def pending(self):
+        """Jobs that have not run yet, earliest first"""
+        with self._condition:
+            return [job for _, _, job in sorted(self._heap) if not job.cancelled]
+
+    def next_due(self):
+        """Timestamp of the earliest pending job, or None"""
+        with self._condition:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_cancelled(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def run_due(self, now=None):
+        """Run every job due at now (default: the current time); returns how many ran"""
+        ran = 0
+        while True:
+            job = self._pop_due(time.time() if now is None else now)
+            if job is None:
+                return ran
+            self._fire(job)
+            ran += 1
+
+    def _pop_due(self, now):
+        """Remove and return the earliest job if it is due, rescheduling repeating jobs"""
+        with self._condition:
+            self._drop_cancelled()
+            if not self._heap or self._heap[0][0] > now:
+                return None
+            due, _, job = heapq.heappop(self._heap)
+            if job.interval:
+                # Skip periods missed while the machine was asleep instead of firing them all
+                job.due = due + job.interval * (int((now - due) // job.interval) + 1)
+                heapq.heappush(self._heap, (job.due, job.id, job))
+            self.last_lateness = now - due
+            return job
+
+    def _fire(self, job):
+        self.fired += 1
+        try:
+            job.func(*job.args)
+        except Exception as e:
+            print(f"Scheduled job error: {e}")
+
+    def start(self):
+        """Start the timer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="timer-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                self._drop_cancelled()
+                if not self._heap:
+                    self._condition.wait()
+                    self.wakeups += 1
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(min(delay, self.max_sleep))
+                    self.wakeups += 1
+                    continue
+            self.run_due()
+
+    def stop(self):
+        """Stop the timer thread; pending jobs are discarded"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
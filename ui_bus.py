@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+UI Bus for the AI Assistants
+Worker threads post UI events; a Tk after() pump applies them on the main thread once per frame.
+"""
+
+from collections import deque
+
+# How an event kind is delivered to its handler
+CALL = "call"           # handler(*args) for every event, in order
+COALESCE = "coalesce"   # handler(*args) once per frame with the latest event only
+BATCH = "batch"         # handler([args, ...]) once per frame with every event
+
+
+class UIBus:
+    """Lock-free event queue drained on the Tk thread"""
+
+    def __init__(self, root, interval_ms=16):
+        self.root = root
+        self.interval_ms = interval_ms
+        # deque.append/popleft are atomic, so producers never take a lock
+        self._events = deque()
+        self._handlers = {}
+        self._running = False
+        self.frames = 0
+        self.events_applied = 0
+        self.events_coalesced = 0
+
+    def register(self, kind, handler, mode=CALL):
+        """Register the main-thread handler for an event kind"""
+        self._handlers[kind] = (handler, mode)
+
+    def post(self, kind, *args):
+        """Queue an event from any thread"""
+        self._events.append((kind, args))
+
+    def call(self, func, *args):
+        """Run func(*args) on the Tk thread at the next frame"""
+        self._events.append((None, (func, args)))
+
+    def start(self):
+        """Begin pumping events (call on the Tk thread)"""
+        if not self._running:
+            self._running = True
+            self.root.after(self.interval_ms, self._pump)
+
+    def stop(self):
+        """Stop pumping after the current frame"""
+        self._running = False
+
+    def pump(self):
+        """Apply every queued event now, grouping by kind"""
+        pending = len(self._events)
+        if not pending:
+            return 0
+
+        # Group by kind, keeping the order in which kinds first appeared
+        groups = {}
+        for _ in range(pending):
+            kind, args = self._events.popleft()
+            if kind is None:
+                groups.setdefault(("call", len(groups)), []).append(args)
+                continue
+            groups.setdefault(kind, []).append(args)
+
+        self.frames += 1
+        for kind, events in groups.items():
+            try:
+                if isinstance(kind, tuple):
+                    func, args = events[0]
+                    func(*args)
+                    continue
+
+                handler, mode = self._handlers[kind]
+                if mode == COALESCE:
+                    self.events_coalesced += len(events) - 1
+                    handler(*events[-1])
+                elif mode == BATCH:
+                    handler(events)
+                else:
+                    for args in events:
+                        handler(*args)
+            except Exception as e:
+                print(f"❌ UI update error ({kind}): {e}")
+        self.events_applied += pending
+        return pending
+
+    def _pump(self):
+        """after() callback: apply this frame's events and reschedule"""
+        if not self._running:
+            return
+        self.pump()
+        self.root.after(self.interval_ms, self._pump)